@@ -1,119 +1,460 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import itertools
+import numpy as np
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy import text
+from app.core.columnar import (
+    ARROW_AVAILABLE,
+    ARROW_MEDIA_TYPE,
+    columns_to_arrow,
+    columns_to_json,
+    records_to_columns
+)
+from app.core.config import settings
 from app.core.database import get_database_connection
+from app.core.executors import offload
+from app.core.http_cache import make_etag, not_modified_response, set_cache_headers
+from app.core.pagination import build_keyset_clause, keyset_order, paginate_rows
+from app.core.streaming import (
+    ENCODERS,
+    MEDIA_TYPES,
+    XLSX_AVAILABLE,
+    gzip_chunks,
+    stream_query_batches
+)
+from app.crud.time_series import (
+    build_aligned_query,
+    build_resample_query,
+    date_filter,
+    parse_series_spec,
+    resolve_columns,
+    select_list
+)
 from app.schemas.time_series import TimeSeriesData, TimeSeriesResponse
+from app.services.dataset_versions import count_cache, dataset_versions
+from app.services.table_catalog import table_catalog
 
 router = APIRouter()
 
+# Upper bound on series per /aligned request (one CTE per table, one column per series)
+MAX_ALIGNED_SERIES = 20
+
 @router.get("/")
-async def get_time_series_data(
+@offload("db")
+def get_time_series_data(
+    request: Request,
+    http_response: Response,
     table_name: str = Query(..., description="Name of the table in PostgreSQL"),
     limit: int = Query(100, description="Number of records to retrieve", ge=1, le=1000),
-    offset: int = Query(0, description="Number of records to skip", ge=0),
+    offset: int = Query(0, description="Number of records to skip (deprecated, use cursor)", ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor/prev_cursor"),
     start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)")
+    end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    format: str = Query("json", description="Response format", pattern="^(json|ndjson|csv|arrow)$"),
+    layout: str = Query("rows", description="JSON layout: one object per row or one array per column",
+                        pattern="^(rows|columnar)$"),
+    columns: Optional[str] = Query(None, description="Comma separated columns to return (date and id are always included)"),
+    resample: Optional[str] = Query(None, description="Aggregate per period: W, M, Q or Y", pattern="^(W|M|Q|Y)$"),
+    agg: str = Query("mean", description="Aggregation used with resample", pattern="^(mean|last|min|max)$"),
+    include_count: bool = Query(True, description="Return total_count (cached per dataset version)")
 ) -> Any:
     """
     Retrieve time series data from PostgreSQL.
     
+    Pages are ordered newest first and paginated with a keyset on (date, id):
+    pass the returned next_cursor/prev_cursor back as `cursor` to move
+    between pages. `offset` is still honoured when no cursor is given.
+    
+    With format=ndjson or format=csv the whole date range is streamed oldest
+    first from a server-side cursor; limit, offset and cursor are ignored.
+    layout=columnar returns the page as {"columns": {"date": [...], ...}}
+    and format=arrow returns it as an Arrow IPC stream.
+    
+    With resample the numeric columns are aggregated per period in PostgreSQL
+    (date_trunc) and only the aggregated rows are returned, paginated with
+    limit/offset.
+    
     Args:
         table_name: The name of the table containing time series data
         limit: Maximum number of records to return
-        offset: Number of records to skip
+        offset: Number of records to skip (ignored when cursor is set)
+        cursor: Opaque keyset cursor from a previous response
         start_date: Optional start date filter
         end_date: Optional end date filter
+        format: json/arrow (paginated), ndjson or csv (streamed)
+        layout: rows or columnar (json only)
+        columns: Optional projection, checked against the table's columns
+        resample: Optional period (W, M, Q, Y)
+        agg: Aggregation for resample (mean, last, min, max)
+    
+    Responses carry an ETag derived from the table's row count and content
+    hash; a matching If-None-Match is answered with 304 before any data
+    query runs.
     
     Returns:
         TimeSeriesResponse containing the data and metadata
     """
+    if format == "arrow" and not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Arrow output is not available. pyarrow is not installed.")
+
+    try:
+        table_info = table_catalog.require_series_table(table_name)
+        version = dataset_versions.get(table_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Error retrieving data from PostgreSQL: {str(e)}"
+        )
+    etag = make_etag(request, version)
+    max_age = settings.HTTP_CACHE_MAX_AGE
+    not_modified = not_modified_response(request, etag, max_age)
+    if not_modified is not None:
+        return not_modified
+
+    table_columns = table_info.columns
+    try:
+        selected = resolve_columns(columns, table_columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format in ENCODERS:
+        # The stream opens its own connection, so none is held here while it is sent
+        return set_cache_headers(
+            _stream_time_series_data(
+                table_name, selected, table_columns, format, start_date, end_date, resample, agg
+            ),
+            etag, max_age
+        )
+
     try:
         with get_database_connection() as conn:
-            # Build the base query
-            print("data------------")
-            base_query = f"SELECT * FROM {table_name}"
-            where_conditions = []
             params = {}
-            
             # Add date filters if provided
-            if start_date:
-                where_conditions.append("Date >= :start_date")
-                params['start_date'] = start_date
-            if end_date:
-                where_conditions.append("Date <= :end_date")
-                params['end_date'] = end_date
-
-            # Add WHERE clause if there are conditions
-            if where_conditions:
-                base_query += " WHERE " + " AND ".join(where_conditions)
-            
-            # Add pagination
-            # base_query += " ORDER BY Date DESC LIMIT :limit OFFSET :offset"
-            # params['limit'] = limit
-            # params['offset'] = offset
-            
-            # Execute the query
-            result = conn.execute(text(base_query), params)
-            data = [dict(row._mapping) for row in result]
-            
-            # Get total count for the table
-            count_query = f"SELECT COUNT(*) as total FROM {table_name}"
-            if where_conditions:
-                count_query += " WHERE " + " AND ".join(where_conditions)
-
-            # Add pagination
-            base_query += " ORDER BY Date DESC LIMIT :limit OFFSET :offset"
-            params['limit'] = limit
-            params['offset'] = offset
-            
-            # Execute the query
-            result = conn.execute(text(base_query), params)
+            where_conditions = date_filter(start_date, end_date, params)
+
+            if resample:
+                try:
+                    base_query, count_query = build_resample_query(
+                        table_name, selected, table_columns, resample, agg, where_conditions
+                    )
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                count_params = dict(params)
+                base_query += " ORDER BY date DESC LIMIT :limit OFFSET :offset"
+                params['limit'] = limit
+                params['offset'] = offset
+                result = conn.execute(text(base_query), params)
+                data = [dict(row._mapping) for row in result]
+                next_cursor = prev_cursor = None
+            else:
+                # Build the base query
+                base_query = f"SELECT {select_list(selected)} FROM {table_name}"
+
+                # Count uses the date filters only, not the keyset position
+                count_query = table_info.count_all
+                if where_conditions:
+                    count_query += " WHERE " + " AND ".join(where_conditions)
+                count_params = dict(params)
+
+                try:
+                    keyset_condition, backward = build_keyset_clause(
+                        cursor, params, table_columns[table_info.date_column]
+                    )
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                if keyset_condition:
+                    where_conditions.append(keyset_condition)
+
+                # Add WHERE clause if there are conditions
+                if where_conditions:
+                    base_query += " WHERE " + " AND ".join(where_conditions)
+                
+                # Add pagination (one extra row tells us if there is another page)
+                base_query += f" {keyset_order(backward)} LIMIT :limit"
+                params['limit'] = limit + 1
+                if offset and not cursor:
+                    base_query += " OFFSET :offset"
+                    params['offset'] = offset
+                
+                # Execute the query
+                result = conn.execute(text(base_query), params)
+                rows = [dict(row._mapping) for row in result]
+                data, next_cursor, prev_cursor = paginate_rows(
+                    rows, limit, backward, at_start=not cursor and not offset
+                )
             
-            count_result = conn.execute(text(count_query), {k: v for k, v in params.items() if k not in ['limit', 'offset']})
-            total_count = count_result.scalar()
+            # Get total count for the table (memoized per filter and dataset version)
+            total_count = None
+            if include_count:
+                total_count = count_cache.get_or_compute(
+                    (table_name, count_query, tuple(sorted(count_params.items())), version),
+                    lambda: conn.execute(text(count_query), count_params).scalar()
+                )
             
-            if not data:
+            if not data and not cursor:
                 raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found or no data available")
             
-            return {
+            if format == "arrow":
+                return set_cache_headers(
+                    Response(content=columns_to_arrow(records_to_columns(data)), media_type=ARROW_MEDIA_TYPE),
+                    etag, max_age
+                )
+            
+            response = {
                 "data": data,
                 "total_count": total_count,
                 "table_name": table_name,
                 "limit": limit,
                 "offset": offset,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor,
+                "resample": resample,
+                "agg": agg if resample else None,
                 "message": "Raw data retrieved successfully"
             }
+            if layout == "columnar":
+                del response["data"]
+                response["columns"] = columns_to_json(records_to_columns(data))
+            set_cache_headers(http_response, etag, max_age)
+            return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Error retrieving data from PostgreSQL: {str(e)}"
         )
 
-@router.get("/tables")
-async def get_available_tables() -> Any:
-    """Get list of available tables in PostgreSQL."""
+def _stream_time_series_data(table_name: str, selected: List[str], table_columns: Dict[str, str],
+                             format: str, start_date: Optional[str], end_date: Optional[str],
+                             resample: Optional[str], agg: str, compress: Optional[str] = None,
+                             attachment: bool = False) -> StreamingResponse:
+    """Stream a date range as NDJSON/CSV/XLSX without materializing it."""
+    params = {}
+    where_conditions = date_filter(start_date, end_date, params)
+    if resample:
+        try:
+            query, _ = build_resample_query(
+                table_name, selected, table_columns, resample, agg, where_conditions
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query += " ORDER BY date ASC"
+    else:
+        query = f"SELECT {select_list(selected)} FROM {table_name}"
+        if where_conditions:
+            query += " WHERE " + " AND ".join(where_conditions)
+        query += " ORDER BY date ASC, id ASC"
+
+    chunks = ENCODERS[format](stream_query_batches(query, params))
+    filename = f"{table_name}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if compress == "gzip":
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    try:
+        # Pull the first chunk now so query errors still become a 500
+        first_chunk = next(chunks, b"")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving data from PostgreSQL: {str(e)}"
+        )
+
+    disposition = "attachment" if attachment else "inline"
+    return StreamingResponse(
+        itertools.chain([first_chunk], chunks),
+        media_type=media_type,
+        headers={"Content-Disposition": f'{disposition}; filename="{filename}"'}
+    )
+
+@router.get("/export")
+@offload("db")
+def export_time_series_data(
+    table_name: str = Query(..., description="Name of the table in PostgreSQL"),
+    format: str = Query("csv", description="File format", pattern="^(csv|xlsx)$"),
+    columns: Optional[str] = Query(None, description="Comma separated columns to export (date and id are always included)"),
+    start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    compress: Optional[str] = Query(None, description="Compress the file (csv only)", pattern="^gzip$")
+) -> Any:
+    """
+    Export a table (or a date range of it) as a CSV or XLSX download.
+    
+    Rows are read oldest first from a server-side cursor and written as they
+    arrive, so exporting the full daily market_data history does not load it
+    into memory. CSV starts downloading immediately; XLSX is assembled in a
+    temporary file (constant_memory mode) and then streamed.
+    
+    Args:
+        table_name: The name of the table containing time series data
+        format: csv or xlsx
+        columns: Optional projection, checked against the table's columns
+        start_date: Optional start date filter
+        end_date: Optional end date filter
+        compress: gzip to download a .csv.gz
+    """
+    if format == "xlsx" and not XLSX_AVAILABLE:
+        raise HTTPException(status_code=501, detail="XLSX export is not available. XlsxWriter is not installed.")
+    if format == "xlsx" and compress:
+        raise HTTPException(status_code=400, detail="XLSX files are already compressed; use compress only with csv")
+
+    try:
+        table_info = table_catalog.require_series_table(table_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving table information: {str(e)}"
+        )
+
+    try:
+        selected = resolve_columns(columns, table_info.columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _stream_time_series_data(
+        table_name, selected, table_info.columns, format, start_date, end_date,
+        resample=None, agg="mean", compress=compress, attachment=True
+    )
+
+@router.get("/aligned")
+@offload("db")
+def get_aligned_series(
+    request: Request,
+    http_response: Response,
+    series: List[str] = Query(..., description="Series as table.column or table.column@asset (repeat the parameter)"),
+    start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    forward_fill: bool = Query(False, description="Fill gaps with the previous value of each series"),
+    format: str = Query("json", description="Response format", pattern="^(json|arrow)$")
+) -> Any:
+    """
+    Retrieve several series aligned on one date axis.
+    
+    Example: series=precios_materiales.scrap_mxn&series=market_data.close@VIX
+    
+    The outer join on date, the pivot of market_data.asset_name and the
+    optional forward fill all run in PostgreSQL as a single query.
+    
+    Args:
+        series: Series references (max 20); tables with an asset_name column need @asset
+        start_date: Optional start date filter
+        end_date: Optional end date filter
+        forward_fill: Carry the last observed value forward over gaps
+        format: json (columnar) or arrow
+    
+    Returns:
+        Columnar matrix {"columns": {"date": [...], "<series>": [...]}}
+    """
+    series = list(dict.fromkeys(series))
+    if len(series) > MAX_ALIGNED_SERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ALIGNED_SERIES} series can be aligned")
+    if format == "arrow" and not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Arrow output is not available. pyarrow is not installed.")
+
+    try:
+        specs = [parse_series_spec(spec) for spec in series]
+        for table, column, asset in specs:
+            info = table_catalog.require_series_table(table)
+            if column not in info.numeric_columns:
+                raise ValueError(f"Column '{column}' is not a numeric column of '{table}'")
+            if ('asset_name' in info.columns) != (asset is not None):
+                raise ValueError(
+                    f"Series on '{table}' must specify @asset" if asset is None
+                    else f"Table '{table}' has no asset_name column"
+                )
+        tables = list(dict.fromkeys(table for table, _, _ in specs))
+        versions = [dataset_versions.get(table) for table in tables]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Error retrieving data from PostgreSQL: {str(e)}"
+        )
+
+    etag = make_etag(request, *versions)
+    max_age = settings.HTTP_CACHE_MAX_AGE
+    not_modified = not_modified_response(request, etag, max_age)
+    if not_modified is not None:
+        return not_modified
+
     try:
+        params = {}
+        where_conditions = date_filter(start_date, end_date, params)
+        query = build_aligned_query(specs, where_conditions, params, forward_fill)
+        
         with get_database_connection() as conn:
-            # Query to get all table names from the current database
-            query = text("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_type = 'BASE TABLE'
-                ORDER BY table_name
-            """)
-            
-            result = conn.execute(query)
-            tables = [row[0] for row in result]
-            
-            return {
-                "message": "Available tables retrieved successfully",
-                "tables": tables,
-                "total_tables": len(tables)
-            }
+            rows = conn.execute(text(query), params).fetchall()
+        
+        aligned = {"date": np.array([row[0] for row in rows], dtype='datetime64[D]')}
+        for i, label in enumerate(series):
+            aligned[label] = np.array([row[i + 1] for row in rows], dtype=np.float64)
+        
+        if format == "arrow":
+            return set_cache_headers(
+                Response(content=columns_to_arrow(aligned), media_type=ARROW_MEDIA_TYPE),
+                etag, max_age
+            )
+        
+        set_cache_headers(http_response, etag, max_age)
+        return {
+            "columns": columns_to_json(aligned),
+            "series": series,
+            "total_count": len(rows),
+            "start_date": start_date,
+            "end_date": end_date,
+            "forward_fill": forward_fill,
+            "message": "Aligned data retrieved successfully"
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Error retrieving data from PostgreSQL: {str(e)}"
+        )
+
+@router.get("/tables")
+@offload("db")
+def get_available_tables() -> Any:
+    """Get list of available tables in PostgreSQL (served from the in-memory catalog)."""
+    try:
+        tables = table_catalog.tables
+        
+        return {
+            "message": "Available tables retrieved successfully",
+            "tables": list(tables.keys()),
+            "total_tables": len(tables),
+            "time_series_tables": [info.to_dict() for info in table_catalog.series_tables()]
+        }
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving table information: {str(e)}"
         )
+
+@router.post("/tables/refresh")
+@offload("db")
+def refresh_table_catalog() -> Any:
+    """Reload table and column metadata after a schema change."""
+    try:
+        tables = table_catalog.refresh()
+        dataset_versions.invalidate()
+        
+        return {
+            "message": "Table catalog refreshed successfully",
+            "tables": list(tables.keys()),
+            "total_tables": len(tables)
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error refreshing table information: {str(e)}"
+        )
@@ -1,150 +1,818 @@
-from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy import text
+from app.core.columnar import (
+    ARROW_AVAILABLE,
+    ARROW_MEDIA_TYPE,
+    columns_to_arrow,
+    columns_to_json,
+    records_to_columns
+)
+from app.core.config import settings
 from app.core.database import get_database_connection
+from app.core.executors import offload, run_blocking, submit
+from app.core.http_cache import make_etag, not_modified_response, set_cache_headers
+from app.core.single_flight import SingleFlight
+from app.core.streaming import SSE_MEDIA_TYPE, encode_sse
+from app.core.transforms import TRANSFORMS, ColumnTransform, transform_records
+from app.crud.time_series import NON_VALUE_COLUMNS
 from app.schemas.time_series import TimeSeriesData, TimeSeriesResponse
-from app.services.forecast_service import ForecastService
+from app.models.model_registry_service import model_cache
+from app.services.dataset_versions import dataset_versions
+from app.services.forecast_cache import forecast_cache
+from app.services.forecast_ledger import forecast_ledger
+from app.services.forecast_service import TRAINED_LSTM_TYPES, ForecastService, forecast_flight
+from app.services.materialized_forecasts import materialized_forecasts
+from app.services.prediction_intervals import interval_engine, interval_quantiles
+from app.services.scenario_coefficients import CoefficientSet, scenario_coefficients
+from app.services.series_store import series_store
+from app.services.table_catalog import table_catalog
+import asyncio
 import logging
 import pandas as pd
 import numpy as np
+import time
 from sklearn.linear_model import LinearRegression
 from datetime import datetime, timedelta
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 forecast_service = ForecastService()
+page_flight = SingleFlight()
+
+FORECAST_MODEL_TYPES = ("lstm", "lstm_direct", "arima", "simple_linear", "empirical")
+# Upper bound of value columns x model types in one /batch request
+BATCH_MAX_JOBS = 40
+
+
+class ScenarioCoefficientsRequest(BaseModel):
+    coefficients: Dict[str, float] = Field(..., min_length=1, description="Month (YYYY-MM) -> coefficient")
+
+class ScenarioPricesRequest(BaseModel):
+    base_prices: List[float] = Field(..., min_length=1, max_length=10000)
+    periods: int = Field(18, ge=1, le=365)
+    start_date: Optional[str] = Field(None, description="Date of the first period (YYYY-MM-DD, default: next week)")
+    version: Optional[int] = Field(None, ge=0, description="Coefficient version (default: latest)")
 
 @router.get("/")
-async def get_forecast(
+@offload("inference")
+def get_forecast(
+    request: Request,
+    http_response: Response,
+    background_tasks: BackgroundTasks,
     table_name: str = Query(..., description="Name of the table in PostgreSQL"),
     limit: int = Query(100, description="Number of records to retrieve", ge=1, le=1000),
     offset: int = Query(0, description="Number of records to skip", ge=0),
     start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
     forecast_periods: int = Query(7, description="Number of periods to forecast", ge=1, le=365),
-    transform: str = Query("log", description="Transform the data", choices=["log", "sqrt", "normalize", "none"]),
+    transform: str = Query("log", description="Transform the data", pattern="^(log|sqrt|normalize|none)$"),
     value_column: str = Query("scrap_mxn", description="Name of the column containing values to forecast"),
     model_type: str = Query("lstm", description="Type of model to use for forecasting", 
-                           pattern="^(lstm|arima|simple_linear|empirical)$"),
-    use_trained_model: bool = Query(True, description="Use trained model if available, otherwise train on-the-fly")
+                           pattern="^(lstm|lstm_direct|arima|simple_linear|empirical)$"),
+    use_trained_model: bool = Query(True, description="Use trained model if available, otherwise train on-the-fly"),
+    format: str = Query("json", description="Response format (arrow returns the forecast table only)",
+                        pattern="^(json|arrow)$"),
+    layout: str = Query("rows", description="JSON layout: one object per row or one array per column",
+                        pattern="^(rows|columnar)$"),
+    include_count: bool = Query(True, description="Return total_count (computed in the same query)"),
+    live: bool = Query(False, description="Compute the trained-model forecast now instead of reading the materialized one"),
+    interval_level: float = Query(settings.FORECAST_INTERVAL_LEVEL, gt=0, lt=1,
+                                  description="Central level of confidence_interval (e.g. 0.8, 0.9, 0.95)")
 ) -> Any:
     """
     Retrieve time series data and generate forecast using trained models.
+    
+    layout=columnar replaces `data`/`forecast` with `columns`/`forecast_columns`
+    ({"date": [...], "scrap_mxn": [...]}); format=arrow returns the forecast
+    as an Arrow IPC stream.
+    
+    The ETag combines the table's dataset version, the latest registry
+    version of the model, the scenario coefficients version and the current date (trained-model forecasts are
+    dated from today); a matching If-None-Match is answered with 304.
+    
+    LSTM forecasts are read from forecasts_materialized when it holds rows
+    for the current model and data; otherwise (or with live=true) they are
+    computed now, and a stale table is refreshed in the background.
+    
+    confidence_interval is the central `interval_level` range of a residual
+    bootstrap (see app.services.prediction_intervals).
     """
+    if format == "arrow" and not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Arrow output is not available. pyarrow is not installed.")
+
     try:
-        with get_database_connection() as conn:
-            # Build the base query
-            base_query = f"SELECT * FROM {table_name}"
-            where_conditions = []
-            params = {}
-            
-            # Add date filters if provided
-            if start_date:
-                where_conditions.append("Date >= :start_date")
-                params['start_date'] = start_date
-            if end_date:
-                where_conditions.append("Date <= :end_date")
-                params['end_date'] = end_date
-            
-            # Add WHERE clause if there are conditions
-            if where_conditions:
-                base_query += " WHERE " + " AND ".join(where_conditions)
-            
-            # Add pagination
-            base_query += " ORDER BY Date DESC LIMIT :limit OFFSET :offset"
-            params['limit'] = limit
-            params['offset'] = offset
-            
-            # Execute the query
-            result = conn.execute(text(base_query), params)
-            data = [dict(row._mapping) for row in result]
-            
-            # Get total count for the table
-            count_query = f"SELECT COUNT(*) as total FROM {table_name}"
-            if where_conditions:
-                count_query += " WHERE " + " AND ".join(where_conditions)
-            
-            count_result = conn.execute(text(count_query), {k: v for k, v in params.items() if k not in ['limit', 'offset']})
-            total_count = count_result.scalar()
-            
-            if not data:
-                raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found or no data available")
-            
-            # Apply transformations if needed
-            exclude_columns = ['date', 'year', 'Date']
-            if transform in ["log", "sqrt", "normalize"]:
-                if transform == "normalize":  # add
-                    numeric_keys = sorted({
-                        k for item in data for k, v in item.items()
-                        if k.lower() not in exclude_columns and isinstance(v, (int, float))
-                    })
+        table_info = table_catalog.require_series_table(table_name)
+        version = dataset_versions.get(table_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Error retrieving data from PostgreSQL: {str(e)}"
+        )
+    if value_column not in table_info.columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Column '{value_column}' not found in table '{table_name}'"
+        )
+    _, model_version = forecast_service.select_model(table_name, model_type, value_column, forecast_periods)
+    etag = make_etag(request, version, model_version, scenario_coefficients.get().version, datetime.now().date())
+    max_age = settings.HTTP_CACHE_MAX_AGE
+    not_modified = not_modified_response(request, etag, max_age=max_age)
+    if not_modified is not None:
+        return not_modified
 
-                    cols = {
-                        k: np.array([item.get(k, np.nan) for item in data], dtype=float)
-                        for k in numeric_keys
-                    }
-                    mins = {k: np.nanmin(arr) for k, arr in cols.items()}
-                    maxs = {k: np.nanmax(arr) for k, arr in cols.items()}
-
-                    for i, item in enumerate(data):
-                        for k in numeric_keys:
-                            v = cols[k][i]
-                            denom = (maxs[k] - mins[k])
-                            item[k] = float((v - mins[k]) / denom) if denom and np.isfinite(v) else 0.0
-                else:
-                    for item in data:
-                        for key, value in item.items():
-                            if key.lower() not in exclude_columns and isinstance(value, (int, float)):
-                                if transform == "log":
-                                    item[key] = np.log(value) if value > 0 else 0
-                                elif transform == "sqrt":
-                                    item[key] = np.sqrt(value) if value >= 0 else 0
-            
-            # Generate forecast
-            forecast_data = []
-            
-            if model_type == "empirical": 
-                print("Calculating empirical forecast")
-                forecast_data = calculate_empirical_forecast(data, forecast_periods, value_column)
-            elif  model_type == "lstm":
-                print("Calculating LSTM forecast")
-                try:
-                    # Try to use trained model
-                    forecast_data = forecast_service.generate_forecast(
-                        table_name=table_name,
-                        model_type=model_type,
-                        value_column=value_column,
-                        forecast_periods=forecast_periods
-                    )
-                    print(forecast_data)
-                except (ValueError, FileNotFoundError) as e:
-                    # Fallback to simple linear if model not found
-                    logger.warning(f"Trained model not found, using simple linear: {str(e)}")
-                    forecast_data = calculate_empirical_forecast(data, forecast_periods, value_column)
-            else:
-                forecast_data = calculate_simple_forecast(data, forecast_periods, value_column)
-            
-            return {
-                "data": data,
-                "forecast": forecast_data,
-                "total_count": total_count,
-                "table_name": table_name,
-                "limit": limit,
-                "offset": offset,
-                "forecast_periods": forecast_periods,
-                "model_type": model_type,
-                "value_column": value_column,
-                "message": "Data and forecast retrieved successfully"
-            }
+    try:
+        # Identical page reads running at the same time share one query
+        (data, total_count), _ = page_flight.do(
+            (table_name, limit, offset, start_date, end_date, include_count, version),
+            lambda: _fetch_series_page(table_name, limit, offset, start_date, end_date, include_count)
+        )
+        # Other requests may hold the same rows and they are transformed in place below
+        data = [dict(row) for row in data]
+        
+        if not data:
+            raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found or no data available")
         
+        # Apply transformations if needed (forecasts are mapped back to original units)
+        data, column_transform = transform_records(data, transform, exclude=NON_VALUE_COLUMNS)
+
+        # Generate forecast
+        forecast_data = _forecast_for_model(
+            table_name, data, model_type, value_column, forecast_periods, column_transform,
+            live, background_tasks, interval_level
+        )
+
+        if format == "arrow":
+            return set_cache_headers(
+                Response(content=columns_to_arrow(records_to_columns(forecast_data)), media_type=ARROW_MEDIA_TYPE),
+                etag, max_age=max_age
+            )
+
+        response = {
+            "data": data,
+            "forecast": forecast_data,
+            "total_count": total_count,
+            "table_name": table_name,
+            "limit": limit,
+            "offset": offset,
+            "forecast_periods": forecast_periods,
+            "model_type": model_type,
+            "value_column": value_column,
+            "message": "Data and forecast retrieved successfully"
+        }
+        if layout == "columnar":
+            response["columns"] = columns_to_json(records_to_columns(response.pop("data")))
+            response["forecast_columns"] = columns_to_json(records_to_columns(response.pop("forecast")))
+        set_cache_headers(http_response, etag, max_age=max_age)
+        return response
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Error retrieving data from PostgreSQL: {str(e)}"
         )
 
-def calculate_simple_forecast(data: List[Dict], periods: int, value_column: str) -> List[Dict]:
-    """Calculate simple linear regression forecast (fallback method)"""
+@router.get("/batch")
+async def get_forecast_batch(
+    request: Request,
+    http_response: Response,
+    background_tasks: BackgroundTasks,
+    table_name: str = Query(..., description="Name of the table in PostgreSQL"),
+    value_columns: str = Query("scrap_mxn", description="Comma separated columns to forecast"),
+    model_types: str = Query("lstm", description="Comma separated models (lstm, lstm_direct, arima, simple_linear, empirical)"),
+    limit: int = Query(100, description="Number of records to retrieve", ge=1, le=1000),
+    offset: int = Query(0, description="Number of records to skip", ge=0),
+    start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    forecast_periods: int = Query(7, description="Number of periods to forecast", ge=1, le=365),
+    transform: str = Query("none", description="Transform of `data` and of the models' input",
+                           pattern="^(log|sqrt|normalize|none)$"),
+    data_transforms: Optional[str] = Query(None, description="Comma separated extra transforms of the data to return"),
+    include_count: bool = Query(True, description="Return total_count (computed in the same query)"),
+    live: bool = Query(False, description="Compute trained-model forecasts now instead of reading the materialized ones"),
+    interval_level: float = Query(settings.FORECAST_INTERVAL_LEVEL, gt=0, lt=1,
+                                  description="Central level of confidence_interval (e.g. 0.8, 0.9, 0.95)")
+) -> Any:
+    """
+    Forecast several columns with several models from one read of the data.
+    
+    The page is fetched once on the db pool; every (value column, model
+    type) pair then runs as its own job on the inference pool, so
+    independent forecasts overlap. The handler awaits them on the event
+    loop instead of holding a db worker. Forecasts come back under forecasts[value_column][model_type]
+    with the time each job took. A failing model is reported in its entry
+    instead of failing the whole batch.
+    
+    data_transforms=normalize,log adds `transformed_data` with the same page
+    under each of those transforms, so a view that plots raw and normalized
+    prices needs a single request.
+    """
+    started = time.perf_counter()
+    version, columns, models, extra_transforms = await run_blocking(
+        "db", _parse_batch_request, table_name, value_columns, model_types, data_transforms
+    )
+
+    def etag_inputs() -> Tuple[List, int]:
+        model_versions = {
+            (column, model): forecast_service.select_model(table_name, model, column, forecast_periods)
+            for column in columns for model in models
+        }
+        return sorted(model_versions.items()), scenario_coefficients.get().version
+
+    model_versions, coefficients_version = await run_blocking("db", etag_inputs)
+    etag = make_etag(request, version, model_versions, coefficients_version, datetime.now().date())
+    max_age = settings.HTTP_CACHE_MAX_AGE
+    not_modified = not_modified_response(request, etag, max_age=max_age)
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        data, column_transform, transformed_data, total_count = await run_blocking(
+            "db", _read_batch_page, table_name, limit, offset, start_date, end_date,
+            include_count, version, transform, extra_transforms
+        )
+        data_ms = (time.perf_counter() - started) * 1000
+
+        # Awaited on the event loop, so no db worker waits on the inference jobs
+        pairs = [(column, model) for column in columns for model in models]
+        entries = await asyncio.gather(*(
+            asyncio.wrap_future(submit(
+                "inference", _run_forecast_job, table_name, data, model, column, forecast_periods,
+                column_transform, live, background_tasks, interval_level
+            ))
+            for column, model in pairs
+        ))
+        forecasts: Dict[str, Dict[str, Any]] = {column: {} for column in columns}
+        for (column, model), entry in zip(pairs, entries):
+            forecasts[column][model] = entry
+
+        response = {
+            "data": data,
+            "forecasts": forecasts,
+            "total_count": total_count,
+            "table_name": table_name,
+            "limit": limit,
+            "offset": offset,
+            "forecast_periods": forecast_periods,
+            "value_columns": columns,
+            "model_types": models,
+            "timings": {
+                "data_ms": round(data_ms, 2),
+                "total_ms": round((time.perf_counter() - started) * 1000, 2)
+            },
+            "message": "Data and forecasts retrieved successfully"
+        }
+        if transformed_data:
+            response["transformed_data"] = transformed_data
+        set_cache_headers(http_response, etag, max_age=max_age)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving data from PostgreSQL: {str(e)}"
+        )
+
+@router.get("/stream")
+async def stream_forecast(
+    background_tasks: BackgroundTasks,
+    table_name: str = Query(..., description="Name of the table in PostgreSQL"),
+    value_columns: str = Query("scrap_mxn", description="Comma separated columns to forecast"),
+    model_types: str = Query("lstm", description="Comma separated models (lstm, lstm_direct, arima, simple_linear, empirical)"),
+    limit: int = Query(100, description="Number of records to retrieve", ge=1, le=1000),
+    offset: int = Query(0, description="Number of records to skip", ge=0),
+    start_date: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    forecast_periods: int = Query(7, description="Number of periods to forecast", ge=1, le=365),
+    transform: str = Query("none", description="Transform of `data` and of the models' input",
+                           pattern="^(log|sqrt|normalize|none)$"),
+    data_transforms: Optional[str] = Query(None, description="Comma separated extra transforms of the data to return"),
+    include_count: bool = Query(True, description="Return total_count (computed in the same query)"),
+    live: bool = Query(False, description="Compute trained-model forecasts now instead of reading the materialized ones"),
+    interval_level: float = Query(settings.FORECAST_INTERVAL_LEVEL, gt=0, lt=1,
+                                  description="Central level of confidence_interval (e.g. 0.8, 0.9, 0.95)")
+) -> StreamingResponse:
+    """
+    /batch as server-sent events, so a chart can draw before every model is done.
+    
+    Events, in order:
+    - `data`: the page (and `transformed_data`), sent as soon as it is read
+    - `forecast`: one per column/model as each job finishes, with the point
+      forecasts (no confidence_interval) and elapsed_ms, or `error`
+    - `intervals`: one per column/model with the confidence_interval bounds
+    - `done`: timings; `error` instead if the page cannot be read
+    
+    Intervals are computed together with their forecast, so they only
+    come later to keep the first events small.
+    """
+    started = time.perf_counter()
+    version, columns, models, extra_transforms = await run_blocking(
+        "db", _parse_batch_request, table_name, value_columns, model_types, data_transforms
+    )
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            data, column_transform, transformed_data, total_count = await run_blocking(
+                "db", _read_batch_page, table_name, limit, offset, start_date, end_date,
+                include_count, version, transform, extra_transforms
+            )
+        except HTTPException as e:
+            yield encode_sse("error", {"status_code": e.status_code, "detail": e.detail})
+            return
+        except Exception as e:
+            yield encode_sse("error", {
+                "status_code": 500,
+                "detail": f"Error retrieving data from PostgreSQL: {str(e)}"
+            })
+            return
+
+        # Forecasts start before the page is sent
+        jobs = {
+            asyncio.wrap_future(submit(
+                "inference", _run_forecast_job, table_name, data, model, column, forecast_periods,
+                column_transform, live, background_tasks, interval_level
+            )): (column, model)
+            for column in columns for model in models
+        }
+        data_event = {
+            "data": data,
+            "total_count": total_count,
+            "table_name": table_name,
+            "limit": limit,
+            "offset": offset,
+            "forecast_periods": forecast_periods,
+            "value_columns": columns,
+            "model_types": models,
+            "data_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        if transformed_data:
+            data_event["transformed_data"] = transformed_data
+        yield encode_sse("data", data_event)
+
+        finished = []
+        pending = set(jobs)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for job in done:
+                    column, model = jobs[job]
+                    entry = job.result()
+                    finished.append((column, model, entry))
+                    yield encode_sse("forecast", {
+                        "value_column": column,
+                        "model_type": model,
+                        **entry,
+                        "forecast": [
+                            {k: v for k, v in item.items() if k != "confidence_interval"}
+                            for item in entry["forecast"]
+                        ]
+                    })
+        finally:
+            # Client went away: drop the jobs that have not started
+            for job in pending:
+                job.cancel()
+
+        for column, model, entry in finished:
+            if entry["forecast"]:
+                yield encode_sse("intervals", {
+                    "value_column": column,
+                    "model_type": model,
+                    "interval_level": interval_level,
+                    "intervals": [
+                        {"date": item["date"], "period": item["period"], **item["confidence_interval"]}
+                        for item in entry["forecast"]
+                    ]
+                })
+        yield encode_sse("done", {"total_ms": round((time.perf_counter() - started) * 1000, 2)})
+
+    return StreamingResponse(
+        events(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks
+    )
+
+@router.get("/coefficients")
+@offload("db")
+def get_scenario_coefficients(
+    version: Optional[int] = Query(None, ge=0, description="Stored version (default: the current one)")
+) -> Any:
+    """Monthly coefficients of the empirical forecast and the stored versions."""
+    try:
+        coefficients = scenario_coefficients.get(version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    try:
+        versions = scenario_coefficients.list_versions()
+    except Exception as e:
+        logger.warning(f"Could not list scenario coefficient versions: {str(e)}")
+        versions = []
+    return {
+        "message": "Scenario coefficients retrieved successfully",
+        **coefficients.to_dict(),
+        "versions": versions
+    }
+
+@router.post("/coefficients")
+@offload("db")
+def save_scenario_coefficients(body: ScenarioCoefficientsRequest) -> Any:
+    """Store monthly coefficients as a new version used by empirical forecasts from now on."""
+    try:
+        coefficients = scenario_coefficients.save(body.coefficients)
+        return {
+            "message": "Scenario coefficients saved successfully",
+            **coefficients.to_dict()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error saving scenario coefficients: {str(e)}"
+        )
+
+@router.post("/scenarios")
+@offload("inference")
+def get_scenario_prices(body: ScenarioPricesRequest) -> Any:
+    """
+    Bajista/conservador/alza prices of many base prices over a horizon.
+    
+    All scenarios are one vectorized evaluation; each path is returned as
+    an array per base price (rows follow base_prices).
+    """
+    try:
+        coefficients = scenario_coefficients.get(body.version)
+        start = np.datetime64(body.start_date, 'D') if body.start_date else \
+            np.datetime64(datetime.now().date(), 'D') + 7
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    dates = start + np.arange(body.periods) * 7
+    paths = coefficients.scenario_paths(body.base_prices, dates)
+    return {
+        "message": "Scenario prices calculated successfully",
+        "version": coefficients.version,
+        "dates": dates.astype(str).tolist(),
+        **{name: path.tolist() for name, path in paths.items()}
+    }
+
+@router.get("/accuracy")
+@offload("db")
+def get_forecast_accuracy(
+    table_name: str = Query("precios_materiales", description="Name of the table"),
+    window_days: int = Query(90, ge=1, le=3650, description="Rolling window of target dates, in days"),
+    value_column: Optional[str] = Query(None, description="Only this forecasted column"),
+    model_type: Optional[str] = Query(None, pattern=f"^({'|'.join(FORECAST_MODEL_TYPES)})$",
+                                      description="Only this model type"),
+    by_version: bool = Query(False, description="Also break results down by model version")
+) -> Any:
+    """
+    Rolling MAE and MAPE of served forecasts per model and horizon.
+    
+    Every forecast served by /forecast (and every materialized one) is
+    recorded in the forecast ledger and scored once the prices of its
+    target weeks are loaded (the series store scores on every reload; see
+    POST /accuracy/score). Empirical forecasts are scored on their base
+    column (scrap_mxn). This endpoint only reads the scored rows.
+    """
+    try:
+        table_catalog.require_series_table(table_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        accuracy = forecast_ledger.accuracy(
+            table_name, window_days, value_column=value_column,
+            model_type=model_type, by_version=by_version
+        )
+        return {
+            "message": "Forecast accuracy retrieved successfully",
+            "table_name": table_name,
+            "window_days": window_days,
+            **accuracy
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving forecast accuracy: {str(e)}"
+        )
+
+@router.post("/accuracy/score")
+@offload("db")
+def score_forecast_ledger(
+    table_name: str = Query("precios_materiales", description="Name of the table")
+) -> Any:
+    """Score pending ledger rows now (e.g. after loading prices outside the API)."""
+    try:
+        table_catalog.require_series_table(table_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        return {
+            "message": "Forecast ledger scored successfully",
+            "table_name": table_name,
+            **forecast_ledger.score(table_name)
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error scoring forecast ledger: {str(e)}"
+        )
+
+@router.get("/cache")
+async def get_forecast_cache_stats() -> Any:
+    """Hit/miss counters and memory usage of the forecast result and model caches, and coalesced requests."""
+    return {
+        "message": "Forecast cache statistics retrieved successfully",
+        **forecast_cache.stats(),
+        "model_cache": model_cache.stats(),
+        "intervals": interval_engine.stats(),
+        "single_flight": {
+            "forecasts": forecast_flight.stats(),
+            "pages": page_flight.stats()
+        }
+    }
+
+@router.post("/materialized/refresh")
+@offload("inference")
+def refresh_materialized_forecasts(
+    table_name: str = Query(..., description="Table whose trained models should be re-forecast")
+) -> Any:
+    """
+    Recompute the stored forecasts of every trained LSTM of a table.
+    
+    Call this after loading prices (e.g. from the ETL scripts) so the next
+    /forecast request is a single indexed lookup.
+    """
+    try:
+        table_catalog.require_series_table(table_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        dataset_versions.invalidate(table_name)
+        results = materialized_forecasts.refresh_table(table_name, force=True)
+        return {
+            "message": "Materialized forecasts refreshed successfully",
+            "table_name": table_name,
+            "results": results
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error refreshing materialized forecasts: {str(e)}"
+        )
+
+@router.delete("/cache")
+async def clear_forecast_cache(
+    table_name: Optional[str] = Query(None, description="Only clear forecasts of this table")
+) -> Any:
+    """Drop cached forecasts (e.g. after loading prices outside the API)."""
+    removed = forecast_cache.invalidate(table_name)
+    dataset_versions.invalidate(table_name)
+    return {
+        "message": "Forecast cache cleared successfully",
+        "removed": removed
+    }
+
+def _parse_batch_request(table_name: str, value_columns: str, model_types: str,
+                         data_transforms: Optional[str]) -> Tuple[str, List[str], List[str], List[str]]:
+    """
+    Validate the table and the comma separated lists of /batch and /stream.
+    
+    Returns:
+        Tuple of (dataset version, columns, models, extra transforms)
+    
+    Raises:
+        HTTPException: 404 for an unknown table, 400 for invalid lists
+    """
+    try:
+        table_info = table_catalog.require_series_table(table_name)
+        version = dataset_versions.get(table_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving data from PostgreSQL: {str(e)}"
+        )
+
+    columns = [c.strip() for c in value_columns.split(",") if c.strip()]
+    models = [m.strip().lower() for m in model_types.split(",") if m.strip()]
+    extra_transforms = [t.strip() for t in (data_transforms or "").split(",") if t.strip()]
+    unknown = [c for c in columns if c not in table_info.columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Column(s) {', '.join(unknown)} not found in table '{table_name}'"
+        )
+    invalid = [m for m in models if m not in FORECAST_MODEL_TYPES] + \
+              [t for t in extra_transforms if t not in TRANSFORMS]
+    if invalid or not columns or not models:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid value_columns, model_types or data_transforms: {', '.join(invalid) or 'empty list'}"
+        )
+    if len(columns) * len(models) > BATCH_MAX_JOBS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_MAX_JOBS} column/model combinations per request"
+        )
+
+    return version, columns, models, extra_transforms
+
+def _read_batch_page(table_name: str, limit: int, offset: int, start_date: Optional[str],
+                     end_date: Optional[str], include_count: bool, version: str, transform: str,
+                     extra_transforms: List[str]) -> Tuple[List[Dict], ColumnTransform, Dict[str, List[Dict]], Optional[int]]:
+    """
+    Read a page once and transform it for /batch and /stream.
+    
+    Returns:
+        Tuple of (data under `transform`, its fitted ColumnTransform, data
+        under each extra transform, total_count)
+    
+    Raises:
+        HTTPException: 404 if the page is empty
+    """
+    (rows, total_count), _ = page_flight.do(
+        (table_name, limit, offset, start_date, end_date, include_count, version),
+        lambda: _fetch_series_page(table_name, limit, offset, start_date, end_date, include_count)
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found or no data available")
+
+    data, column_transform = transform_records(
+        [dict(row) for row in rows], transform, exclude=NON_VALUE_COLUMNS
+    )
+    transformed_data = {
+        name: transform_records([dict(row) for row in rows], name, exclude=NON_VALUE_COLUMNS)[0]
+        for name in extra_transforms
+    }
+    return data, column_transform, transformed_data, total_count
+
+def _run_forecast_job(table_name: str, data: List[Dict], model_type: str, value_column: str,
+                      forecast_periods: int, column_transform: ColumnTransform, live: bool,
+                      background_tasks: BackgroundTasks, interval_level: float) -> Dict[str, Any]:
+    """One column/model forecast of a batch; failures are reported in the entry."""
+    job_started = time.perf_counter()
+    try:
+        forecast = _forecast_for_model(
+            table_name, data, model_type, value_column, forecast_periods, column_transform,
+            live, background_tasks, interval_level
+        )
+        entry = {"forecast": forecast}
+    except HTTPException as e:
+        entry = {"forecast": [], "error": e.detail}
+    except Exception as e:
+        logger.warning(f"Batch forecast {table_name}.{value_column} ({model_type}) failed: {str(e)}")
+        entry = {"forecast": [], "error": str(e)}
+    entry["elapsed_ms"] = round((time.perf_counter() - job_started) * 1000, 2)
+    return entry
+
+def _empirical_base_column(data: List[Dict], value_column: str) -> str:
+    """Column the empirical forecast is built from (scrap_mxn when present)"""
+    return 'scrap_mxn' if data and 'scrap_mxn' in data[0] else value_column
+
+def _forecast_for_model(table_name: str, data: List[Dict], model_type: str, value_column: str,
+                        forecast_periods: int, column_transform: ColumnTransform,
+                        live: bool, background_tasks: BackgroundTasks,
+                        interval_level: float = settings.FORECAST_INTERVAL_LEVEL) -> List[Dict]:
+    """
+    Forecast one column with one model from an already fetched (and transformed) page.
+    
+    LSTM forecasts are read from forecasts_materialized unless live is set
+    or nothing current is stored (then one refresh of the table is queued on
+    the inference pool), and fall back to the empirical forecast when no
+    trained model exists. Stored forecasts use the default interval level,
+    so other levels are computed live. An 'lstm' request is served by a
+    direct multi-horizon model when one covers the horizon (see
+    ForecastService.select_model).
+    
+    The served point forecasts are added to the forecast ledger on
+    background_tasks.
+    """
+    model_version = None
+    if model_type in TRAINED_LSTM_TYPES:
+        model_type, model_version = forecast_service.select_model(
+            table_name, model_type, value_column, forecast_periods
+        )
+    forecast_data = None
+
+    if model_type in TRAINED_LSTM_TYPES:
+        logger.debug("Calculating LSTM forecast")
+        if not live and model_version is not None and interval_level == settings.FORECAST_INTERVAL_LEVEL:
+            try:
+                forecast_data = materialized_forecasts.lookup(
+                    table_name, value_column, model_type, forecast_periods
+                )
+            except Exception as e:
+                logger.warning(f"Could not read materialized forecast: {str(e)}")
+            if forecast_data is None:
+                materialized_forecasts.refresh_table_async(table_name)
+        if forecast_data is None:
+            try:
+                # Try to use trained model
+                forecast_data = forecast_service.generate_forecast(
+                    table_name=table_name,
+                    model_type=model_type,
+                    value_column=value_column,
+                    forecast_periods=forecast_periods,
+                    version=model_version,
+                    interval_level=interval_level
+                )
+            except (ValueError, FileNotFoundError) as e:
+                # Fallback to simple linear if model not found
+                logger.warning(f"Trained model not found, using simple linear: {str(e)}")
+                model_type = "empirical"
+
+    if model_type == "empirical":
+        logger.debug("Calculating empirical forecast")
+        forecast_data = calculate_empirical_forecast(data, forecast_periods, value_column, column_transform,
+                                                     interval_level=interval_level)
+        # Scored against the base column with the coefficients version it used
+        value_column = _empirical_base_column(data, value_column)
+        model_version = f"coefficients-{scenario_coefficients.get().version}"
+    elif forecast_data is None:
+        forecast_data = calculate_simple_forecast(data, forecast_periods, value_column, column_transform,
+                                                  interval_level)
+
+    background_tasks.add_task(
+        forecast_ledger.record, table_name, value_column, model_type, model_version, forecast_data
+    )
+    return forecast_data
+
+def _fetch_series_page(table_name: str, limit: int, offset: int,
+                       start_date: Optional[str], end_date: Optional[str],
+                       include_count: bool = True) -> Tuple[List[Dict], Optional[int]]:
+    """
+    Fetch one page of rows (newest first) and the filtered row count.
+    
+    Tables held by the shared series store are served from memory, where the
+    count is the length of the date slice. Any other table is queried
+    directly and the count comes back in the same query as
+    COUNT(*) OVER (), so there is no second scan.
+    """
+    if series_store.handles(table_name):
+        snapshot = series_store.get()
+        sl = snapshot.date_slice(start_date, end_date)
+        data = snapshot.to_records(sl, newest_first=True, limit=limit, offset=offset)
+        return data, (sl.stop - sl.start) if include_count else None
+
+    table_info = table_catalog.require_series_table(table_name)
+    with get_database_connection() as conn:
+        # Build the base query
+        base_query = table_info.select_all_counted if include_count else table_info.select_all
+        where_conditions = []
+        params = {}
+        
+        # Add date filters if provided
+        if start_date:
+            where_conditions.append("Date >= :start_date")
+            params['start_date'] = start_date
+        if end_date:
+            where_conditions.append("Date <= :end_date")
+            params['end_date'] = end_date
+        
+        # Add WHERE clause if there are conditions
+        if where_conditions:
+            base_query += " WHERE " + " AND ".join(where_conditions)
+        
+        # Add pagination
+        base_query += " ORDER BY Date DESC LIMIT :limit OFFSET :offset"
+        params['limit'] = limit
+        params['offset'] = offset
+        
+        # Execute the query
+        result = conn.execute(text(base_query), params)
+        data = [dict(row._mapping) for row in result]
+        
+        total_count = None
+        if include_count:
+            total_count = data[0]['_total_count'] if data else 0
+            for item in data:
+                del item['_total_count']
+        
+        return data, total_count
+
+def calculate_simple_forecast(data: List[Dict], periods: int, value_column: str,
+                              column_transform: Optional[ColumnTransform] = None,
+                              interval_level: float = settings.FORECAST_INTERVAL_LEVEL) -> List[Dict]:
+    """
+    Calculate simple linear regression forecast (fallback method).
+    
+    If `data` was transformed, the fitted regression is mapped back to
+    original units with `column_transform` before the scenarios are built.
+    confidence_interval resamples the regression residuals (errors around
+    the trend do not accumulate).
+    """
     if not data:
         return []
     
@@ -191,19 +859,28 @@ def calculate_simple_forecast(data: List[Dict], periods: int, value_column: str)
     # Make predictions
     future_X = np.array(future_days).reshape(-1, 1)
     predictions = model.predict(future_X)
+    offsets = interval_engine.offsets(
+        y - model.predict(X), periods, interval_quantiles(interval_level), cumulative=False
+    )
+    lower, upper = predictions + offsets[0], predictions + offsets[1]
+    if column_transform is not None:
+        predictions = column_transform.inverse(predictions, value_column)
+        lower = column_transform.inverse(lower, value_column)
+        upper = column_transform.inverse(upper, value_column)
     
     # Create forecast data structure
     forecast_data = []
-    for i, (date, prediction) in enumerate(zip(future_dates, predictions)):
+    for i, (date, prediction, low, high) in enumerate(zip(future_dates, predictions, lower, upper)):
         forecast_data.append({
             'date': date.strftime('%Y-%m-%d'),
             'period': i + 1,
+            'predicted_value': float(prediction),
             'predicted_value_bajista': float(prediction) * 2 / 0.95,  #( .95 bajista , .93 conservador .90  alza ) 
             'predicted_value_conservador': float(prediction) * 2 / 0.93,
             'predicted_value_alza': float(prediction) *2 / 0.90,
             'confidence_interval': {
-                'lower': float(prediction * 0.9),
-                'upper': float(prediction * 1.1)
+                'lower': float(low),
+                'upper': float(high)
             }
         })
     
@@ -211,8 +888,19 @@ def calculate_simple_forecast(data: List[Dict], periods: int, value_column: str)
 
 
 # rename the function
-def calculate_empirical_forecast(data: List[Dict], periods: int, value_column: str) -> List[Dict]:
-    # replace the regression part with this empirical logic (keep your date handling)
+def calculate_empirical_forecast(data: List[Dict], periods: int, value_column: str,
+                                 column_transform: Optional[ColumnTransform] = None,
+                                 coefficients: Optional[CoefficientSet] = None,
+                                 interval_level: float = settings.FORECAST_INTERVAL_LEVEL) -> List[Dict]:
+    """
+    Scenario forecast from the last price and the monthly coefficients.
+    
+    Every horizon's bajista/conservador/alza prices come from one vectorized
+    CoefficientSet.scenario_paths call; `coefficients` defaults to the
+    current stored version. confidence_interval bounds the conservador path
+    with bootstrapped weekly changes of the base price. predicted_value is
+    the base price carried forward (a naive forecast of the base column).
+    """
     
     df = pd.DataFrame(data)
 
@@ -220,54 +908,48 @@ def calculate_empirical_forecast(data: List[Dict], periods: int, value_column: s
     if date_col not in df.columns:
         raise HTTPException(status_code=400, detail=f"Required column '{date_col}' not found in data")
 
-    base_col = 'scrap_mxn' if 'scrap_mxn' in df.columns else value_column  # add (use scrap_mxn for the empirical formula)
+    base_col = _empirical_base_column(data, value_column)  # use scrap_mxn for the empirical formula
     if base_col not in df.columns:
         raise HTTPException(status_code=400, detail=f"Required column '{base_col}' not found in data")
 
     df[date_col] = pd.to_datetime(df[date_col])
     df = df.sort_values(date_col)
 
-    last_val = df[base_col].dropna().iloc[-1]  
+    base_values = df[base_col].dropna().to_numpy(dtype=np.float64)
+    if column_transform is not None:
+        base_values = column_transform.inverse(base_values, base_col)
+    last_val = base_values[-1]
     base_price = float(last_val) * 2.0     
 
-    MONTHLY_COEFS = {
-        (2026, 2): 0.7929,
-        (2026, 3): 0.7889,
-        (2026, 4): 0.7913,
-        (2026, 5): 0.8094,
-        (2026, 6): 0.8162,
-        (2026, 7): 0.8464,
-        (2026, 8): 0.8549,
-    }    
+    if coefficients is None:
+        coefficients = scenario_coefficients.get()
 
     day_interval = 7
-    last_date = df[date_col].max()
-    future_dates = [last_date + timedelta(days=i*day_interval) for i in range(1, periods + 1)]
+    last_date = np.datetime64(df[date_col].max().date(), 'D')
+    future_dates = last_date + np.arange(1, periods + 1) * day_interval
+    paths = {name: path[0].tolist() for name, path in coefficients.scenario_paths([base_price], future_dates).items()}
+    if len(base_values) > 1:
+        offsets = interval_engine.offsets(np.diff(base_values), periods, interval_quantiles(interval_level))
+        coefs = coefficients.lookup(future_dates)
+        lower = ((last_val + offsets[0]) * 2.0 / coefs).tolist()
+        upper = ((last_val + offsets[1]) * 2.0 / coefs).tolist()
+    else:
+        lower = [c * 0.9 for c in paths['conservador']]
+        upper = [c * 1.1 for c in paths['conservador']]
 
     forecast_data = []
-    for i, date in enumerate(future_dates):
-        coef = MONTHLY_COEFS.get((date.year, date.month), list(MONTHLY_COEFS.values())[-1])
-        
-        if i == 0:
-            coef_bajista = coef
-            coef_alza = coef
-        else:
-            coef_bajista = coef * 0.98
-            coef_alza = coef * 1.02
-
-        conservador = base_price / coef
-        bajista = base_price / coef_bajista
-        alza = base_price / coef_alza
-
+    for i, (date, bajista, conservador, alza, low, high) in enumerate(zip(
+            future_dates.astype(str), paths['bajista'], paths['conservador'], paths['alza'], lower, upper)):
         forecast_data.append({
-            'date': date.strftime('%Y-%m-%d'),
+            'date': date,
             'period': i + 1,
-            'predicted_value_bajista': float(bajista),
-            'predicted_value_conservador': float(conservador),
-            'predicted_value_alza': float(alza),
+            'predicted_value': float(last_val),
+            'predicted_value_bajista': bajista,
+            'predicted_value_conservador': conservador,
+            'predicted_value_alza': alza,
             'confidence_interval': {
-                'lower': float(conservador * 0.9),
-                'upper': float(conservador * 1.1)
+                'lower': low,
+                'upper': high
             }
         })
 
@@ -1,11 +1,29 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional, Tuple
 from pydantic import BaseModel
+from app.core.config import settings
 from app.core.database import get_database_connection
+from app.core.executors import offload
+from app.core.http_cache import make_etag, not_modified_response, set_cache_headers
+from app.services.dataset_versions import dataset_versions
 import pandas as pd
 
 router = APIRouter()
 
+def _check_location_cache(request: Request, *tables: str) -> Tuple[Optional[str], Optional[Response]]:
+    """
+    Build the ETag for a location lookup and check the client's copy.
+    
+    Returns:
+        Tuple of (etag, 304 response or None). etag is None when the tables'
+        version cannot be read; the lookup is then served without caching.
+    """
+    version = dataset_versions.combined_or_none(*tables)
+    if version is None:
+        return None, None
+    etag = make_etag(request, version)
+    return etag, not_modified_response(request, etag, max_age=settings.HTTP_CACHE_STATIC_MAX_AGE)
+
 # Response Models
 class Region(BaseModel):
     id: int
@@ -32,11 +50,16 @@ class MunicipalityBasic(BaseModel):
     cp_fin: str
 
 @router.get("/regions", response_model=List[Region])
-async def get_regions():
+@offload("db")
+def get_regions(request: Request, response: Response):
     """
     Get all regions
     """
     try:
+        etag, not_modified = _check_location_cache(request, 'regiones')
+        if not_modified is not None:
+            return not_modified
+        
         with get_database_connection() as conn:
             query = """
                 SELECT id, estado_id, nombre
@@ -48,17 +71,24 @@ async def get_regions():
             if df.empty:
                 return []
             
+            if etag:
+                set_cache_headers(response, etag, max_age=settings.HTTP_CACHE_STATIC_MAX_AGE)
             return df.to_dict('records')
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching regions: {str(e)}")
 
 @router.get("/regions/{region_id}/municipalities", response_model=List[MunicipalityBasic])
-async def get_municipalities_by_region(region_id: int):
+@offload("db")
+def get_municipalities_by_region(region_id: int, request: Request, response: Response):
     """
     Get all municipalities for a specific region
     """
     try:
+        etag, not_modified = _check_location_cache(request, 'municipios')
+        if not_modified is not None:
+            return not_modified
+        
         with get_database_connection() as conn:
             query = """
                 SELECT id, nombre, cp_inicio, cp_fin
@@ -71,6 +101,8 @@ async def get_municipalities_by_region(region_id: int):
             if df.empty:
                 raise HTTPException(status_code=404, detail=f"No municipalities found for region {region_id}")
             
+            if etag:
+                set_cache_headers(response, etag, max_age=settings.HTTP_CACHE_STATIC_MAX_AGE)
             return df.to_dict('records')
         
     except HTTPException:
@@ -79,11 +111,16 @@ async def get_municipalities_by_region(region_id: int):
         raise HTTPException(status_code=500, detail=f"Error fetching municipalities: {str(e)}")
 
 @router.get("/municipalities/search", response_model=List[MunicipalityBasic])
-async def search_municipalities(query: str):
+@offload("db")
+def search_municipalities(query: str, request: Request, response: Response):
     """
     Search municipalities by name
     """
     try:
+        etag, not_modified = _check_location_cache(request, 'municipios')
+        if not_modified is not None:
+            return not_modified
+        
         with get_database_connection() as conn:
             sql_query = """
                 SELECT id, nombre, cp_inicio, cp_fin
@@ -97,17 +134,24 @@ async def search_municipalities(query: str):
             if df.empty:
                 return []
             
+            if etag:
+                set_cache_headers(response, etag, max_age=settings.HTTP_CACHE_STATIC_MAX_AGE)
             return df.to_dict('records')
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching municipalities: {str(e)}")
 
 @router.get("/municipalities/{cp}/validate")
-async def validate_postal_code(cp: str):
+@offload("db")
+def validate_postal_code(cp: str, request: Request, response: Response):
     """
     Validate if a postal code exists and return municipality info
     """
     try:
+        etag, not_modified = _check_location_cache(request, 'municipios', 'regiones')
+        if not_modified is not None:
+            return not_modified
+        
         with get_database_connection() as conn:
             query = """
                 SELECT m.id, m.nombre, m.cp_inicio, m.cp_fin, 
@@ -122,6 +166,8 @@ async def validate_postal_code(cp: str):
             if df.empty:
                 raise HTTPException(status_code=404, detail=f"Postal code {cp} not found in any municipality")
             
+            if etag:
+                set_cache_headers(response, etag, max_age=settings.HTTP_CACHE_STATIC_MAX_AGE)
             return df.to_dict('records')[0]
         
     except HTTPException:
@@ -1,7 +1,12 @@
 from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import text
+from app.core.config import settings
 from app.core.database import get_database_connection
+from app.core.executors import offload
+from app.core.http_cache import make_etag, not_modified_response, set_cache_headers
+from app.services.dataset_versions import dataset_versions
+from app.services.series_store import series_store
 import logging
 import pandas as pd
 import numpy as np
@@ -229,7 +234,8 @@ class CotizacionesCountResponse(BaseModel):
 # =============================================
 
 @router.post("/calcular-envio", response_model=ShippingCalculationResponse)
-async def calcular_envio(
+@offload("db")
+def calcular_envio(
     request: ShippingCalculationRequest,
     #current_user: Optional[FirebaseUser] = Depends(get_current_user),
     #x_session_id: Optional[str] = Header(None)
@@ -248,28 +254,12 @@ async def calcular_envio(
     conn = get_database_connection()
     
     try:
-        # 1. Get latest market prices
-        cursor = conn.execute(
-            text("""
-                SELECT 
-                    id, date, year,
-                    scrap, gas, rebar, hrcc1,
-                    scrap_mxn, gas_mxn, rebar_mxn, hrcc1_mxn,
-                    tipo_de_cambio,
-                    varilla_distribuidor, varilla_credito, precio_mercado
-                FROM precios_materiales 
-                ORDER BY date DESC 
-                LIMIT 1;
-            """)
-        )
-        precios_row = cursor.fetchone()
-        
-        if not precios_row:
+        # 1. Get latest market prices (served from the shared in-memory store)
+        try:
+            precios = series_store.get().latest()
+        except ValueError:
             raise HTTPException(status_code=404, detail="No hay precios disponibles en el sistema")
         
-        # Convert to dict
-        precios = dict(precios_row._mapping)
-        
         # 2. Find municipality by postal code
         cursor = conn.execute(
             text("""
@@ -391,7 +381,8 @@ async def calcular_envio(
         conn.close()
 
 @router.get("/total", response_model=CotizacionesCountResponse)
-async def get_cotizaciones_count(
+@offload("db")
+def get_cotizaciones_count(
     firebase_uid: Optional[str] = Query(None),
     usuario_id: Optional[int] = Query(None),
     session_id: Optional[str] = Query(None),
@@ -429,13 +420,23 @@ async def get_cotizaciones_count(
         conn.close()
 
 @router.get("/codigo-postal/{codigo_postal}")
-async def get_location_info(codigo_postal: str):
+@offload("db")
+def get_location_info(codigo_postal: str, request: Request, response: Response):
     """
     Get location information for a postal code
     """
     if len(codigo_postal) != 5:
         raise HTTPException(status_code=400, detail="Código postal debe tener 5 dígitos")
     
+    max_age = settings.HTTP_CACHE_STATIC_MAX_AGE
+    # Without a version (e.g. a table missing from the catalog) the lookup is served uncached
+    version = dataset_versions.combined_or_none('municipios', 'regiones', 'estados')
+    etag = make_etag(request, version) if version is not None else None
+    if etag:
+        not_modified = not_modified_response(request, etag, max_age=max_age)
+        if not_modified is not None:
+            return not_modified
+    
     conn = get_database_connection()
     
     try:
@@ -469,6 +470,8 @@ async def get_location_info(codigo_postal: str):
             )
         
         data = dict(result._mapping)
+        if etag:
+            set_cache_headers(response, etag, max_age=max_age)
         return {
             "municipio": data['municipio'],
             "region": data['region'],
@@ -1,8 +1,9 @@
-from typing import Any, Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import Any, List, Optional
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 import uuid
 
+from app.core.executors import run_blocking, submit
 from app.services.training_service import TrainingService
 
 router = APIRouter()
@@ -16,13 +17,26 @@ class TrainingRequest(BaseModel):
     """Request model for training endpoint"""
     table_name: str = Field(..., description="Name of the table in PostgreSQL")
     model_type: str = Field(..., description="Type of model to train", 
-                           pattern="^(lstm|arima|mcmc|simple_linear)$")
+                           pattern="^(lstm|lstm_direct|arima|mcmc|simple_linear)$")
     value_column: str = Field(..., description="Name of the column to forecast")
     start_date: Optional[str] = Field(None, description="Start date filter (YYYY-MM-DD)")
     end_date: Optional[str] = Field(None, description="End date filter (YYYY-MM-DD)")
     model_params: Optional[dict] = Field(None, description="Model-specific hyperparameters")
 
 
+class BacktestRequest(BaseModel):
+    """Request model for the walk-forward backtest endpoint"""
+    table_name: str = Field(..., description="Name of the table in PostgreSQL")
+    model_type: str = Field(..., description="Type of model to backtest", pattern="^(lstm|lstm_direct)$")
+    value_column: str = Field(..., description="Name of the column to forecast")
+    horizon: int = Field(12, ge=1, le=104, description="Periods forecast after each origin")
+    origins: Optional[List[str]] = Field(None, description="Last training date of each fold (YYYY-MM-DD)")
+    folds: int = Field(4, ge=1, le=52, description="Number of rolling origins when origins is not given")
+    start_date: Optional[str] = Field(None, description="Start date filter (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(None, description="End date filter (YYYY-MM-DD)")
+    model_params: Optional[dict] = Field(None, description="Model-specific hyperparameters")
+
+
 class TrainingResponse(BaseModel):
     """Response model for training endpoint"""
     success: bool
@@ -54,18 +68,34 @@ def _train_model_async(job_id: str, request: TrainingRequest):
         }
 
 
+def _backtest_model_async(job_id: str, request: BacktestRequest):
+    """Background task for a walk-forward backtest"""
+    try:
+        result = training_service.backtest_model(**request.dict())
+        training_jobs[job_id] = {
+            'status': 'completed',
+            'result': result
+        }
+    except Exception as e:
+        training_jobs[job_id] = {
+            'status': 'failed',
+            'error': str(e)
+        }
+
+
 @router.post("/train")
 async def train_model(
     request: TrainingRequest,
-    background_tasks: BackgroundTasks,
     async_mode: bool = True
 ) -> TrainingResponse:
     """
     Train a forecasting model on data from the database.
     
+    Training runs on the "analysis" pool (ANALYSIS_MAX_WORKERS jobs at a
+    time), never on the event loop.
+    
     Args:
         request: Training request with table_name, model_type, value_column, etc.
-        background_tasks: FastAPI background tasks
         async_mode: If True, run training in background (default: True)
     
     Returns:
@@ -77,15 +107,15 @@ async def train_model(
             job_id = str(uuid.uuid4())
             print(job_id)
             
-            # Start background task
-            background_tasks.add_task(_train_model_async, job_id, request)
-            
             # Initialize job status
             training_jobs[job_id] = {
                 'status': 'running',
                 'request': request.dict()
             }
             
+            # Queue the job on the training pool
+            submit("analysis", _train_model_async, job_id, request)
+            
             return TrainingResponse(
                 success=True,
                 message="Training started in background",
@@ -93,7 +123,9 @@ async def train_model(
             )
         else:
             # Synchronous training
-            result = training_service.train_model(
+            result = await run_blocking(
+                "analysis",
+                training_service.train_model,
                 table_name=request.table_name,
                 model_type=request.model_type,
                 value_column=request.value_column,
@@ -116,6 +148,49 @@ async def train_model(
         )
 
 
+@router.post("/backtest")
+async def backtest_model(
+    request: BacktestRequest,
+    async_mode: bool = True
+) -> Any:
+    """
+    Walk-forward backtest of a model type over rolling origins.
+    
+    Each fold trains a fresh model on the data up to its origin and
+    forecasts the next `horizon` periods. Folds run in BACKTEST_MAX_WORKERS
+    worker processes; the job itself holds one "analysis" slot. Results
+    are cached per model configuration and dataset version.
+    
+    Returns:
+        job_id to poll on /status/{job_id} (if async), or the per-fold and
+        pooled metrics
+    """
+    try:
+        if async_mode:
+            job_id = str(uuid.uuid4())
+            training_jobs[job_id] = {
+                'status': 'running',
+                'request': request.dict()
+            }
+            submit("analysis", _backtest_model_async, job_id, request)
+            return {
+                "success": True,
+                "message": "Backtest started in background",
+                "job_id": job_id
+            }
+        result = await run_blocking("analysis", training_service.backtest_model, **request.dict())
+        return {
+            "success": True,
+            "message": "Backtest completed successfully",
+            "result": result
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error backtesting model: {str(e)}"
+        )
+
+
 @router.get("/status/{job_id}")
 async def get_training_status(job_id: str) -> dict:
     """Get the status of an async training job"""
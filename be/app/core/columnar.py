@@ -0,0 +1,116 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List
+import numpy as np
+
+# Arrow is optional: only needed for format=arrow responses
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+    pa = None
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _flatten_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one level of nested dicts (e.g. confidence_interval -> confidence_interval_lower)."""
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[f"{key}_{sub_key}"] = sub_value
+        else:
+            flat[key] = value
+    return flat
+
+
+def _to_array(values: List[Any]) -> np.ndarray:
+    """Convert one column of Python values to the tightest NumPy array."""
+    sample = next((v for v in values if v is not None), None)
+    if sample is None:
+        return np.full(len(values), np.nan)
+    if isinstance(sample, (date, datetime)):
+        unit = "s" if isinstance(sample, datetime) else "D"
+        return np.array(values, dtype=f"datetime64[{unit}]")
+    if isinstance(sample, (bool, np.bool_)):
+        return np.array(values, dtype=object)
+    if all(isinstance(v, (int, np.integer)) for v in values):
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    if isinstance(sample, (int, float, Decimal, np.number)):
+        try:
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+    return np.array(values, dtype=object)
+
+
+def records_to_columns(records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Transpose a list of row dicts into one NumPy array per column.
+
+    Args:
+        records: Rows as dictionaries (nested dicts are flattened one level)
+
+    Returns:
+        Ordered dict of column name -> array
+    """
+    if not records:
+        return {}
+    flat = [_flatten_record(r) for r in records]
+    keys = list(flat[0].keys())
+    for record in flat[1:]:
+        for key in record:
+            if key not in keys:
+                keys.append(key)
+    return {key: _to_array([r.get(key) for r in flat]) for key in keys}
+
+
+def columns_to_json(columns: Dict[str, np.ndarray]) -> Dict[str, List[Any]]:
+    """
+    Convert column arrays to JSON-ready lists.
+
+    Dates become ISO strings and NaN becomes null; the conversion is done per
+    array rather than per value.
+    """
+    out = {}
+    for key, arr in columns.items():
+        if np.issubdtype(arr.dtype, np.datetime64):
+            out[key] = np.datetime_as_string(arr, unit="D" if arr.dtype == "datetime64[D]" else "s").tolist()
+        elif np.issubdtype(arr.dtype, np.floating):
+            nan_mask = np.isnan(arr)
+            if nan_mask.any():
+                values = arr.astype(object)
+                values[nan_mask] = None
+                out[key] = values.tolist()
+            else:
+                out[key] = arr.tolist()
+        else:
+            out[key] = arr.tolist()
+    return out
+
+
+def columns_to_arrow(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    Serialize column arrays as an Arrow IPC stream.
+
+    Raises:
+        ValueError: If pyarrow is not installed
+    """
+    if not ARROW_AVAILABLE:
+        raise ValueError("Arrow output is not available. pyarrow is not installed.")
+    arrays = []
+    for arr in columns.values():
+        if arr.dtype == object:
+            arrays.append(pa.array(arr.tolist(), from_pandas=True))
+        else:
+            arrays.append(pa.array(arr, from_pandas=True))
+    table = pa.Table.from_arrays(arrays, names=list(columns.keys()))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
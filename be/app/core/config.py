@@ -40,6 +40,31 @@ class Settings(BaseSettings):
     ENVIRONMENT: str
     DEBUG: bool = True
 
+    # HTTP caching (Cache-Control max-age, seconds)
+    HTTP_CACHE_MAX_AGE: int = 300
+    HTTP_CACHE_STATIC_MAX_AGE: int = 86400
+
+    # Memory cap of the in-process forecast result cache (MB)
+    FORECAST_CACHE_MAX_MB: int = 32
+
+    # Memory budget for trained models kept loaded between requests (MB)
+    MODEL_CACHE_MAX_MB: int = 512
+
+    # Periods stored per model in forecasts_materialized
+    FORECAST_MATERIALIZED_HORIZON: int = 52
+
+    # Prediction intervals: simulated bootstrap paths and default central level
+    FORECAST_INTERVAL_PATHS: int = 2000
+    FORECAST_INTERVAL_LEVEL: float = 0.9
+
+    # Concurrent jobs per work class (blocking work runs off the event loop)
+    DB_MAX_WORKERS: int = 8
+    INFERENCE_MAX_WORKERS: int = 2
+    ANALYSIS_MAX_WORKERS: int = 1
+
+    # Worker processes of a walk-forward backtest (one fold per process at a time)
+    BACKTEST_MAX_WORKERS: int = 2
+
     class Config:
         # Try .env.production first (for production), then .env (for development)
         env_file = ".env.production" if os.path.exists(".env.production") else ".env"
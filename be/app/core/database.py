@@ -12,6 +12,8 @@ def get_database_engine() -> Engine:
         try:
             engine = create_engine(
                 settings.DATABASE_URL,
+                # One connection per concurrent job of every work class (see app.core.executors)
+                pool_size=settings.DB_MAX_WORKERS + settings.INFERENCE_MAX_WORKERS + settings.ANALYSIS_MAX_WORKERS,
                 pool_pre_ping=True,
                 pool_recycle=300,
                 echo=settings.DEBUG
@@ -0,0 +1,118 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from app.core.config import settings
+
+# Work classes and how many of their jobs may run at once
+WORK_CLASSES = {
+    "db": settings.DB_MAX_WORKERS,                # queries and lookups (quotes, locations, data)
+    "inference": settings.INFERENCE_MAX_WORKERS,  # forecasts (model rollouts, regressions)
+    "analysis": settings.ANALYSIS_MAX_WORKERS,    # training and other long analysis jobs
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_counters: Dict[str, Dict[str, int]] = {name: {'running': 0, 'queued': 0} for name in WORK_CLASSES}
+_lock = threading.Lock()
+
+
+def get_executor(work_class: str) -> ThreadPoolExecutor:
+    """
+    Bounded thread pool of a work class, created on first use.
+
+    Raises:
+        ValueError: If the work class is unknown
+    """
+    if work_class not in WORK_CLASSES:
+        raise ValueError(f"Unknown work class '{work_class}'. Use one of: {', '.join(WORK_CLASSES)}")
+    with _lock:
+        if work_class not in _executors:
+            _executors[work_class] = ThreadPoolExecutor(
+                max_workers=WORK_CLASSES[work_class], thread_name_prefix=f"{work_class}-worker"
+            )
+        return _executors[work_class]
+
+
+def _tracked(work_class: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap fn so it moves from queued to running when a worker picks it up."""
+    counters = _counters[work_class]
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        with _lock:
+            counters['queued'] -= 1
+            counters['running'] += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with _lock:
+                counters['running'] -= 1
+    return run
+
+
+def _dequeue_if_cancelled(work_class: str, future: Future) -> None:
+    """Done callback: a job cancelled before it started never reaches _tracked's run."""
+    if future.cancelled():
+        with _lock:
+            _counters[work_class]['queued'] -= 1
+
+
+def submit(work_class: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Submit a job to a work class without waiting for it (e.g. background training)."""
+    executor = get_executor(work_class)
+    counters = _counters[work_class]
+    with _lock:
+        counters['queued'] += 1
+    try:
+        future = executor.submit(_tracked(work_class, fn), *args, **kwargs)
+    except Exception:
+        # Shut down pool: the job was never queued
+        with _lock:
+            counters['queued'] -= 1
+        raise
+    future.add_done_callback(functools.partial(_dequeue_if_cancelled, work_class))
+    return future
+
+
+async def run_blocking(work_class: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking function on its work class' pool and await the result.
+
+    The event loop stays free while it runs, so a slow forecast does not
+    delay quotes or location lookups served by the same worker.
+    """
+    # Cancelling the awaiting task cancels the job if it has not started yet
+    return await asyncio.wrap_future(submit(work_class, fn, *args, **kwargs))
+
+
+def offload(work_class: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Turn a synchronous route handler into an async one that runs on a work class' pool.
+
+    functools.wraps keeps the original signature, so FastAPI still sees the
+    handler's parameters and dependencies.
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await run_blocking(work_class, fn, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def executor_stats() -> Dict[str, Dict[str, int]]:
+    """Concurrency limit and current running/queued jobs per work class."""
+    with _lock:
+        return {
+            name: {'max_workers': WORK_CLASSES[name], **_counters[name]}
+            for name in WORK_CLASSES
+        }
+
+
+def shutdown_executors() -> None:
+    """Stop all pools (waits for running jobs)."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
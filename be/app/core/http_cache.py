@@ -0,0 +1,44 @@
+import hashlib
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def make_etag(request: Request, *version_parts: Any) -> str:
+    """
+    Build a weak ETag from the request path, its query string and dataset versions.
+
+    Args:
+        request: Incoming request (path and query params identify the resource)
+        *version_parts: Dataset/model versions the response depends on
+
+    Returns:
+        Weak ETag header value
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    key = "|".join([request.url.path, query] + [str(p) for p in version_parts])
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def set_cache_headers(response: Response, etag: str, max_age: int = 300) -> Response:
+    """Attach ETag and Cache-Control to a response (no Last-Modified, see README)."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    return response
+
+
+def not_modified_response(request: Request, etag: str, max_age: int = 300) -> Optional[Response]:
+    """
+    Return a 304 response if the client's ETag still matches (If-None-Match).
+
+    Returns:
+        304 Response, or None if the full response must be produced
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/"x" and "x" match
+        bare = etag[2:] if etag.startswith("W/") else etag
+        if "*" in candidates or any(c == etag or c == bare or c[2:] == bare for c in candidates):
+            return set_cache_headers(Response(status_code=304), etag, max_age)
+    return None
@@ -0,0 +1,108 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def encode_cursor(row_date: Any, row_id: int, backward: bool = False) -> str:
+    """
+    Encode a (date, id) keyset position as an opaque URL-safe cursor.
+
+    Args:
+        row_date: Date of the boundary row
+        row_id: Id of the boundary row
+        backward: True if the cursor points to newer rows (previous page)
+
+    Returns:
+        Base64 encoded cursor string
+    """
+    if isinstance(row_date, (date, datetime)):
+        row_date = row_date.isoformat()
+    payload = {"d": str(row_date), "i": int(row_id), "b": backward}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, bool]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        Tuple of (date, id, backward)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(payload["d"]), int(payload["i"]), bool(payload.get("b", False))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def build_keyset_clause(cursor: Optional[str], params: Dict[str, Any],
+                        date_type: str = "date") -> Tuple[Optional[str], bool]:
+    """
+    Translate a cursor into a row-value WHERE condition on (date, id).
+
+    Pages are served newest first, so a forward cursor selects strictly older
+    rows and a backward cursor strictly newer ones. The condition is a single
+    range over the (date, id) index, so its cost does not depend on how deep
+    the page is.
+
+    Args:
+        cursor: Opaque cursor from a previous response (or None for first page)
+        params: Query parameters dict, updated in place
+        date_type: Catalogued type of the date column; the cursor is cast to
+            it so timestamps keep their time of day
+
+    Returns:
+        Tuple of (condition or None, backward)
+    """
+    if not cursor:
+        return None, False
+
+    cursor_date, cursor_id, backward = decode_cursor(cursor)
+    params['cursor_date'] = cursor_date
+    params['cursor_id'] = cursor_id
+    operator = ">" if backward else "<"
+    return f"(date, id) {operator} (CAST(:cursor_date AS {date_type}), :cursor_id)", backward
+
+
+def keyset_order(backward: bool) -> str:
+    """ORDER BY clause matching the keyset direction."""
+    return "ORDER BY date ASC, id ASC" if backward else "ORDER BY date DESC, id DESC"
+
+
+def paginate_rows(rows: List[Dict[str, Any]], limit: int, backward: bool,
+                  at_start: bool) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+    """
+    Trim a page fetched with LIMIT limit + 1 and compute its cursors.
+
+    Args:
+        rows: Rows as fetched (limit + 1 at most), in keyset order
+        limit: Requested page size
+        backward: Whether the page was fetched backwards
+        at_start: True if this is the newest page (no cursor and no offset)
+
+    Returns:
+        Tuple of (rows newest first, next_cursor, prev_cursor)
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    first, last = rows[0], rows[-1]
+    # Walking forward there is a newer page behind us unless we started at the
+    # top; walking backward there is always an older page ahead of us.
+    has_next = has_more if not backward else True
+    has_prev = (not at_start) if not backward else has_more
+
+    next_cursor = encode_cursor(last['date'], last['id']) if has_next else None
+    prev_cursor = encode_cursor(first['date'], first['id'], backward=True) if has_prev else None
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,110 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Collapse identical concurrent calls into one execution.
+
+    The first caller for a key runs the function; callers that arrive while
+    it is still running wait on the same future and get its result (or its
+    exception). Nothing is kept once the call finishes, so this complements
+    a result cache rather than replacing it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers of key.
+
+        Args:
+            key: Identifies identical calls
+            fn: Function to run
+
+        Returns:
+            Tuple of (result, shared). shared is True for callers that reused
+            another caller's result and must not modify it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return result, False
+
+    def submit(self, key: Hashable, fn: Callable[[], Any],
+               start: Callable[[Callable[[], None]], Any]) -> Tuple[Future, bool]:
+        """
+        Like do(), but without waiting: fn is handed to `start` (e.g. a
+        pool's submit) unless a call for key is already in flight.
+
+        Args:
+            key: Identifies identical calls
+            fn: Function to run
+            start: Schedules a zero-argument job
+
+        Returns:
+            Tuple of (future of the result, shared)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, True
+            future = Future()
+            self._calls[key] = future
+            self.executed += 1
+
+        def job() -> None:
+            try:
+                result = fn()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+
+        try:
+            start(job)
+        except BaseException as e:
+            # Callers that joined meanwhile hold the future too: fail it before dropping the key
+            future.set_exception(e)
+            with self._lock:
+                self._calls.pop(key, None)
+            raise
+        return future, False
+
+    def stats(self) -> Dict[str, int]:
+        """Executed and coalesced call counts, and calls in flight."""
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+import tempfile
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import text
+from app.core.database import get_database_connection
+
+# XlsxWriter is optional: only needed for XLSX exports
+try:
+    import xlsxwriter
+    XLSX_AVAILABLE = True
+except ImportError:
+    XLSX_AVAILABLE = False
+    xlsxwriter = None
+
+# Rows fetched per round trip from the server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+# Bytes read per chunk when streaming a finished file
+FILE_CHUNK_SIZE = 64 * 1024
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize the non-JSON types returned by psycopg2."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stream_query_batches(query: str, params: Dict[str, Any],
+                         batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[Any]]:
+    """
+    Execute a query through a server-side (named) cursor and yield row batches.
+
+    The connection is opened inside the generator so it stays alive for as long
+    as the response is being streamed, and only one batch is held in memory at
+    a time.
+
+    Args:
+        query: SQL query string
+        params: Query parameters
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        Lists of SQLAlchemy Row objects
+    """
+    with get_database_connection() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(text(query), params)
+        for batch in result.partitions():
+            yield batch
+
+
+def encode_ndjson(batches: Iterator[List[Any]]) -> Iterator[bytes]:
+    """Encode row batches as newline-delimited JSON, one chunk per batch."""
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(row._mapping), default=_json_default) + "\n" for row in batch
+        ).encode()
+
+
+def encode_csv(batches: Iterator[List[Any]]) -> Iterator[bytes]:
+    """Encode row batches as CSV with a header row, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for batch in batches:
+        for row in batch:
+            if not header_written:
+                writer.writerow(row._fields)
+                header_written = True
+            writer.writerow([_json_default(v) if isinstance(v, (date, datetime, Decimal)) else v
+                             for v in row])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+def encode_xlsx(batches: Iterator[List[Any]]) -> Iterator[bytes]:
+    """
+    Write row batches to an XLSX workbook and stream the finished file.
+
+    XLSX is a zip archive, so nothing can be sent before the last row is
+    written. XlsxWriter's constant_memory mode flushes every row to a temp
+    file as it goes, and the finished workbook is read back from disk in
+    chunks, so memory stays flat regardless of the number of rows.
+
+    Raises:
+        ValueError: If XlsxWriter is not installed
+    """
+    if not XLSX_AVAILABLE:
+        raise ValueError("XLSX export is not available. XlsxWriter is not installed.")
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook = xlsxwriter.Workbook(tmp, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd',
+        })
+        worksheet = workbook.add_worksheet()
+        row_index = 0
+        for batch in batches:
+            for row in batch:
+                if row_index == 0:
+                    worksheet.write_row(0, 0, row._fields)
+                    row_index = 1
+                worksheet.write_row(row_index, 0, [float(v) if isinstance(v, Decimal) else v for v in row])
+                row_index += 1
+        workbook.close()
+
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def encode_sse(event: str, payload: Any) -> bytes:
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(payload, default=_json_default)}\n\n".encode()
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally (wbits=31 writes the gzip header/trailer)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+    "xlsx": encode_xlsx,
+}
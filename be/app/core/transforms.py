@@ -0,0 +1,149 @@
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+TRANSFORMS = ("none", "log", "sqrt", "normalize")
+
+
+class ColumnTransform:
+    """
+    Invertible transform of numeric columns, applied to whole arrays.
+
+    `fit` records the parameters each column needs (min/max for normalize),
+    so values produced in the transformed space, such as forecasts, can be
+    mapped back to the original units with `inverse`. Missing values (NaN)
+    stay NaN; finite values outside the domain (log of x <= 0, sqrt of
+    x < 0) become 0, as before.
+    """
+
+    def __init__(self, name: str = "none", params: Optional[Dict[str, Dict[str, float]]] = None):
+        if name not in TRANSFORMS:
+            raise ValueError(f"Unsupported transform '{name}'. Use one of: {', '.join(TRANSFORMS)}")
+        self.name = name
+        self.params: Dict[str, Dict[str, float]] = params or {}
+
+    def fit(self, columns: Dict[str, np.ndarray]) -> "ColumnTransform":
+        """
+        Record the parameters of each column.
+
+        Args:
+            columns: Column name -> float array
+
+        Returns:
+            self
+        """
+        for key, arr in columns.items():
+            if self.name == "normalize" and np.isfinite(arr).any():
+                self.params[key] = {'min': float(np.nanmin(arr)), 'max': float(np.nanmax(arr))}
+            else:
+                self.params[key] = {}
+        return self
+
+    def transform(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Transform fitted columns (returns new arrays)."""
+        out = {}
+        for key, arr in columns.items():
+            arr = np.asarray(arr, dtype=np.float64)
+            if self.name == "none":
+                out[key] = arr
+                continue
+            result = np.full_like(arr, np.nan)
+            finite = np.isfinite(arr)
+            if self.name == "log":
+                mask = arr > 0
+                result[mask] = np.log(arr[mask])
+                result[finite & ~mask] = 0.0
+            elif self.name == "sqrt":
+                mask = arr >= 0
+                result[mask] = np.sqrt(arr[mask])
+                result[finite & ~mask] = 0.0
+            else:
+                lo, hi = self.params[key].get('min'), self.params[key].get('max')
+                result[finite] = 0.0
+                if lo is not None and hi != lo:
+                    result[finite] = (arr[finite] - lo) / (hi - lo)
+            out[key] = result
+        return out
+
+    def inverse(self, values: Any, column: str) -> np.ndarray:
+        """
+        Map values in the transformed space of `column` back to original units.
+
+        Args:
+            values: Scalar or array in transformed units
+            column: Fitted column the values belong to
+
+        Returns:
+            Float array in original units
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if self.name == "log":
+            return np.exp(values)
+        if self.name == "sqrt":
+            return np.square(values)
+        if self.name == "normalize":
+            params = self.params.get(column)
+            if params is None:
+                raise ValueError(f"Transform was not fitted on column '{column}'")
+            lo, hi = params.get('min'), params.get('max')
+            if lo is None:
+                return values
+            return values * (hi - lo) + lo
+        return values
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form (stored in model metadata)."""
+        return {'name': self.name, 'params': self.params}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ColumnTransform":
+        """Rebuild a fitted transform from to_dict() output (identity if data is None)."""
+        if not data:
+            return cls("none")
+        return cls(data.get('name', 'none'), data.get('params'))
+
+
+def _numeric_keys(records: List[Dict[str, Any]], exclude: Iterable[str]) -> List[str]:
+    """
+    Numeric keys of query rows (all rows share the keys of the first one),
+    skipping excluded (case-insensitive) keys. A column's type is taken from
+    its first non-null value.
+    """
+    excluded = {e.lower() for e in exclude}
+    keys = []
+    for key in records[0]:
+        if key.lower() in excluded:
+            continue
+        value = next((record[key] for record in records if record.get(key) is not None), None)
+        if isinstance(value, (int, float, Decimal, np.number)) and not isinstance(value, bool):
+            keys.append(key)
+    return keys
+
+
+def transform_records(records: List[Dict[str, Any]], name: str,
+                      exclude: Iterable[str] = ()) -> Tuple[List[Dict[str, Any]], ColumnTransform]:
+    """
+    Fit and apply a transform to the numeric columns of row dictionaries in place.
+
+    Args:
+        records: Rows as dictionaries
+        name: Transform name (none, log, sqrt, normalize)
+        exclude: Keys that are not values (ids, dates, years)
+
+    Returns:
+        Tuple of (records, fitted transform); missing values stay None
+    """
+    column_transform = ColumnTransform(name)
+    if name == "none" or not records:
+        return records, column_transform
+
+    keys = _numeric_keys(records, exclude)
+    columns = {
+        key: np.array([record.get(key) for record in records], dtype=np.float64)
+        for key in keys
+    }
+    transformed = column_transform.fit(columns).transform(columns)
+    for key, arr in transformed.items():
+        for record, value, present in zip(records, arr.tolist(), np.isfinite(arr).tolist()):
+            record[key] = value if present else None
+    return records, column_transform
@@ -0,0 +1,193 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+NUMERIC_TYPES = {"smallint", "integer", "bigint", "real", "double precision", "numeric", "decimal"}
+
+# Columns that are identifiers rather than measurements
+NON_VALUE_COLUMNS = {"id", "date", "year", "created_at", "updated_at"}
+
+RESAMPLE_UNITS = {
+    "W": "week",
+    "M": "month",
+    "Q": "quarter",
+    "Y": "year",
+}
+
+AGGREGATES = {
+    "mean": "AVG({col})",
+    "min": "MIN({col})",
+    "max": "MAX({col})",
+    "last": "(ARRAY_AGG({col} ORDER BY date DESC, id DESC))[1]",
+}
+
+
+def resolve_columns(requested: Optional[str], table_columns: Dict[str, str],
+                    required: Tuple[str, ...] = ("date", "id")) -> List[str]:
+    """
+    Validate a comma separated projection against the table's real columns.
+
+    Args:
+        requested: Comma separated column names (None = all columns)
+        table_columns: Column name -> data type, from the table catalog
+        required: Columns always included when present in the table
+
+    Returns:
+        List of column names to select
+
+    Raises:
+        ValueError: If a requested column does not exist
+    """
+    if not requested:
+        return list(table_columns.keys())
+
+    names = [c.strip() for c in requested.split(",") if c.strip()]
+    unknown = [c for c in names if c not in table_columns]
+    if unknown:
+        raise ValueError(
+            f"Unknown column(s) {', '.join(unknown)}. "
+            f"Available: {', '.join(table_columns.keys())}"
+        )
+
+    selected = [c for c in required if c in table_columns and c not in names]
+    return selected + [c for c in names if c not in selected]
+
+
+def select_list(columns: List[str]) -> str:
+    """Quoted SELECT list for already validated column names."""
+    return ", ".join(f'"{c}"' for c in columns)
+
+
+def date_filter(start_date: Optional[str], end_date: Optional[str],
+                params: Dict[str, Any]) -> List[str]:
+    """Build the date range conditions shared by every time series query."""
+    conditions = []
+    if start_date:
+        conditions.append("Date >= :start_date")
+        params['start_date'] = start_date
+    if end_date:
+        conditions.append("Date <= :end_date")
+        params['end_date'] = end_date
+    return conditions
+
+
+def build_resample_query(table_name: str, columns: List[str], table_columns: Dict[str, str],
+                         resample: str, agg: str, where_conditions: List[str]) -> Tuple[str, str]:
+    """
+    Build a GROUP BY date_trunc(...) query that aggregates in PostgreSQL.
+
+    Numeric columns are aggregated with `agg`; any other selected column
+    (e.g. market_data.asset_name) becomes part of the grouping key.
+
+    Args:
+        table_name: Validated table name
+        columns: Validated projection (from resolve_columns)
+        table_columns: Column name -> data type
+        resample: One of RESAMPLE_UNITS
+        agg: One of AGGREGATES
+        where_conditions: Conditions applied before grouping
+
+    Returns:
+        Tuple of (aggregate query without ORDER/LIMIT, matching count query)
+    """
+    unit = RESAMPLE_UNITS[resample]
+    period = f"date_trunc('{unit}', date)::date"
+
+    value_columns = [
+        c for c in columns
+        if c not in NON_VALUE_COLUMNS and table_columns[c] in NUMERIC_TYPES
+    ]
+    group_columns = [
+        c for c in columns
+        if c not in NON_VALUE_COLUMNS and c not in value_columns
+    ]
+    if not value_columns:
+        raise ValueError("Resampling needs at least one numeric column")
+
+    select_parts = [f"{period} AS date"]
+    select_parts += [f'"{c}"' for c in group_columns]
+    for c in value_columns:
+        quoted = f'"{c}"'
+        select_parts.append(f"{AGGREGATES[agg].format(col=quoted)} AS {quoted}")
+    select_parts.append("COUNT(*) AS n_obs")
+
+    where = " WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+    group_by = ", ".join([period] + [f'"{c}"' for c in group_columns])
+
+    query = f"SELECT {', '.join(select_parts)} FROM {table_name}{where} GROUP BY {group_by}"
+    count_query = f"SELECT COUNT(*) FROM (SELECT 1 FROM {table_name}{where} GROUP BY {group_by}) AS periods"
+    return query, count_query
+
+
+def parse_series_spec(spec: str) -> Tuple[str, str, Optional[str]]:
+    """
+    Parse a series reference of the form table.column or table.column@asset.
+
+    Returns:
+        Tuple of (table, column, asset or None)
+
+    Raises:
+        ValueError: If the reference is malformed
+    """
+    base, _, asset = spec.partition("@")
+    table, dot, column = base.partition(".")
+    if not dot or not table or not column:
+        raise ValueError(f"Invalid series '{spec}'. Use table.column or table.column@asset")
+    return table.strip(), column.strip(), asset.strip() or None
+
+
+def build_aligned_query(series: List[Tuple[str, str, Optional[str]]],
+                        where_conditions: List[str], params: Dict[str, Any],
+                        forward_fill: bool = False) -> str:
+    """
+    Build one query that returns several series aligned on date.
+
+    Each table is read once in its own CTE, grouped by date; series of a
+    table with an asset_name column are pivoted with FILTER clauses. The
+    CTEs are outer-joined on the union of their dates. With forward_fill,
+    each gap takes the last non-null value (window over a running count of
+    non-null values, since PostgreSQL has no IGNORE NULLS).
+
+    Args:
+        series: Validated (table, column, asset) triples; output columns are s0, s1, ...
+        where_conditions: Date conditions applied inside every CTE
+        params: Query parameters dict, updated in place with asset names
+        forward_fill: Fill gaps with the previous value
+
+    Returns:
+        SQL query with columns date, s0, s1, ...
+    """
+    by_table: Dict[str, List[Tuple[int, str, Optional[str]]]] = {}
+    for i, (table, column, asset) in enumerate(series):
+        by_table.setdefault(table, []).append((i, column, asset))
+
+    ctes = []
+    joins = []
+    for t, (table, items) in enumerate(by_table.items()):
+        conditions = list(where_conditions)
+        parts = []
+        assets = []
+        for i, column, asset in items:
+            if asset is not None:
+                params[f"asset_{i}"] = asset
+                assets.append(f":asset_{i}")
+                parts.append(f'AVG("{column}") FILTER (WHERE asset_name = :asset_{i}) AS s{i}')
+            else:
+                parts.append(f'AVG("{column}") AS s{i}')
+        if assets:
+            conditions.append(f"asset_name IN ({', '.join(assets)})")
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        ctes.append(f"t{t} AS (SELECT date, {', '.join(parts)} FROM {table}{where} GROUP BY date)")
+        joins.append(f"t{t}")
+
+    dates = " UNION ".join(f"SELECT date FROM {alias}" for alias in joins)
+    ctes.append(f"dates AS ({dates})")
+    columns = [f"s{i}" for i in range(len(series))]
+    join_sql = " ".join(f"LEFT JOIN {alias} USING (date)" for alias in joins)
+    ctes.append(f"joined AS (SELECT date, {', '.join(columns)} FROM dates {join_sql})")
+
+    if not forward_fill:
+        return f"WITH {', '.join(ctes)} SELECT date, {', '.join(columns)} FROM joined ORDER BY date"
+
+    groups = ", ".join(f"{c}, COUNT({c}) OVER (ORDER BY date) AS {c}_grp" for c in columns)
+    ctes.append(f"grouped AS (SELECT date, {groups} FROM joined)")
+    filled = ", ".join(f"MAX({c}) OVER (PARTITION BY {c}_grp) AS {c}" for c in columns)
+    return f"WITH {', '.join(ctes)} SELECT date, {filled} FROM grouped ORDER BY date"
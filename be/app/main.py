@@ -2,6 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.executors import executor_stats, shutdown_executors
+from app.services.series_store import series_store
+from app.services.table_catalog import table_catalog
+import logging
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -34,10 +40,24 @@ elif settings.BACKEND_CORS_ORIGINS:
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def load_series_store():
+    """Warm the table catalog and the shared in-memory price store so the first request doesn't pay for them."""
+    try:
+        table_catalog.refresh()
+        series_store.refresh()
+    except Exception as e:
+        logger.warning(f"Could not preload catalog/series store, they will load on first use: {str(e)}")
+
+@app.on_event("shutdown")
+async def stop_executors():
+    """Let running queries, forecasts and training jobs finish before exiting."""
+    shutdown_executors()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Time Series Analysis API"}
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "executors": executor_stats()}
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List
+import numpy as np
 import pandas as pd
 
 class BaseForecastModel(ABC):
@@ -38,6 +39,59 @@ class BaseForecastModel(ABC):
         """
         pass
     
+    @abstractmethod
+    def predict_many(self, windows: np.ndarray, n_periods: int, **kwargs) -> np.ndarray:
+        """
+        Roll out several input windows at once (columns, scenarios, backtest origins).
+        
+        Row i must equal what predict(n_periods) returns when windows[i] is
+        the model's last observed window, so callers can batch rollouts
+        without changing results. Implementations should raise ValueError if
+        the model is not trained or the window width differs from the
+        model's sequence length.
+        
+        Args:
+            windows: Array of shape (batch, sequence_length) in original units
+            n_periods: Number of future periods to forecast for each window
+            **kwargs: Additional prediction parameters
+            
+        Returns:
+            Array of shape (batch, n_periods) in original units
+        """
+        pass
+    
+    @staticmethod
+    def _rollout(step: Callable[[np.ndarray], np.ndarray], windows: np.ndarray,
+                 n_periods: int) -> np.ndarray:
+        """
+        Recursive multi-step rollout of a batch of windows.
+        
+        Each step feeds one (batch, sequence_length) window to `step` and writes
+        the predictions after it in a preallocated buffer, so the next window
+        is a view instead of a copy built with np.append. A step may return
+        (batch,) values or a (batch, k) block of the next k periods (direct
+        multi-horizon models); blocks advance the window by k.
+        
+        Args:
+            step: Function mapping (batch, sequence_length) windows to (batch,) or (batch, k) predictions
+            windows: Array of shape (batch, sequence_length) in model units
+            n_periods: Number of steps
+            
+        Returns:
+            Array of shape (batch, n_periods) in model units
+        """
+        windows = np.atleast_2d(np.asarray(windows, dtype=np.float64))
+        batch, seq_len = windows.shape
+        buffer = np.empty((batch, seq_len + n_periods), dtype=np.float64)
+        buffer[:, :seq_len] = windows
+        i = 0
+        while i < n_periods:
+            block = np.asarray(step(buffer[:, i:i + seq_len])).reshape(batch, -1)
+            k = min(block.shape[1], n_periods - i)
+            buffer[:, seq_len + i:seq_len + i + k] = block[:, :k]
+            i += k
+        return buffer[:, seq_len:]
+    
     @abstractmethod
     def save(self, path: str) -> None:
         """
@@ -58,6 +112,10 @@ class BaseForecastModel(ABC):
         """
         pass
     
+    def get_config(self) -> Dict[str, Any]:
+        """Constructor parameters that define the model (used to identify backtests)"""
+        return {}
+    
     def get_metadata(self) -> Dict[str, Any]:
         """Get model metadata (training date, metrics, parameters, etc.)"""
         return self.metadata
\ No newline at end of file
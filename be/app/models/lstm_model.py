@@ -12,20 +12,32 @@ import json
 from datetime import datetime
 
 from app.models.base_model import BaseForecastModel
+from app.models.numpy_lstm import export_lstm_weights
 
 
 class LSTMModel(BaseForecastModel):
-    """LSTM model for time series forecasting"""
+    """
+    LSTM model for time series forecasting.
     
-    def __init__(self, sequence_length: int = 20, lstm_units: int = 2000, dropout_rate: float = 0.2):
+    With horizon=1 each prediction is fed back as input for the next one.
+    With horizon=H > 1 (registered as 'lstm_direct') the output layer emits
+    the next H values at once, so a forecast of up to H periods is a single
+    forward pass and longer ones advance H periods per pass.
+    """
+    
+    def __init__(self, sequence_length: int = 20, lstm_units: int = 2000, dropout_rate: float = 0.2,
+                 horizon: int = 1):
         super().__init__()
         self.sequence_length = sequence_length
         self.lstm_units = lstm_units
         self.dropout_rate = dropout_rate
+        self.horizon = horizon
         self.model: Optional[Sequential] = None
         self.scaler: Optional[MinMaxScaler] = None
         self.last_sequence: Optional[np.ndarray] = None
         self.training_data: Optional[pd.DataFrame] = None
+        # Errors on the test split (one column per horizon step), saved with the version for prediction intervals
+        self.residuals: Optional[np.ndarray] = None
         
     def _create_sequences(self, data: np.ndarray, seq_length: int) -> tuple:
         """
@@ -36,12 +48,12 @@ class LSTMModel(BaseForecastModel):
             seq_length: Length of the time window
             
         Returns:
-            Tuple of (X, y) where X are features and y are targets
+            Tuple of (X, y) where X are features and y are the next `horizon` targets
         """
         X, y = [], []
-        for i in range(seq_length, len(data)):
+        for i in range(seq_length, len(data) - self.horizon + 1):
             X.append(data[i-seq_length:i, 0])
-            y.append(data[i, 0])
+            y.append(data[i:i + self.horizon, 0])
         return np.array(X), np.array(y)
     
     def train(self, data: pd.DataFrame, value_column: str, **params) -> Dict[str, Any]:
@@ -67,8 +79,9 @@ class LSTMModel(BaseForecastModel):
             raise ValueError(f"Column '{value_column}' not found in data")
         
         serie = data[value_column].dropna()
-        if len(serie) < self.sequence_length + 10:
-            raise ValueError(f"Not enough data. Need at least {self.sequence_length + 10} points, got {len(serie)}")
+        min_points = self.sequence_length + self.horizon + 9
+        if len(serie) < min_points:
+            raise ValueError(f"Not enough data. Need at least {min_points} points, got {len(serie)}")
         
         # Store training data for future predictions
         self.training_data = data.copy()
@@ -95,7 +108,7 @@ class LSTMModel(BaseForecastModel):
             LSTM(self.lstm_units, activation='tanh', return_sequences=False, 
                  input_shape=(self.sequence_length, 1)),
             Dropout(self.dropout_rate),
-            Dense(1)
+            Dense(self.horizon)
         ])
         
         self.model.compile(optimizer='adam', loss='mse', metrics=['mae'])
@@ -119,21 +132,25 @@ class LSTMModel(BaseForecastModel):
         
         # Evaluate on test set
         y_pred_scaled = self.model.predict(X_test, verbose=0)
-        y_pred = self.scaler.inverse_transform(y_pred_scaled)
-        y_test_original = self.scaler.inverse_transform(y_test.reshape(-1, 1))
+        y_pred = self.scaler.inverse_transform(y_pred_scaled.reshape(-1, 1)).reshape(y_pred_scaled.shape)
+        y_test_original = self.scaler.inverse_transform(y_test.reshape(-1, 1)).reshape(y_pred_scaled.shape)
         
         # Calculate metrics
         mse = mean_squared_error(y_test_original, y_pred)
         rmse = np.sqrt(mse)
         mae = mean_absolute_error(y_test_original, y_pred)
         mape = np.mean(np.abs((y_test_original - y_pred) / y_test_original)) * 100
+        self.residuals = y_test_original - y_pred
+        if self.horizon == 1:
+            self.residuals = self.residuals.ravel()
         
         # Store last sequence for future predictions
         self.last_sequence = data_scaled[-self.sequence_length:].flatten()
         
         # Update metadata
         self.metadata = {
-            'model_type': 'lstm',
+            'model_type': 'lstm_direct' if self.horizon > 1 else 'lstm',
+            'horizon': self.horizon,
             'training_date': datetime.now().isoformat(),
             'sequence_length': self.sequence_length,
             'lstm_units': self.lstm_units,
@@ -156,7 +173,7 @@ class LSTMModel(BaseForecastModel):
     
     def predict(self, n_periods: int, **kwargs) -> List[float]:
         """
-        Generate future predictions.
+        Generate future predictions (one forward pass per `horizon` periods).
         
         Args:
             n_periods: Number of periods to forecast
@@ -170,26 +187,49 @@ class LSTMModel(BaseForecastModel):
         if self.last_sequence is None:
             raise ValueError("Model not properly initialized. Last sequence is missing.")
         
-        predictions = []
-        current_sequence = self.last_sequence.copy()
-        
-        for _ in range(n_periods):
-            # Reshape for model: (1, sequence_length, 1)
-            current_sequence_reshaped = current_sequence.reshape((1, self.sequence_length, 1))
-            
-            # Make prediction
-            next_pred = self.model.predict(current_sequence_reshaped, verbose=0)
-            predictions.append(next_pred[0, 0])
-            
-            # Update sequence: add prediction and remove first value
-            current_sequence = np.append(current_sequence[1:], next_pred[0, 0])
+        predictions = self._rollout(self._step, self.last_sequence[np.newaxis, :], n_periods)
         
         # Denormalize predictions
-        predictions = np.array(predictions).reshape(-1, 1)
-        predictions = self.scaler.inverse_transform(predictions)
+        predictions = self.scaler.inverse_transform(predictions.reshape(-1, 1))
         
         return predictions.flatten().tolist()
     
+    def _step(self, windows: np.ndarray) -> np.ndarray:
+        """Next `horizon` predictions, (batch, horizon), for a (batch, sequence_length) array of scaled windows"""
+        # predict_on_batch skips the per-call setup of predict() for small inputs
+        output = self.model.predict_on_batch(windows.reshape((windows.shape[0], self.sequence_length, 1)))
+        return np.asarray(output).reshape(windows.shape[0], -1)
+    
+    def predict_many(self, windows: np.ndarray, n_periods: int, **kwargs) -> np.ndarray:
+        """
+        Roll out several windows at once as one (batch, sequence_length, 1) tensor per step.
+        
+        Args:
+            windows: Array of shape (batch, sequence_length) in original units
+            n_periods: Number of periods to forecast
+            
+        Returns:
+            Array of shape (batch, n_periods) in original units
+        """
+        if not self.is_trained or self.model is None:
+            raise ValueError("Model must be trained before making predictions")
+        windows = np.atleast_2d(np.asarray(windows, dtype=np.float64))
+        if windows.shape[1] != self.sequence_length:
+            raise ValueError(f"Windows must have {self.sequence_length} values, got {windows.shape[1]}")
+        
+        scaled = self.scaler.transform(windows.reshape(-1, 1)).reshape(windows.shape)
+        predictions = self._rollout(self._step, scaled, n_periods)
+        return self.scaler.inverse_transform(predictions.reshape(-1, 1)).reshape(predictions.shape)
+    
+    def get_config(self) -> Dict[str, Any]:
+        """Architecture parameters (also saved as config.json)"""
+        return {
+            'sequence_length': self.sequence_length,
+            'lstm_units': self.lstm_units,
+            'dropout_rate': self.dropout_rate,
+            'horizon': self.horizon
+        }
+    
     def save(self, path: str) -> None:
         """Save model, scaler, and metadata"""
         if not self.is_trained:
@@ -214,13 +254,25 @@ class LSTMModel(BaseForecastModel):
             json.dump(self.metadata, f, indent=2)
         
         # Save config
-        config = {
-            'sequence_length': self.sequence_length,
-            'lstm_units': self.lstm_units,
-            'dropout_rate': self.dropout_rate
-        }
         with open(os.path.join(path, 'config.json'), 'w') as f:
-            json.dump(config, f, indent=2)
+            json.dump(self.get_config(), f, indent=2)
+        
+        # Plain weight arrays so the API can serve forecasts without TensorFlow
+        self.export_numpy(path)
+    
+    def export_numpy(self, path: str) -> str:
+        """
+        Export the weights for NumpyLSTMModel.
+        
+        Args:
+            path: Model directory
+            
+        Returns:
+            Path of the written weights file
+        """
+        if self.model is None or self.scaler is None or self.last_sequence is None:
+            raise ValueError("Model must be trained or loaded before exporting")
+        return export_lstm_weights(self.model, self.scaler, self.last_sequence, path)
     
     def load(self, path: str) -> None:
         """Load model, scaler, and metadata"""
@@ -260,5 +312,6 @@ class LSTMModel(BaseForecastModel):
                 self.sequence_length = config.get('sequence_length', 20)
                 self.lstm_units = config.get('lstm_units', 2000)
                 self.dropout_rate = config.get('dropout_rate', 0.2)
+                self.horizon = config.get('horizon', 1)
         
         self.is_trained = True
\ No newline at end of file
@@ -1,8 +1,128 @@
 import os
 import json
-from typing import Dict, Any, Optional, List
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from pathlib import Path
+import numpy as np
+from app.core.config import settings
+from app.services.forecast_cache import forecast_cache
+
+# Held-out residuals (actual - predicted) stored next to each model version;
+# one column per horizon step for direct multi-horizon models
+RESIDUALS_FILE = "residuals.npy"
+
+
+class ModelCache:
+    """
+    Process-wide LRU of loaded models keyed by (table_name, model_type, version).
+    
+    Loading an LSTM from model.h5 and compiling it takes seconds, so loaded
+    models stay resident until the memory budget is exceeded or a newer
+    version is saved. The size of a model is estimated from its files on disk.
+    Concurrent loads of the same key are collapsed: the first caller loads,
+    the others wait for it and reuse the result.
+    """
+    
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def _lookup(self, key: Tuple[str, str, str]) -> Optional[Any]:
+        """Return a resident model and mark it as recently used (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def get_or_load(self, key: Tuple[str, str, str], loader: Callable[[], Any], size: int) -> Any:
+        """
+        Return the resident model for key, loading it once on a miss.
+        
+        Args:
+            key: (table_name, model_type, version)
+            loader: Function that loads the model from disk
+            size: Estimated size of the model in bytes
+            
+        Returns:
+            Loaded model instance
+        """
+        with self._lock:
+            model = self._lookup(key)
+            if model is not None:
+                return model
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            # Another request may have loaded it while we waited
+            with self._lock:
+                model = self._lookup(key)
+                if model is not None:
+                    return model
+                self.misses += 1
+            try:
+                model = loader()
+                self._put(key, model, size)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return model
+    
+    def _put(self, key: Tuple[str, str, str], model: Any, size: int) -> None:
+        """Store a model and evict least recently used ones past the budget"""
+        with self._lock:
+            self._entries[key] = (model, size)
+            self._size += size
+            # Always keep the model that was just loaded, even if it alone exceeds the budget
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+    
+    def evict(self, table_name: str, model_type: str, version: Optional[str] = None) -> int:
+        """
+        Drop resident models of a table/model type.
+        
+        Args:
+            table_name: Name of the table
+            model_type: Type of model
+            version: Only drop this version (all versions if None)
+            
+        Returns:
+            Number of models removed
+        """
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] == table_name and key[1] == model_type
+                and (version is None or key[2] == version)
+            ]
+            for key in stale:
+                self._size -= self._entries.pop(key)[1]
+            return len(stale)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current usage"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'models': ['/'.join(key) for key in self._entries],
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# Loaded models shared by every ModelRegistryService instance
+model_cache = ModelCache(max_bytes=settings.MODEL_CACHE_MAX_MB * 1024 * 1024)
+
 
 class ModelRegistryService:
     """Service for managing trained model storage and retrieval"""
@@ -28,13 +148,60 @@ class ModelRegistryService:
         if self.registry_file.exists():
             with open(self.registry_file, 'r') as f:
                 self.registry = json.load(f)
+            self._registry_mtime = self.registry_file.stat().st_mtime
         else:
             self.registry = {}
+            self._registry_mtime = None
     
     def _save_registry(self) -> None:
         """Save registry metadata to file"""
         with open(self.registry_file, 'w') as f:
             json.dump(self.registry, f, indent=2)
+        self._registry_mtime = self.registry_file.stat().st_mtime
+    
+    def reload_if_changed(self) -> None:
+        """Reload registry metadata if another service instance saved it"""
+        mtime = self.registry_file.stat().st_mtime if self.registry_file.exists() else None
+        if mtime != self._registry_mtime:
+            self._load_registry()
+    
+    def get_latest_version(self, table_name: str, model_type: str,
+                           value_column: Optional[str] = None) -> Optional[str]:
+        """
+        Get the latest registered version of a model.
+        
+        Args:
+            table_name: Name of the table
+            model_type: Type of model
+            value_column: Optional column the version must have been trained on
+                (versions of one model type may forecast different columns)
+            
+        Returns:
+            Version identifier, or None if the model has no (matching) versions
+        """
+        self.reload_if_changed()
+        info = self.registry.get(f"{table_name}_{model_type}", {})
+        if value_column is None:
+            return info.get('latest_version')
+        versions = [
+            v for v in info.get('versions', [])
+            if v.get('value_column', info.get('value_column')) == value_column
+        ]
+        return max(versions, key=lambda v: v['created_at'])['version'] if versions else None
+    
+    def get_version_column(self, table_name: str, model_type: str, version: str) -> Optional[str]:
+        """
+        Column a registered model version was trained on.
+        
+        Returns:
+            Column name, or None if the version is not registered
+        """
+        self.reload_if_changed()
+        info = self.registry.get(f"{table_name}_{model_type}", {})
+        for v in info.get('versions', []):
+            if v['version'] == version:
+                return v.get('value_column', info.get('value_column'))
+        return None
     
     def _get_model_path(self, table_name: str, model_type: str, version: Optional[str] = None) -> Path:
         """
@@ -67,8 +234,19 @@ class ModelRegistryService:
         
         return model_dir
     
+    def get_model_path(self, table_name: str, model_type: str, version: Optional[str] = None) -> Path:
+        """
+        Get the directory of a model version (latest if version is None).
+        
+        Raises:
+            ValueError: If the model or version is not registered
+        """
+        self.reload_if_changed()
+        return self._get_model_path(table_name, model_type, version)
+    
     def save_model(self, model: Any, table_name: str, model_type: str, 
-                   value_column: str, metadata: Dict[str, Any]) -> str:
+                   value_column: str, metadata: Dict[str, Any],
+                   residuals: Optional[np.ndarray] = None) -> str:
         """
         Save a trained model to the registry.
         
@@ -78,6 +256,7 @@ class ModelRegistryService:
             model_type: Type of model (lstm, arima, etc.)
             value_column: Column name that was forecasted
             metadata: Additional metadata (metrics, parameters, etc.)
+            residuals: Optional held-out residuals, used for prediction intervals
             
         Returns:
             Version identifier for the saved model
@@ -91,6 +270,8 @@ class ModelRegistryService:
         
         # Save model
         model.save(str(model_dir))
+        if residuals is not None:
+            np.save(model_dir / RESIDUALS_FILE, np.asarray(residuals, dtype=np.float64))
         
         # Update registry
         model_key = f"{table_name}_{model_type}"
@@ -115,6 +296,10 @@ class ModelRegistryService:
         # Save registry
         self._save_registry()
         
+        # Forecasts and resident models of the previous version are no longer served
+        forecast_cache.invalidate(table_name, model_type)
+        model_cache.evict(table_name, model_type)
+        
         return version
     
     def load_model(self, model_class: Any, table_name: str, model_type: str, 
@@ -129,15 +314,32 @@ class ModelRegistryService:
             version: Optional version identifier (defaults to latest)
             
         Returns:
-            Loaded model instance
+            Loaded model instance (shared; do not modify it)
         """
+        self.reload_if_changed()
         model_path = self._get_model_path(table_name, model_type, version)
         
-        # Instantiate and load model
-        model = model_class()
-        model.load(str(model_path))
+        def load() -> Any:
+            # Instantiate and load model
+            model = model_class()
+            model.load(str(model_path))
+            return model
         
-        return model
+        size = sum(f.stat().st_size for f in model_path.glob('*') if f.is_file()) if model_path.exists() else 0
+        return model_cache.get_or_load((table_name, model_type, model_path.name), load, size)
+    
+    def get_residuals(self, table_name: str, model_type: str,
+                      version: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Held-out residuals of a model version (latest if version is None).
+        
+        Returns:
+            Residuals array, or None for versions saved without residuals
+        """
+        residuals_path = self.get_model_path(table_name, model_type, version) / RESIDUALS_FILE
+        if not residuals_path.exists():
+            return None
+        return np.load(residuals_path)
     
     def list_models(self, table_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -225,4 +427,6 @@ class ModelRegistryService:
                 else:
                     del self.registry[model_key]['latest_version']
             
-            self._save_registry()
\ No newline at end of file
+            self._save_registry()
+            forecast_cache.invalidate(table_name, model_type)
+            model_cache.evict(table_name, model_type, version)
\ No newline at end of file
@@ -0,0 +1,201 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+from app.models.base_model import BaseForecastModel
+
+# File written next to model.h5 by LSTMModel.save()
+WEIGHTS_FILE = 'weights.npz'
+
+ACTIVATIONS = {
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'hard_sigmoid': lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+    'relu': lambda x: np.maximum(x, 0.0),
+    'linear': lambda x: x,
+}
+
+
+def export_lstm_weights(keras_model: Any, scaler: Any, last_sequence: np.ndarray, path: str) -> str:
+    """
+    Export a trained LSTM -> Dropout -> Dense Keras model as plain arrays.
+
+    Args:
+        keras_model: Trained Keras Sequential model
+        scaler: Fitted MinMaxScaler used on the training series
+        last_sequence: Last scaled window seen during training
+        path: Model directory
+
+    Returns:
+        Path of the written .npz file
+    """
+    lstm_layer = next(l for l in keras_model.layers if type(l).__name__ == 'LSTM')
+    dense_layer = next(l for l in keras_model.layers if type(l).__name__ == 'Dense')
+    kernel, recurrent_kernel, bias = lstm_layer.get_weights()
+    dense_kernel, dense_bias = dense_layer.get_weights()
+    lstm_config = lstm_layer.get_config()
+
+    weights_path = os.path.join(path, WEIGHTS_FILE)
+    np.savez(
+        weights_path,
+        kernel=kernel,
+        recurrent_kernel=recurrent_kernel,
+        bias=bias,
+        dense_kernel=dense_kernel,
+        dense_bias=dense_bias,
+        activation=np.array(lstm_config.get('activation', 'tanh')),
+        recurrent_activation=np.array(lstm_config.get('recurrent_activation', 'sigmoid')),
+        dense_activation=np.array(dense_layer.get_config().get('activation', 'linear')),
+        scaler_min=np.asarray(scaler.min_, dtype=np.float64),
+        scaler_scale=np.asarray(scaler.scale_, dtype=np.float64),
+        last_sequence=np.asarray(last_sequence, dtype=np.float64),
+    )
+    return weights_path
+
+
+class NumpyLSTMModel(BaseForecastModel):
+    """
+    Inference-only LSTM that runs the exported weights with NumPy.
+
+    Reproduces the LSTM -> Dropout -> Dense stack of LSTMModel (dropout is a
+    no-op at inference) without importing Keras/TensorFlow, so the API
+    process can serve trained-model forecasts with only NumPy loaded. Direct
+    multi-horizon exports (Dense(H)) return H periods per forward pass.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.sequence_length = 20
+        self.weights: Dict[str, np.ndarray] = {}
+        self.last_sequence: Optional[np.ndarray] = None
+        self.activation = 'tanh'
+        self.recurrent_activation = 'sigmoid'
+        self.dense_activation = 'linear'
+
+    @property
+    def horizon(self) -> int:
+        """Periods predicted per forward pass (Dense layer width)"""
+        return int(self.weights['dense_kernel'].shape[1])
+
+    @staticmethod
+    def is_exported(path: str) -> bool:
+        """True if the model directory has NumPy weights"""
+        return os.path.exists(os.path.join(path, WEIGHTS_FILE))
+
+    def forward(self, windows: np.ndarray) -> np.ndarray:
+        """
+        Run a batch of scaled windows through the network.
+
+        Args:
+            windows: Array of shape (batch, timesteps) or (batch, timesteps, 1)
+
+        Returns:
+            Array of shape (batch,) with the scaled predictions, or
+            (batch, horizon) for direct multi-horizon models
+        """
+        w = self.weights
+        x = np.asarray(windows, dtype=np.float32)
+        if x.ndim == 2:
+            x = x[:, :, np.newaxis]
+        batch, timesteps, _ = x.shape
+        units = w['recurrent_kernel'].shape[0]
+        activation = ACTIVATIONS[self.activation]
+        recurrent_activation = ACTIVATIONS[self.recurrent_activation]
+
+        # Input projections of every timestep at once: (batch, timesteps, 4 * units)
+        x_proj = x @ w['kernel'] + w['bias']
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        for t in range(timesteps):
+            z = x_proj[:, t, :] + h @ w['recurrent_kernel']
+            # Keras gate order: input, forget, cell, output
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+
+        out = ACTIVATIONS[self.dense_activation](h @ w['dense_kernel'] + w['dense_bias'])
+        out = out.astype(np.float64)
+        return out[:, 0] if out.shape[1] == 1 else out
+
+    def scale(self, values: np.ndarray) -> np.ndarray:
+        """Apply the MinMaxScaler fitted during training"""
+        return np.asarray(values, dtype=np.float64) * self.weights['scaler_scale'][0] + self.weights['scaler_min'][0]
+
+    def inverse_scale(self, values: np.ndarray) -> np.ndarray:
+        """Undo the MinMaxScaler applied during training"""
+        return (np.asarray(values, dtype=np.float64) - self.weights['scaler_min'][0]) / self.weights['scaler_scale'][0]
+
+    def train(self, data: pd.DataFrame, value_column: str, **params) -> Dict[str, Any]:
+        """Not supported: train an LSTMModel and export it on save()"""
+        raise NotImplementedError("NumpyLSTMModel is inference-only; train an LSTMModel instead")
+
+    def predict(self, n_periods: int, **kwargs) -> List[float]:
+        """
+        Generate future predictions by feeding predictions back as input
+        (one forward pass per `horizon` periods).
+
+        Args:
+            n_periods: Number of periods to forecast
+
+        Returns:
+            List of predicted values
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be loaded before making predictions")
+        if self.last_sequence is None:
+            raise ValueError("Model not properly initialized. Last sequence is missing.")
+
+        predictions = self._rollout(self.forward, self.last_sequence[np.newaxis, :], n_periods)
+        return self.inverse_scale(predictions[0]).tolist()
+
+    def predict_many(self, windows: np.ndarray, n_periods: int, **kwargs) -> np.ndarray:
+        """
+        Roll out a batch of windows, one forward pass per step for the whole batch.
+
+        Args:
+            windows: Array of shape (batch, sequence_length) in original units
+            n_periods: Number of periods to forecast
+
+        Returns:
+            Array of shape (batch, n_periods) in original units
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be loaded before making predictions")
+        windows = np.atleast_2d(windows)
+        if windows.shape[1] != self.sequence_length:
+            raise ValueError(f"Windows must have {self.sequence_length} values, got {windows.shape[1]}")
+
+        return self.inverse_scale(self._rollout(self.forward, self.scale(windows), n_periods))
+
+    def save(self, path: str) -> None:
+        """Save the weight arrays"""
+        if not self.is_trained:
+            raise ValueError("Model must be loaded before saving")
+        os.makedirs(path, exist_ok=True)
+        np.savez(os.path.join(path, WEIGHTS_FILE), **self.weights)
+
+    def load(self, path: str) -> None:
+        """Load weight arrays and metadata"""
+        weights_path = os.path.join(path, WEIGHTS_FILE)
+        if not os.path.exists(weights_path):
+            raise FileNotFoundError(f"Weights file not found: {weights_path}")
+
+        with np.load(weights_path) as data:
+            self.weights = {name: data[name] for name in data.files}
+        self.activation = str(self.weights['activation'])
+        self.recurrent_activation = str(self.weights['recurrent_activation'])
+        self.dense_activation = str(self.weights['dense_activation'])
+        self.last_sequence = self.weights['last_sequence']
+        self.sequence_length = len(self.last_sequence)
+
+        metadata_path = os.path.join(path, 'metadata.json')
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r') as f:
+                self.metadata = json.load(f)
+
+        self.is_trained = True
@@ -0,0 +1,257 @@
+import json
+import logging
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+from app.core.transforms import ColumnTransform
+from app.models.base_model import BaseForecastModel
+
+logger = logging.getLogger(__name__)
+
+# Series attached by each worker process (see _attach_series)
+_worker_series: Dict[str, Any] = {}
+
+
+def rolling_origins(dates: Any, horizon: int, folds: int, step: Optional[int] = None) -> List[str]:
+    """
+    The last `folds` origins that still have `horizon` actual values after them.
+
+    Origins are `step` rows apart (default: horizon, so test windows do not
+    overlap) and returned oldest first as YYYY-MM-DD strings.
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    step = step or horizon
+    last = len(dates) - horizon - 1
+    positions = [last - i * step for i in range(folds) if last - i * step >= 0]
+    return [str(dates[p]) for p in reversed(positions)]
+
+
+def _attach_series(name: str, length: int) -> None:
+    """Process pool initializer: map the shared series without copying it."""
+    block = shared_memory.SharedMemory(name=name)
+    _worker_series['block'] = block  # keeps the mapping alive
+    _worker_series['days'] = np.ndarray((length,), dtype=np.int64, buffer=block.buf)
+    _worker_series['values'] = np.ndarray((length,), dtype=np.float64, buffer=block.buf, offset=length * 8)
+
+
+def _run_fold(model: BaseForecastModel, value_column: str, train_size: int, horizon: int,
+              transform: str, train_params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train a fresh copy of the model on the first `train_size` rows of the
+    shared series and forecast the next `horizon` periods (original units).
+    """
+    start = time.perf_counter()
+    days = _worker_series['days'][:train_size]
+    values = _worker_series['values'][:train_size]
+
+    column_transform = ColumnTransform(transform)
+    if column_transform.name != 'none':
+        fitted = {value_column: values}
+        values = column_transform.fit(fitted).transform(fitted)[value_column]
+
+    # The model arrives pickled, so every fold trains its own copy
+    data = pd.DataFrame({'date': days.astype('datetime64[D]'), value_column: values})
+    model.train(data, value_column, **train_params)
+    predictions = np.asarray(model.predict(horizon), dtype=np.float64)
+    if column_transform.name != 'none':
+        predictions = column_transform.inverse(predictions, value_column)
+    return {
+        'predictions': predictions.tolist(),
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def _error_metrics(errors: np.ndarray, actuals: np.ndarray) -> Dict[str, Any]:
+    """MAE, RMSE and MAPE (%) of the finite errors, None when there are none."""
+    mask = np.isfinite(errors)
+    if not mask.any():
+        return {'mae': None, 'rmse': None, 'mape': None, 'count': 0}
+    e, a = errors[mask], actuals[mask]
+    nonzero = a != 0
+    return {
+        'mae': float(np.mean(np.abs(e))),
+        'rmse': float(np.sqrt(np.mean(e ** 2))),
+        'mape': float(np.mean(np.abs(e[nonzero] / a[nonzero])) * 100) if nonzero.any() else None,
+        'count': int(mask.sum()),
+    }
+
+
+class BacktestRunner:
+    """
+    Walk-forward backtests of any BaseForecastModel.
+
+    For each rolling origin, a fresh copy of the model is trained on the
+    series up to and including the origin and forecasts the next `horizon`
+    rows, which are compared with the actual values. Folds are independent
+    and CPU-bound, so they run on a process pool rather than a thread
+    pool. The series is written once to a shared memory block that every
+    worker maps at start-up, instead of being pickled into each task.
+
+    Results only depend on the model configuration, the training parameters,
+    the folds and the data, so complete results are cached per dataset
+    version.
+    """
+
+    def __init__(self, max_workers: int = 2, max_entries: int = 64):
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self._results: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(model: BaseForecastModel, value_column: str, origins: Sequence[str], horizon: int,
+                  dataset_version: str, transform: str, train_params: Dict[str, Any]) -> str:
+        """Key of a backtest: model class and config, training parameters, folds and data version."""
+        return json.dumps({
+            'model': type(model).__name__,
+            'config': model.get_config(),
+            'train_params': train_params,
+            'value_column': value_column,
+            'origins': list(origins),
+            'horizon': horizon,
+            'transform': transform,
+            'dataset_version': dataset_version,
+        }, sort_keys=True, default=str)
+
+    def run(self, model: BaseForecastModel, dates: Any, values: Any, value_column: str,
+            origins: Sequence[str], horizon: int, dataset_version: str,
+            transform: str = "none", train_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Backtest an untrained model over rolling origins.
+
+        Args:
+            model: Untrained model; its configuration is copied to every fold
+            dates: Dates of the series, sorted ascending
+            values: Values of value_column (NaN where missing)
+            value_column: Name of the forecast column
+            origins: Last training date of each fold (YYYY-MM-DD)
+            horizon: Periods forecast after each origin
+            dataset_version: Version of the data, part of the cache key
+            transform: Transform fitted on each fold's training rows (log, sqrt, normalize)
+            train_params: Keyword arguments of model.train (epochs, batch_size, ...)
+
+        Returns:
+            Dictionary with per-fold and pooled metrics, per-horizon MAE and
+            whether the result came from the cache
+
+        Raises:
+            ValueError: If an origin is outside the series or lacks `horizon` actual values
+        """
+        train_params = train_params or {}
+        key = self.cache_key(model, value_column, origins, horizon, dataset_version, transform, train_params)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return {**self._results[key], 'cached': True}
+            self.misses += 1
+
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        values = np.asarray(values, dtype=np.float64)
+        if not origins:
+            raise ValueError("At least one origin is required")
+        train_sizes = np.searchsorted(dates, np.array(origins, dtype='datetime64[D]'), side='right')
+        for origin, size in zip(origins, train_sizes):
+            if size == 0:
+                raise ValueError(f"Origin {origin} is before the first date")
+            if size + horizon > len(values):
+                raise ValueError(f"Origin {origin} has fewer than {horizon} periods after it")
+
+        start = time.perf_counter()
+        outcomes = self._run_folds(model, dates, values, value_column, train_sizes, horizon,
+                                   transform, train_params)
+
+        folds = []
+        errors = np.full((len(origins), horizon), np.nan)
+        actuals = np.full((len(origins), horizon), np.nan)
+        for i, (origin, size, outcome) in enumerate(zip(origins, train_sizes, outcomes)):
+            fold = {'origin': origin, 'train_size': int(size)}
+            if isinstance(outcome, Exception):
+                fold['error'] = str(outcome)
+            else:
+                actuals[i] = values[size:size + horizon]
+                errors[i] = actuals[i] - np.asarray(outcome['predictions'])
+                fold.update(outcome)
+                fold['actuals'] = [None if np.isnan(v) else float(v) for v in actuals[i]]
+                fold['metrics'] = _error_metrics(errors[i], actuals[i])
+            folds.append(fold)
+
+        counts = np.isfinite(errors).sum(axis=0)
+        horizon_mae = np.where(counts > 0, np.nansum(np.abs(errors), axis=0) / np.maximum(counts, 1), np.nan)
+        result = {
+            'model': type(model).__name__,
+            'config': model.get_config(),
+            'value_column': value_column,
+            'horizon': horizon,
+            'dataset_version': dataset_version,
+            'folds': folds,
+            'pooled': _error_metrics(errors.ravel(), actuals.ravel()),
+            'mae_by_horizon': [None if np.isnan(v) else float(v) for v in horizon_mae],
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        }
+        logger.info(f"Backtested {result['model']} on {value_column}: {len(folds)} folds, "
+                    f"{result['elapsed_ms']:.0f} ms")
+
+        if all('error' not in fold for fold in folds):
+            # Failed folds may be transient (e.g. a worker killed), so they are not cached
+            with self._lock:
+                self._results[key] = result
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        return {**result, 'cached': False}
+
+    def _run_folds(self, model: BaseForecastModel, dates: np.ndarray, values: np.ndarray,
+                   value_column: str, train_sizes: np.ndarray, horizon: int, transform: str,
+                   train_params: Dict[str, Any]) -> List[Any]:
+        """Run every fold on a process pool; a failed fold yields its exception."""
+        length = len(values)
+        block = shared_memory.SharedMemory(create=True, size=max(length, 1) * 16)
+        try:
+            np.ndarray((length,), dtype=np.int64, buffer=block.buf)[:] = dates.astype(np.int64)
+            np.ndarray((length,), dtype=np.float64, buffer=block.buf, offset=length * 8)[:] = values
+
+            # spawn: the API process runs thread pools, which fork does not copy safely
+            with ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(train_sizes)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_attach_series,
+                initargs=(block.name, length),
+            ) as pool:
+                futures = [
+                    pool.submit(_run_fold, model, value_column, int(size), horizon, transform, train_params)
+                    for size in train_sizes
+                ]
+                outcomes = []
+                for future in futures:
+                    try:
+                        outcomes.append(future.result())
+                    except Exception as e:
+                        logger.warning(f"Backtest fold failed: {str(e)}")
+                        outcomes.append(e)
+                return outcomes
+        finally:
+            block.close()
+            block.unlink()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters and pool size."""
+        with self._lock:
+            return {
+                'entries': len(self._results),
+                'hits': self.hits,
+                'misses': self.misses,
+                'max_workers': self.max_workers,
+            }
+
+
+# Shared backtest runner
+backtest_runner = BacktestRunner(max_workers=settings.BACKTEST_MAX_WORKERS)
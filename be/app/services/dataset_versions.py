@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from sqlalchemy import text
+from app.core.database import get_database_connection
+from app.services.forecast_cache import forecast_cache
+from app.services.series_store import series_store
+from app.services.table_catalog import table_catalog
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetVersions:
+    """
+    Cheap, TTL-cached fingerprints of tables.
+
+    A fingerprint combines the row count with an md5 of every row, using the
+    query prebuilt by the table catalog, so in-place corrections change it
+    too. Tables held by the series store reuse the store's snapshot version. Fingerprints are cached for `ttl` seconds so
+    a burst of requests costs at most one lookup per table.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._cache: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table_name: str) -> str:
+        """
+        Get the version of a catalogued table.
+
+        Args:
+            table_name: Name of the table
+
+        Returns:
+            Version string
+
+        Raises:
+            ValueError: If the table is not in the catalog
+        """
+        if series_store.handles(table_name):
+            return series_store.get().version
+
+        now = time.time()
+        cached = self._cache.get(table_name)
+        if cached and now - cached[0] < self.ttl:
+            return cached[1]
+
+        info = table_catalog.get(table_name)
+        if info is None:
+            raise ValueError(f"Table '{table_name}' not found")
+
+        with get_database_connection() as conn:
+            count, digest = conn.execute(text(info.fingerprint)).fetchone()
+        version = f"{count}:{digest}"
+
+        with self._lock:
+            self._cache[table_name] = (now, version)
+        if cached and cached[1] != version:
+            forecast_cache.invalidate(table_name)
+        return version
+
+    def combined(self, *table_names: str) -> str:
+        """Single version string covering several tables (e.g. location lookups)."""
+        return "|".join(self.get(name) for name in table_names)
+
+    def combined_or_none(self, *table_names: str) -> Optional[str]:
+        """
+        combined(), or None if a table is missing from the catalog or its
+        fingerprint cannot be read (callers then skip conditional caching).
+        """
+        try:
+            return self.combined(*table_names)
+        except Exception as e:
+            logger.warning(f"No dataset version for {', '.join(table_names)}: {str(e)}")
+            return None
+
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        """Drop cached fingerprints and forecasts (all tables if table_name is None)."""
+        with self._lock:
+            if table_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(table_name, None)
+        if table_name is None or series_store.handles(table_name):
+            series_store.invalidate()
+        forecast_cache.invalidate(table_name)
+
+
+class CountCache:
+    """
+    Row counts memoized per (table, filter, dataset version).
+
+    The dataset version is part of the key, so a new load simply stops
+    matching old entries; the oldest entries are dropped past `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], int]) -> int:
+        """
+        Return the cached count for key, running compute() on a miss.
+
+        Args:
+            key: Hashable key that must include the dataset version
+            compute: Function that runs the COUNT query
+
+        Returns:
+            Row count
+        """
+        with self._lock:
+            if key in self._counts:
+                self._counts.move_to_end(key)
+                return self._counts[key]
+
+        count = compute()
+        with self._lock:
+            self._counts[key] = count
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return count
+
+
+# Shared fingerprints used for HTTP caching and result caches
+dataset_versions = DatasetVersions()
+
+# Shared COUNT(*) results keyed on dataset version
+count_cache = CountCache()
@@ -0,0 +1,98 @@
+import copy
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached result (its JSON size)."""
+    return len(json.dumps(value, default=str))
+
+
+class ForecastCache:
+    """
+    LRU cache of generated forecasts with a memory cap.
+
+    Keys are (table_name, model_type, registry version, value_column,
+    horizon, dataset version, ...), so a new model version or a new data load
+    stops matching old entries; `invalidate` also drops them eagerly so they
+    do not take up the budget. Entries are evicted oldest first once the
+    estimated size exceeds `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Return a copy of the cached result, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[0]
+        # Callers are free to modify what they get back
+        return copy.deepcopy(value)
+
+    def put(self, key: Tuple, value: Any) -> None:
+        """Store a result, evicting least recently used entries past the cap."""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate(self, table_name: Optional[str] = None, model_type: Optional[str] = None) -> int:
+        """
+        Drop cached forecasts.
+
+        Args:
+            table_name: Only drop forecasts for this table (all tables if None)
+            model_type: Only drop forecasts of this model type (all types if None)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (table_name is None or key[0] == table_name)
+                and (model_type is None or key[1] == model_type)
+            ]
+            for key in stale:
+                self._size -= self._entries.pop(key)[1]
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# Shared cache of trained-model forecasts
+forecast_cache = ForecastCache(max_bytes=settings.FORECAST_CACHE_MAX_MB * 1024 * 1024)
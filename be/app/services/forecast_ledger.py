@@ -0,0 +1,287 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from app.core.database import get_database_connection
+from app.models.model_registry_service import ModelRegistryService
+from app.services.table_catalog import table_catalog
+
+logger = logging.getLogger(__name__)
+
+# Kept in sync with etl/load/schema.sql
+CREATE_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS forecast_ledger (
+        id BIGSERIAL PRIMARY KEY,
+        table_name VARCHAR(100) NOT NULL,
+        value_column VARCHAR(100) NOT NULL,
+        model_type VARCHAR(50) NOT NULL,
+        model_version VARCHAR(50) NOT NULL,
+        origin_date DATE NOT NULL,
+        horizon SMALLINT NOT NULL,
+        target_date DATE NOT NULL,
+        predicted DOUBLE PRECISION NOT NULL,
+        actual DOUBLE PRECISION,
+        scored_at TIMESTAMP,
+        UNIQUE (table_name, value_column, model_type, model_version, origin_date, horizon)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_forecast_ledger_pending
+    ON forecast_ledger(table_name, value_column, target_date) WHERE scored_at IS NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_forecast_ledger_scored
+    ON forecast_ledger(table_name, target_date, model_type, horizon) WHERE actual IS NOT NULL
+    """,
+]
+
+# Forecast periods are weekly; a target is matched with the first price row of its week
+PERIOD_DAYS = 7
+
+
+class ForecastLedger:
+    """
+    Every served or materialized forecast, one row per (forecast, horizon step).
+
+    A forecast is identified by model type, model version and origin date
+    (the day before its first period), so serving the same forecast again
+    is a no-op. Rows stay pending until the prices of their target week are
+    loaded; `score` only touches pending rows (a partial index), so scoring
+    after each load never rescans history. Errors are aggregated from the
+    scored rows on request.
+
+    A registered model version is only recorded and scored for the column
+    it was trained on; other forecasts (empirical, simple_linear) have no
+    registry entry and are always kept.
+    """
+
+    def __init__(self, max_recorded: int = 4096):
+        self.max_recorded = max_recorded
+        self.registry = ModelRegistryService()
+        self._table_ready = False
+        # Forecasts already written by this process, to skip repeat inserts
+        self._recorded: "OrderedDict[tuple, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ensure_table(self, conn: Any) -> None:
+        """Create the table and its indexes if they do not exist"""
+        if self._table_ready:
+            return
+        for statement in CREATE_STATEMENTS:
+            conn.execute(text(statement))
+        conn.commit()
+        self._table_ready = True
+
+    def _trained_on_other_column(self, table_name: str, value_column: str, model_type: str,
+                                 model_version: Optional[str]) -> bool:
+        """True if model_version is registered and was trained on a column other than value_column"""
+        if not model_version:
+            return False
+        trained_column = self.registry.get_version_column(table_name, model_type, model_version)
+        return trained_column is not None and trained_column != value_column
+
+    def record(self, table_name: str, value_column: str, model_type: str,
+               model_version: Optional[str], forecast: List[Dict[str, Any]]) -> int:
+        """
+        Store the point forecasts (`predicted_value`) of one forecast.
+
+        Never raises: the ledger must not affect serving.
+
+        Returns:
+            Number of rows written (0 if already recorded, nothing to record
+            or the model version was trained on another column)
+        """
+        points = [item for item in forecast if item.get('predicted_value') is not None]
+        if not points:
+            return 0
+        if self._trained_on_other_column(table_name, value_column, model_type, model_version):
+            logger.warning(f"Not recording {model_type} {model_version} for {table_name}.{value_column}: "
+                           f"the version was trained on another column")
+            return 0
+        origin = date.fromisoformat(points[0]['date']) - timedelta(days=PERIOD_DAYS * points[0]['period'])
+        model_version = model_version or ''
+        key = (table_name, value_column, model_type, model_version, origin, len(points))
+        with self._lock:
+            if key in self._recorded:
+                return 0
+
+        rows = [
+            {
+                'table_name': table_name,
+                'value_column': value_column,
+                'model_type': model_type,
+                'model_version': model_version,
+                'origin_date': origin,
+                'horizon': item['period'],
+                'target_date': date.fromisoformat(item['date']),
+                'predicted': float(item['predicted_value']),
+            }
+            for item in points
+        ]
+        try:
+            with get_database_connection() as conn:
+                self.ensure_table(conn)
+                conn.execute(text("""
+                    INSERT INTO forecast_ledger (
+                        table_name, value_column, model_type, model_version,
+                        origin_date, horizon, target_date, predicted
+                    ) VALUES (
+                        :table_name, :value_column, :model_type, :model_version,
+                        :origin_date, :horizon, :target_date, :predicted
+                    )
+                    ON CONFLICT DO NOTHING
+                """), rows)
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Could not record forecast {table_name}.{value_column} ({model_type}): {str(e)}")
+            return 0
+
+        with self._lock:
+            self._recorded[key] = None
+            while len(self._recorded) > self.max_recorded:
+                self._recorded.popitem(last=False)
+        return len(rows)
+
+    def score(self, table_name: str) -> Dict[str, int]:
+        """
+        Fill in realized prices of pending rows whose target week has data.
+
+        Each pending row takes the first non-null value of its column dated
+        within [target_date, target_date + 7). Rows whose week has passed
+        without a price are closed with no actual. Pending rows of a model
+        version trained on another column are discarded unscored.
+
+        Returns:
+            Dictionary with the number of rows scored, closed and discarded
+        """
+        info = table_catalog.require_series_table(table_name)
+        with get_database_connection() as conn:
+            self.ensure_table(conn)
+            pending = conn.execute(text("""
+                SELECT DISTINCT value_column, model_type, model_version FROM forecast_ledger
+                WHERE table_name = :table_name AND scored_at IS NULL
+            """), {'table_name': table_name}).fetchall()
+            foreign = [
+                row for row in pending
+                if self._trained_on_other_column(table_name, row.value_column, row.model_type, row.model_version)
+            ]
+            discarded = 0
+            for row in foreign:
+                discarded += conn.execute(text("""
+                    DELETE FROM forecast_ledger
+                    WHERE table_name = :table_name
+                    AND value_column = :value_column
+                    AND model_type = :model_type
+                    AND model_version = :model_version
+                    AND scored_at IS NULL
+                """), {'table_name': table_name, 'value_column': row.value_column,
+                       'model_type': row.model_type, 'model_version': row.model_version}).rowcount
+            columns = sorted({row.value_column for row in pending if row not in foreign})
+            scored = closed = 0
+            # Column names come from the table catalog, never from the request
+            date_column = info.date_column
+            for column in columns:
+                if column not in info.columns:
+                    continue
+                scored += conn.execute(text(f"""
+                    UPDATE forecast_ledger l
+                    SET actual = s.actual, scored_at = CURRENT_TIMESTAMP
+                    FROM (
+                        SELECT l2.id, (
+                            SELECT p.{column} FROM {table_name} p
+                            WHERE p.{date_column} >= l2.target_date
+                            AND p.{date_column} < l2.target_date + {PERIOD_DAYS}
+                            AND p.{column} IS NOT NULL
+                            ORDER BY p.{date_column}
+                            LIMIT 1
+                        ) AS actual
+                        FROM forecast_ledger l2
+                        WHERE l2.table_name = :table_name
+                        AND l2.value_column = :value_column
+                        AND l2.scored_at IS NULL
+                        AND l2.target_date <= (SELECT MAX({date_column}) FROM {table_name})
+                    ) s
+                    WHERE l.id = s.id AND s.actual IS NOT NULL
+                """), {'table_name': table_name, 'value_column': column}).rowcount
+                closed += conn.execute(text(f"""
+                    UPDATE forecast_ledger
+                    SET scored_at = CURRENT_TIMESTAMP
+                    WHERE table_name = :table_name
+                    AND value_column = :value_column
+                    AND scored_at IS NULL
+                    AND target_date + {PERIOD_DAYS} <= (SELECT MAX({date_column}) FROM {table_name})
+                """), {'table_name': table_name, 'value_column': column}).rowcount
+            conn.commit()
+
+        if scored or closed or discarded:
+            logger.info(f"Scored {scored} forecast rows of {table_name} ({closed} without a price, "
+                        f"{discarded} of models trained on another column discarded)")
+        return {'scored': scored, 'closed': closed, 'discarded': discarded}
+
+    def accuracy(self, table_name: str, window_days: int = 90,
+                 value_column: Optional[str] = None, model_type: Optional[str] = None,
+                 by_version: bool = False) -> Dict[str, Any]:
+        """
+        Rolling MAE and MAPE of scored forecasts per model and horizon.
+
+        Args:
+            table_name: Name of the table
+            window_days: Only targets in the last `window_days` days of scored data
+            value_column: Optional column filter
+            model_type: Optional model filter
+            by_version: Also group by model version
+
+        Returns:
+            Dictionary with the window end and one entry per group
+        """
+        version_column = "model_version, " if by_version else ""
+        filters = ""
+        params: Dict[str, Any] = {'table_name': table_name, 'window_days': window_days}
+        if value_column:
+            filters += " AND value_column = :value_column"
+            params['value_column'] = value_column
+        if model_type:
+            filters += " AND model_type = :model_type"
+            params['model_type'] = model_type
+
+        with get_database_connection() as conn:
+            self.ensure_table(conn)
+            window_end = conn.execute(text("""
+                SELECT MAX(target_date) FROM forecast_ledger
+                WHERE table_name = :table_name AND actual IS NOT NULL
+            """), {'table_name': table_name}).scalar()
+            if window_end is None:
+                return {'window_end': None, 'results': []}
+            params['window_end'] = window_end
+            rows = conn.execute(text(f"""
+                SELECT value_column, model_type, {version_column}horizon,
+                       COUNT(*) AS count,
+                       AVG(ABS(actual - predicted)) AS mae,
+                       AVG(ABS(actual - predicted) / NULLIF(ABS(actual), 0)) * 100 AS mape
+                FROM forecast_ledger
+                WHERE table_name = :table_name
+                AND actual IS NOT NULL
+                AND target_date > CAST(:window_end AS date) - :window_days
+                {filters}
+                GROUP BY value_column, model_type, {version_column}horizon
+                ORDER BY value_column, model_type, {version_column}horizon
+            """), params).fetchall()
+
+        return {
+            'window_end': window_end.strftime('%Y-%m-%d'),
+            'results': [
+                {
+                    **dict(row._mapping),
+                    'mae': float(row.mae) if row.mae is not None else None,
+                    'mape': float(row.mape) if row.mape is not None else None,
+                }
+                for row in rows
+            ],
+        }
+
+
+# Shared ledger of served forecasts
+forecast_ledger = ForecastLedger()
@@ -1,15 +1,36 @@
-from typing import Dict, Any, Optional, List
+import copy
+import importlib.util
+from typing import Dict, Any, Optional, List, Tuple
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from app.core.config import settings
+from app.core.single_flight import SingleFlight
+from app.core.transforms import ColumnTransform
 from app.models.model_registry_service import ModelRegistryService
+from app.models.numpy_lstm import NumpyLSTMModel
+from app.services.dataset_versions import dataset_versions
+from app.services.forecast_cache import forecast_cache
+from app.services.prediction_intervals import interval_engine, interval_quantiles
 
-# Try to import LSTM model, but don't fail if Keras is not installed
-try:
-    from app.models.lstm_model import LSTMModel
-    LSTM_AVAILABLE = True
-except ImportError:
-    LSTM_AVAILABLE = False
-    LSTMModel = None
+# Keras is only imported for models without a NumPy export, so serving
+# forecasts does not load TensorFlow into the API process
+LSTM_AVAILABLE = importlib.util.find_spec("keras") is not None
+
+# Identical forecasts requested at the same time share one rollout
+forecast_flight = SingleFlight()
+
+# Registry model types served by the (NumPy or Keras) LSTM engines
+TRAINED_LSTM_TYPES = ('lstm', 'lstm_direct')
+
+# Trained-model forecasts are weekly and dated from the day they are served
+FORECAST_DAY_INTERVAL = 7
+
+
+def forecast_date(period: int, origin: Optional[Any] = None) -> str:
+    """Date (YYYY-MM-DD) of a forecast period counted from origin (default: today)"""
+    origin = origin or datetime.now().date()
+    return (origin + timedelta(days=period * FORECAST_DAY_INTERVAL)).strftime('%Y-%m-%d')
 
 
 class ForecastService:
@@ -18,9 +39,35 @@ class ForecastService:
     def __init__(self):
         self.registry = ModelRegistryService()
     
+    def select_model(self, table_name: str, model_type: str, value_column: str,
+                     forecast_periods: int) -> Tuple[str, Optional[str]]:
+        """
+        Registry model type and version that should serve a forecast.
+        
+        Only versions trained on value_column are considered. An 'lstm'
+        request is served by the latest 'lstm_direct' version of that column
+        when its horizon covers forecast_periods, so the forecast is a single
+        forward pass.
+        
+        Returns:
+            Tuple of (model_type, latest version or None if no version was
+            trained on value_column)
+        """
+        if model_type.lower() == 'lstm':
+            direct_version = self.registry.get_latest_version(table_name, 'lstm_direct', value_column)
+            if direct_version is not None:
+                try:
+                    metadata = self.registry.get_model_metadata(table_name, 'lstm_direct', direct_version)
+                except ValueError:
+                    metadata = {}
+                if metadata.get('horizon', 0) >= forecast_periods:
+                    return 'lstm_direct', direct_version
+        return model_type, self.registry.get_latest_version(table_name, model_type, value_column)
+    
     def generate_forecast(self, table_name: str, model_type: str, 
                          value_column: str, forecast_periods: int,
-                         version: Optional[str] = None) -> List[Dict[str, Any]]:
+                         version: Optional[str] = None,
+                         interval_level: float = settings.FORECAST_INTERVAL_LEVEL) -> List[Dict[str, Any]]:
         """
         Generate forecast using a trained model.
         
@@ -29,17 +76,68 @@ class ForecastService:
             model_type: Type of model ('lstm', 'arima', etc.)
             value_column: Column that was forecasted
             forecast_periods: Number of periods to forecast
-            version: Optional model version (defaults to latest)
+            version: Optional model version (defaults to the latest version of
+                the model select_model picks)
+            interval_level: Central level of confidence_interval (e.g. 0.9)
             
         Returns:
-            List of forecast dictionaries with date, predicted_value, etc.
+            List of forecast dictionaries with date, predicted_value (point
+            forecast of value_column), scenarios and confidence_interval
+        
+        Results are cached per (table, model type, model version, column,
+        horizon, interval level, dataset version). Forecast dates start from
+        today, so the date is part of the key as well. Concurrent misses on
+        the same key wait for a single computation.
         """
-        # Load model
-        if model_type.lower() == 'lstm':
-            if not LSTM_AVAILABLE:
-                raise ValueError("LSTM model is not available. Keras/TensorFlow is not installed.")
+        if version is None:
+            model_type, version = self.select_model(table_name, model_type, value_column, forecast_periods)
+            if version is None:
+                raise ValueError(f"Model not found: {table_name}_{model_type} for column '{value_column}'")
+        dataset_version = dataset_versions.get(table_name)
+        cache_key = (
+            table_name, model_type.lower(), version, value_column, forecast_periods,
+            interval_level, dataset_version, datetime.now().date()
+        )
+        cached = forecast_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        forecast_data, shared = forecast_flight.do(
+            cache_key,
+            lambda: self._compute_forecast(
+                table_name, model_type, value_column, forecast_periods, version, interval_level
+            )
+        )
+        if shared:
+            return copy.deepcopy(forecast_data)
+        forecast_cache.put(cache_key, forecast_data)
+        return forecast_data
+    
+    def _compute_forecast(self, table_name: str, model_type: str, value_column: str,
+                          forecast_periods: int, version: str,
+                          interval_level: float = settings.FORECAST_INTERVAL_LEVEL) -> List[Dict[str, Any]]:
+        """
+        Load the model and roll out the forecast (uncached).
+        
+        confidence_interval comes from bootstrapping the version's held-out
+        residuals (see IntervalEngine); versions saved without residuals
+        keep the previous fixed ±10% band.
+        """
+        # Load model (NumPy engine when the model has exported weights)
+        if model_type.lower() in TRAINED_LSTM_TYPES:
+            model_path = self.registry.get_model_path(table_name, model_type, version)
+            if NumpyLSTMModel.is_exported(str(model_path)):
+                model_class = NumpyLSTMModel
+            elif LSTM_AVAILABLE:
+                from app.models.lstm_model import LSTMModel
+                model_class = LSTMModel
+            else:
+                raise ValueError(
+                    "LSTM model is not available. Keras/TensorFlow is not installed "
+                    "and the model has no NumPy export."
+                )
             model = self.registry.load_model(
-                LSTMModel, table_name, model_type, version
+                model_class, table_name, model_type, version
             )
         else:
             raise ValueError(f"Unsupported model type: {model_type}")
@@ -50,23 +148,41 @@ class ForecastService:
         # Get metadata to determine date interval
         metadata = self.registry.get_model_metadata(table_name, model_type, version)
         
-        # Generate future dates (assuming weekly intervals, adjust as needed)
-        # You might want to store the last date in metadata
-        last_date = datetime.now()  # Or get from metadata
-        day_interval = 7  # Weekly forecasts
+        # Error quantiles of this version, simulated once and cached
+        offsets = interval_engine.cached_offsets(
+            (table_name, model_type.lower(), version),
+            lambda: self.registry.get_residuals(table_name, model_type, version),
+            forecast_periods,
+            interval_quantiles(interval_level)
+        )
+        
+        # Undo the transform the model was trained on
+        column_transform = ColumnTransform.from_dict(metadata.get('transform'))
+        column = metadata.get('value_column', value_column)
+        points = np.asarray(predictions, dtype=np.float64)
+        predictions = column_transform.inverse(points, column).tolist()
+        if offsets is not None:
+            lower = column_transform.inverse(points + offsets[0], column).tolist()
+            upper = column_transform.inverse(points + offsets[1], column).tolist()
+        else:
+            lower = [p * 0.9 for p in predictions]
+            upper = [p * 1.1 for p in predictions]
+        
+        # Weekly dates from today (materialized rows are re-dated the same way on read)
+        origin = datetime.now().date()
         
         forecast_data = []
-        for i, prediction in enumerate(predictions):
-            forecast_date = last_date + timedelta(days=(i + 1) * day_interval)
+        for i, (prediction, low, high) in enumerate(zip(predictions, lower, upper)):
             forecast_data.append({
-                'date': forecast_date.strftime('%Y-%m-%d'),
+                'date': forecast_date(i + 1, origin),
                 'period': i + 1,
+                'predicted_value': float(prediction),
                 'predicted_value_bajista': float(prediction) * 2 / 0.95,
                 'predicted_value_conservador': float(prediction) * 2 / 0.93,
                 'predicted_value_alza': float(prediction) * 2 / 0.90,
                 'confidence_interval': {
-                    'lower': float(prediction * 0.9),  # Simple 10% interval
-                    'upper': float(prediction * 1.1)
+                    'lower': float(low),
+                    'upper': float(high)
                 }
             })
         
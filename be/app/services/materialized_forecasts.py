@@ -0,0 +1,271 @@
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import get_database_connection
+from app.core.executors import submit
+from app.core.single_flight import SingleFlight
+from app.services.dataset_versions import dataset_versions
+from app.services.forecast_ledger import forecast_ledger
+from app.services.forecast_service import TRAINED_LSTM_TYPES, ForecastService, forecast_date
+
+logger = logging.getLogger(__name__)
+
+# Kept in sync with etl/load/schema.sql
+CREATE_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS forecasts_materialized (
+        id SERIAL PRIMARY KEY,
+        table_name VARCHAR(100) NOT NULL,
+        value_column VARCHAR(100) NOT NULL,
+        model_type VARCHAR(50) NOT NULL,
+        model_version VARCHAR(50) NOT NULL,
+        horizon INTEGER NOT NULL,
+        dataset_version VARCHAR(100) NOT NULL,
+        period INTEGER NOT NULL,
+        date DATE NOT NULL,
+        predicted_value DOUBLE PRECISION,
+        predicted_value_bajista DOUBLE PRECISION,
+        predicted_value_conservador DOUBLE PRECISION,
+        predicted_value_alza DOUBLE PRECISION,
+        ci_lower DOUBLE PRECISION,
+        ci_upper DOUBLE PRECISION,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_forecasts_materialized_lookup
+    ON forecasts_materialized(table_name, value_column, model_type, model_version, horizon)
+    """,
+]
+
+FORECAST_COLUMNS = """
+    date, period, predicted_value, predicted_value_bajista, predicted_value_conservador,
+    predicted_value_alza, ci_lower, ci_upper
+"""
+
+
+class MaterializedForecastService:
+    """
+    Precomputed trained-model forecasts stored in `forecasts_materialized`.
+
+    A forecast only changes when a new model version is trained or new data
+    is loaded, so it is computed once for `horizon` periods and read back
+    with one indexed lookup. Shorter horizons are a prefix of the stored
+    rollout. Periods are re-dated from the day they are served, as live
+    forecasts are. Rows record the model and dataset versions they were built
+    from; a lookup that does not match the current versions is a miss.
+    """
+
+    def __init__(self, horizon: int = 52):
+        self.horizon = horizon
+        self.forecast_service = ForecastService()
+        self._table_ready = False
+        self._lock = threading.Lock()
+        # Last (dataset version, model versions) refreshed per table, to skip repeated attempts
+        self._attempted: Dict[str, Tuple] = {}
+        # At most one queued or running background refresh per table
+        self._refresh_flight = SingleFlight()
+
+    def ensure_table(self) -> None:
+        """Create the table and its index if they do not exist"""
+        if self._table_ready:
+            return
+        with get_database_connection() as conn:
+            for statement in CREATE_STATEMENTS:
+                conn.execute(text(statement))
+            conn.commit()
+        self._table_ready = True
+
+    def refresh(self, table_name: str, value_column: str, model_type: str = "lstm") -> int:
+        """
+        Compute the forecast of the latest model version and replace the stored rows.
+
+        Args:
+            table_name: Name of the table
+            value_column: Column that was forecasted
+            model_type: Type of model
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            ValueError: If the model is not registered
+        """
+        self.ensure_table()
+        registry = self.forecast_service.registry
+        model_version = registry.get_latest_version(table_name, model_type, value_column)
+        if model_version is None:
+            raise ValueError(f"Model not found: {table_name}_{model_type} for column '{value_column}'")
+        dataset_version = dataset_versions.get(table_name)
+
+        forecast = self.forecast_service.generate_forecast(
+            table_name=table_name,
+            model_type=model_type,
+            value_column=value_column,
+            forecast_periods=self.horizon,
+            version=model_version
+        )
+        rows = [
+            {
+                'table_name': table_name,
+                'value_column': value_column,
+                'model_type': model_type,
+                'model_version': model_version,
+                'horizon': self.horizon,
+                'dataset_version': dataset_version,
+                'period': item['period'],
+                'date': item['date'],
+                'predicted': item.get('predicted_value'),
+                'bajista': item['predicted_value_bajista'],
+                'conservador': item['predicted_value_conservador'],
+                'alza': item['predicted_value_alza'],
+                'ci_lower': item['confidence_interval']['lower'],
+                'ci_upper': item['confidence_interval']['upper'],
+            }
+            for item in forecast
+        ]
+
+        with get_database_connection() as conn:
+            conn.execute(text("""
+                DELETE FROM forecasts_materialized
+                WHERE table_name = :table_name AND value_column = :value_column AND model_type = :model_type
+            """), {'table_name': table_name, 'value_column': value_column, 'model_type': model_type})
+            if rows:
+                conn.execute(text("""
+                    INSERT INTO forecasts_materialized (
+                        table_name, value_column, model_type, model_version, horizon, dataset_version,
+                        period, date, predicted_value, predicted_value_bajista, predicted_value_conservador,
+                        predicted_value_alza, ci_lower, ci_upper
+                    ) VALUES (
+                        :table_name, :value_column, :model_type, :model_version, :horizon, :dataset_version,
+                        :period, CAST(:date AS date), :predicted, :bajista, :conservador,
+                        :alza, :ci_lower, :ci_upper
+                    )
+                """), rows)
+            conn.commit()
+
+        forecast_ledger.record(table_name, value_column, model_type, model_version, forecast)
+        logger.info(f"Materialized {len(rows)} forecast rows for {table_name}.{value_column} ({model_type} {model_version})")
+        return len(rows)
+
+    def refresh_table(self, table_name: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Refresh every trained LSTM, recursive and direct, of a table (after
+        a price load or training).
+
+        Unless forced, runs at most once per (dataset version, model versions),
+        so callers can trigger it on every stale lookup.
+
+        Returns:
+            Dictionary of "value_column/model_type" -> rows written or error message
+        """
+        registry = self.forecast_service.registry
+        # Versions of one model type may be trained on different columns
+        columns = sorted({
+            (v.get('value_column', m['value_column']), m['model_type'])
+            for m in registry.list_models(table_name)
+            if m['model_type'] in TRAINED_LSTM_TYPES
+            for v in m['versions']
+        })
+        models = [
+            {'value_column': column, 'model_type': model_type,
+             'latest_version': registry.get_latest_version(table_name, model_type, column)}
+            for column, model_type in columns
+        ]
+        state = (
+            dataset_versions.get(table_name),
+            tuple((m['value_column'], m['model_type'], m['latest_version']) for m in models)
+        )
+        with self._lock:
+            if not force and self._attempted.get(table_name) == state:
+                return {}
+            self._attempted[table_name] = state
+
+        results = {}
+        for m in models:
+            key = f"{m['value_column']}/{m['model_type']}"
+            try:
+                results[key] = self.refresh(table_name, m['value_column'], m['model_type'])
+            except Exception as e:
+                logger.warning(f"Could not materialize forecast {table_name}.{key}: {str(e)}")
+                results[key] = f"error: {str(e)}"
+        return results
+
+    def refresh_table_async(self, table_name: str) -> Future:
+        """
+        Queue refresh_table on the bounded "inference" pool (e.g. after a
+        stale lookup). Calls for a table with a refresh already queued or
+        running share it instead of queueing another rollout.
+        """
+        future, _ = self._refresh_flight.submit(
+            table_name, lambda: self.refresh_table(table_name), lambda job: submit("inference", job)
+        )
+        return future
+
+    def lookup(self, table_name: str, value_column: str, model_type: str,
+               forecast_periods: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read a stored forecast with one indexed query.
+
+        Returns:
+            Forecast dictionaries (same shape as ForecastService), or None if
+            nothing current is stored for the column's latest model and the data
+        """
+        if forecast_periods > self.horizon:
+            return None
+        model_version = self.forecast_service.registry.get_latest_version(table_name, model_type, value_column)
+        if model_version is None:
+            return None
+        dataset_version = dataset_versions.get(table_name)
+
+        self.ensure_table()
+        with get_database_connection() as conn:
+            result = conn.execute(text(f"""
+                SELECT {FORECAST_COLUMNS}
+                FROM forecasts_materialized
+                WHERE table_name = :table_name
+                AND value_column = :value_column
+                AND model_type = :model_type
+                AND model_version = :model_version
+                AND horizon = :horizon
+                AND dataset_version = :dataset_version
+                AND period <= :periods
+                ORDER BY period
+            """), {
+                'table_name': table_name,
+                'value_column': value_column,
+                'model_type': model_type,
+                'model_version': model_version,
+                'horizon': self.horizon,
+                'dataset_version': dataset_version,
+                'periods': forecast_periods,
+            })
+            rows = result.fetchall()
+
+        if len(rows) < forecast_periods:
+            return None
+        # Stored dates are from the refresh day; serve them dated from today like a live forecast
+        today = datetime.now().date()
+        return [
+            {
+                'date': forecast_date(row.period, today),
+                'period': row.period,
+                'predicted_value': row.predicted_value,
+                'predicted_value_bajista': row.predicted_value_bajista,
+                'predicted_value_conservador': row.predicted_value_conservador,
+                'predicted_value_alza': row.predicted_value_alza,
+                'confidence_interval': {
+                    'lower': row.ci_lower,
+                    'upper': row.ci_upper
+                }
+            }
+            for row in rows
+        ]
+
+
+# Shared store of precomputed forecasts
+materialized_forecasts = MaterializedForecastService(horizon=settings.FORECAST_MATERIALIZED_HORIZON)
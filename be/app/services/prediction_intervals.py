@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import settings
+
+
+def interval_quantiles(level: float) -> Tuple[float, float]:
+    """Lower and upper quantiles of a central interval (0.9 -> 0.05, 0.95)."""
+    if not 0 < level < 1:
+        raise ValueError("Interval level must be between 0 and 1")
+    tail = (1 - level) / 2
+    return tail, 1 - tail
+
+
+class IntervalEngine:
+    """
+    Prediction intervals from a residual bootstrap.
+
+    Future errors are simulated by resampling held-out residuals for every
+    period of `n_paths` paths at once; with cumulative=True they add up
+    along the horizon, as the errors of a recursive rollout do. The
+    quantiles of the simulated errors are offsets to add to the point
+    forecast, so they only depend on the residuals, the horizon and the
+    quantiles. Offsets of registry models are cached per model version.
+    """
+
+    def __init__(self, n_paths: int = 2000, seed: int = 0, max_entries: int = 256):
+        self.n_paths = n_paths
+        self.seed = seed
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def simulate(self, residuals: Any, horizon: int, cumulative: bool = True) -> np.ndarray:
+        """
+        Simulated errors of every path and period.
+
+        Args:
+            residuals: Held-out residuals (actual - predicted), 1-D for one-step
+                models or (samples, width) for direct multi-horizon models
+            horizon: Number of periods
+            cumulative: Accumulate errors along the horizon (1-D residuals)
+
+        Returns:
+            Array of shape (n_paths, horizon)
+        """
+        residuals = np.asarray(residuals, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        if residuals.ndim == 2:
+            return self._simulate_blocks(residuals, horizon, rng)
+        residuals = residuals[np.isfinite(residuals)]
+        if residuals.size == 0:
+            raise ValueError("No residuals to resample")
+        errors = residuals[rng.integers(0, residuals.size, size=(self.n_paths, horizon))]
+        if cumulative:
+            np.cumsum(errors, axis=1, out=errors)
+        return errors
+
+    def _simulate_blocks(self, residuals: np.ndarray, horizon: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Resample whole rows of direct multi-horizon errors, so each path keeps
+        the error profile of one held-out forecast. Past the row width, each
+        block of `width` periods starts from the previous block's last error.
+        """
+        rows = residuals[np.isfinite(residuals).all(axis=1)]
+        if len(rows) == 0:
+            raise ValueError("No residuals to resample")
+        width = rows.shape[1]
+        n_blocks = -(-horizon // width)
+        blocks = rows[rng.integers(0, len(rows), size=(self.n_paths, n_blocks))]
+        if n_blocks > 1:
+            blocks[:, 1:, :] += np.cumsum(blocks[:, :-1, -1], axis=1)[:, :, np.newaxis]
+        return blocks.reshape(self.n_paths, -1)[:, :horizon]
+
+    def offsets(self, residuals: Any, horizon: int, quantiles: Sequence[float],
+                cumulative: bool = True) -> np.ndarray:
+        """
+        Quantiles of the simulated errors per period.
+
+        Returns:
+            Array of shape (len(quantiles), horizon)
+        """
+        return np.quantile(self.simulate(residuals, horizon, cumulative), quantiles, axis=0)
+
+    def cached_offsets(self, key: Hashable, load_residuals: Any, horizon: int,
+                       quantiles: Sequence[float], cumulative: bool = True) -> Optional[np.ndarray]:
+        """
+        offsets() of residuals that never change for a key (e.g. a registry version).
+
+        Args:
+            key: Identifies the residuals, e.g. (table, model_type, version)
+            load_residuals: Callable returning the residuals, or None if there are none
+            horizon: Number of periods
+            quantiles: Quantiles to return
+            cumulative: Accumulate errors along the horizon
+
+        Returns:
+            Offsets, or None if the key has no residuals
+        """
+        entry_key = (key, horizon, tuple(quantiles), cumulative)
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return self._entries[entry_key]
+            self.misses += 1
+
+        residuals = load_residuals()
+        result = None if residuals is None or len(residuals) == 0 else \
+            self.offsets(residuals, horizon, quantiles, cumulative)
+        if result is not None:
+            # Shared by every request of the key
+            result.flags.writeable = False
+
+        with self._lock:
+            self._entries[entry_key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters and simulation size."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'paths': self.n_paths,
+            }
+
+
+# Shared interval engine
+interval_engine = IntervalEngine(n_paths=settings.FORECAST_INTERVAL_PATHS)
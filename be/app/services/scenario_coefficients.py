@@ -0,0 +1,241 @@
+import logging
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional
+import numpy as np
+from sqlalchemy import text
+from app.core.database import get_database_connection
+
+logger = logging.getLogger(__name__)
+
+# Kept in sync with etl/load/schema.sql
+CREATE_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS scenario_coefficients (
+        id SERIAL PRIMARY KEY,
+        version INTEGER NOT NULL,
+        month DATE NOT NULL,
+        coefficient DOUBLE PRECISION NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (version, month)
+    )
+    """,
+]
+
+# Coefficients used before any version is stored (version 0)
+DEFAULT_COEFFICIENTS = {
+    "2026-02": 0.7929,
+    "2026-03": 0.7889,
+    "2026-04": 0.7913,
+    "2026-05": 0.8094,
+    "2026-06": 0.8162,
+    "2026-07": 0.8464,
+    "2026-08": 0.8549,
+}
+
+# Scenario spreads applied to the coefficient after the first period
+BAJISTA_FACTOR = 0.98
+ALZA_FACTOR = 1.02
+
+
+class CoefficientSet:
+    """
+    One immutable version of the monthly coefficients as sorted arrays.
+
+    A date uses the coefficient of its month; any month that is not stored
+    (before, between or after the stored ones) uses the latest month's
+    coefficient, as the original hard-coded table did.
+    """
+
+    def __init__(self, version: int, coefficients: Dict[str, float]):
+        if not coefficients:
+            raise ValueError("At least one monthly coefficient is required")
+        months = np.array(list(coefficients.keys()), dtype='datetime64[M]')
+        values = np.array(list(coefficients.values()), dtype=np.float64)
+        if (values <= 0).any():
+            raise ValueError("Coefficients must be positive")
+        order = np.argsort(months)
+        self.version = version
+        self.months = months[order]
+        self.values = values[order]
+
+    def lookup(self, dates: Any) -> np.ndarray:
+        """Coefficient of each date (array of datetime64 or dates)."""
+        months = np.asarray(dates, dtype='datetime64[D]').astype('datetime64[M]')
+        idx = np.minimum(np.searchsorted(self.months, months), len(self.months) - 1)
+        return np.where(self.months[idx] == months, self.values[idx], self.values[-1])
+
+    def scenario_paths(self, base_prices: Any, dates: Any) -> Dict[str, np.ndarray]:
+        """
+        Bajista/conservador/alza prices of every base price at every date.
+
+        Args:
+            base_prices: Base prices, shape (n,)
+            dates: Forecast dates, shape (h,)
+
+        Returns:
+            Dictionary of scenario name -> array of shape (n, h)
+        """
+        base = np.asarray(base_prices, dtype=np.float64).reshape(-1, 1)
+        coefs = self.lookup(dates)
+        spread = np.ones((2, len(coefs)))
+        spread[0, 1:] = BAJISTA_FACTOR
+        spread[1, 1:] = ALZA_FACTOR
+        return {
+            'bajista': base / (coefs * spread[0]),
+            'conservador': base / coefs,
+            'alza': base / (coefs * spread[1]),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Version and its coefficients keyed by month (YYYY-MM)."""
+        return {
+            'version': self.version,
+            'coefficients': {str(m): float(v) for m, v in zip(self.months, self.values)},
+        }
+
+
+class ScenarioCoefficientStore:
+    """
+    Versioned monthly coefficients of the empirical forecast.
+
+    Each save writes a new version to `scenario_coefficients`; the latest
+    one is kept in memory as a CoefficientSet and the table is re-checked
+    at most once every `check_interval` seconds. Until a version is stored,
+    or while the database is unreachable, DEFAULT_COEFFICIENTS are used.
+    """
+
+    def __init__(self, check_interval: float = 30.0):
+        self.check_interval = check_interval
+        self._current = CoefficientSet(0, DEFAULT_COEFFICIENTS)
+        self._last_check = 0.0
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def ensure_table(self, conn: Any) -> None:
+        """Create the table if it does not exist"""
+        if self._table_ready:
+            return
+        for statement in CREATE_STATEMENTS:
+            conn.execute(text(statement))
+        conn.commit()
+        self._table_ready = True
+
+    def _read_version(self, conn: Any, version: Optional[int] = None) -> Optional[CoefficientSet]:
+        """Read one stored version (latest if None), or None if nothing is stored"""
+        if version is None:
+            version = conn.execute(text("SELECT MAX(version) FROM scenario_coefficients")).scalar()
+            if version is None:
+                return None
+        rows = conn.execute(text("""
+            SELECT month, coefficient FROM scenario_coefficients
+            WHERE version = :version ORDER BY month
+        """), {'version': version}).fetchall()
+        if not rows:
+            return None
+        return CoefficientSet(version, {row.month.strftime('%Y-%m'): row.coefficient for row in rows})
+
+    def refresh(self) -> CoefficientSet:
+        """Load the latest stored version if it changed"""
+        with self._lock:
+            try:
+                with get_database_connection() as conn:
+                    self.ensure_table(conn)
+                    latest = conn.execute(text("SELECT MAX(version) FROM scenario_coefficients")).scalar()
+                    if latest is not None and latest != self._current.version:
+                        self._current = self._read_version(conn, latest) or self._current
+                        logger.info(f"Loaded scenario coefficients version {self._current.version}")
+            except Exception as e:
+                logger.warning(f"Could not read scenario coefficients, keeping version {self._current.version}: {str(e)}")
+            self._last_check = time.time()
+            return self._current
+
+    def get(self, version: Optional[int] = None) -> CoefficientSet:
+        """
+        Current coefficients, or a specific stored version.
+
+        Raises:
+            ValueError: If the requested version does not exist
+        """
+        if version is not None:
+            if version == 0:
+                return CoefficientSet(0, DEFAULT_COEFFICIENTS)
+            if version == self._current.version:
+                return self._current
+            with get_database_connection() as conn:
+                self.ensure_table(conn)
+                stored = self._read_version(conn, version)
+            if stored is None:
+                raise ValueError(f"Scenario coefficients version {version} not found")
+            return stored
+
+        current = self._current
+        if time.time() - self._last_check >= self.check_interval:
+            return self.refresh()
+        return current
+
+    def save(self, coefficients: Dict[str, float]) -> CoefficientSet:
+        """
+        Store coefficients as a new version and make it current.
+
+        Args:
+            coefficients: Month (YYYY-MM) -> coefficient
+
+        Returns:
+            The stored version
+
+        Raises:
+            ValueError: If a month or coefficient is invalid
+        """
+        try:
+            candidate = CoefficientSet(0, coefficients)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid coefficients: {str(e)}")
+
+        with self._lock:
+            with get_database_connection() as conn:
+                self.ensure_table(conn)
+                latest = conn.execute(text("SELECT MAX(version) FROM scenario_coefficients")).scalar()
+                version = (latest or 0) + 1
+                rows = [
+                    {'version': version, 'month': date.fromisoformat(f"{m}-01"), 'coefficient': float(v)}
+                    for m, v in zip(candidate.months.astype(str), candidate.values)
+                ]
+                conn.execute(text("""
+                    INSERT INTO scenario_coefficients (version, month, coefficient)
+                    VALUES (:version, :month, :coefficient)
+                """), rows)
+                conn.commit()
+            candidate.version = version
+            self._current = candidate
+            self._last_check = time.time()
+
+        logger.info(f"Saved scenario coefficients version {version} ({len(rows)} months)")
+        return candidate
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Stored versions with their month range and creation time"""
+        with get_database_connection() as conn:
+            self.ensure_table(conn)
+            rows = conn.execute(text("""
+                SELECT version, MIN(month) AS first_month, MAX(month) AS last_month,
+                       COUNT(*) AS months, MIN(created_at) AS created_at
+                FROM scenario_coefficients
+                GROUP BY version
+                ORDER BY version DESC
+            """)).fetchall()
+        return [
+            {
+                'version': row.version,
+                'first_month': row.first_month.strftime('%Y-%m'),
+                'last_month': row.last_month.strftime('%Y-%m'),
+                'months': row.months,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+            }
+            for row in rows
+        ]
+
+
+# Shared coefficients of the empirical forecast
+scenario_coefficients = ScenarioCoefficientStore()
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from app.core.database import get_database_connection
+from app.core.executors import submit
+from app.services.forecast_cache import forecast_cache
+from app.services.forecast_ledger import forecast_ledger
+
+logger = logging.getLogger(__name__)
+
+
+class SeriesSnapshot:
+    """Immutable, column-oriented copy of a time series table sorted by date"""
+
+    def __init__(self, table_name: str, version: str, dates: np.ndarray,
+                 ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.table_name = table_name
+        self.version = version
+        self.dates = dates
+        self.ids = ids
+        self.columns = columns
+        self.loaded_at = time.time()
+        # Row order of the source table, needed to rebuild records
+        self.column_order = ['id', 'date'] + list(columns.keys())
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def date_slice(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> slice:
+        """
+        Locate an inclusive date range with binary search.
+
+        Args:
+            start_date: Optional start date (YYYY-MM-DD)
+            end_date: Optional end date (YYYY-MM-DD)
+
+        Returns:
+            Slice into the snapshot arrays
+        """
+        start = np.searchsorted(self.dates, np.datetime64(start_date, 'D'), side='left') if start_date else 0
+        stop = np.searchsorted(self.dates, np.datetime64(end_date, 'D'), side='right') if end_date else len(self.dates)
+        return slice(int(start), int(stop))
+
+    def to_records(self, sl: slice = slice(None), newest_first: bool = False,
+                   limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Rebuild row dictionaries (same shape as a SELECT * result) for a slice.
+
+        Args:
+            sl: Slice from date_slice
+            newest_first: Return rows ordered by date descending
+            limit: Optional maximum number of rows (applied after ordering)
+            offset: Number of rows to skip (applied after ordering)
+
+        Returns:
+            List of row dictionaries
+        """
+        indices = np.arange(len(self.dates))[sl]
+        if newest_first:
+            indices = indices[::-1]
+        indices = indices[offset:offset + limit] if limit is not None else indices[offset:]
+
+        values = {
+            'id': self.ids[indices].tolist(),
+            'date': self.dates[indices].astype(date).tolist(),
+        }
+        for name, arr in self.columns.items():
+            column = arr[indices]
+            if np.issubdtype(column.dtype, np.floating):
+                nan_mask = np.isnan(column)
+                if nan_mask.any():
+                    column = column.astype(object)
+                    column[nan_mask] = None
+            values[name] = column.tolist()
+
+        keys = self.column_order
+        return [dict(zip(keys, row)) for row in zip(*(values[k] for k in keys))]
+
+    def to_frame(self, sl: slice = slice(None)) -> pd.DataFrame:
+        """DataFrame for a slice with a datetime 'date' column, oldest first."""
+        frame = {'id': self.ids[sl], 'date': pd.to_datetime(self.dates[sl])}
+        frame.update({name: arr[sl] for name, arr in self.columns.items()})
+        return pd.DataFrame(frame)
+
+    def latest(self) -> Dict[str, Any]:
+        """Most recent row as a dictionary"""
+        if not len(self.dates):
+            raise ValueError(f"No data available in table '{self.table_name}'")
+        return self.to_records(slice(len(self.dates) - 1, None))[0]
+
+
+class SeriesStore:
+    """
+    Process-wide in-memory copy of a time series table.
+
+    The table is loaded once into contiguous NumPy arrays and only reloaded
+    when its row count or a hash of its rows changes. That check is one
+    aggregate query over a small table and runs at most once every
+    `check_interval` seconds. Each snapshot has a
+    `version` string that other caches use as part of their key.
+    """
+
+    def __init__(self, table_name: str = "precios_materiales", check_interval: float = 30.0):
+        self.table_name = table_name
+        self.check_interval = check_interval
+        self._snapshot: Optional[SeriesSnapshot] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, conn: Any) -> str:
+        """
+        Dataset version derived from the row count and an md5 of every row
+        (in-place UPDATEs of existing prices change the hash, not the count
+        or the maxima)
+        """
+        row = conn.execute(text(
+            f"SELECT COUNT(*), md5(COALESCE(string_agg(t::text, ',' ORDER BY t.id), '')) "
+            f"FROM {self.table_name} t"
+        )).fetchone()
+        count, digest = row if row else (0, None)
+        return f"{count}:{digest}"
+
+    def _load(self, conn: Any, version: str) -> SeriesSnapshot:
+        """Read the whole table into column arrays"""
+        result = conn.execute(text(f"SELECT * FROM {self.table_name} ORDER BY date ASC, id ASC"))
+        names = list(result.keys())
+        rows = result.fetchall()
+        raw = {name: [row[i] for row in rows] for i, name in enumerate(names)}
+
+        dates = np.array(raw.pop('date'), dtype='datetime64[D]')
+        ids = np.array(raw.pop('id'), dtype=np.int64)
+        columns = {}
+        for name, values in raw.items():
+            try:
+                if all(isinstance(v, int) for v in values):
+                    columns[name] = np.array(values, dtype=np.int64)
+                else:
+                    columns[name] = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                columns[name] = np.array(values, dtype=object)
+
+        logger.info(f"Loaded {len(ids)} rows from '{self.table_name}' (version {version})")
+        return SeriesSnapshot(self.table_name, version, dates, ids, columns)
+
+    def refresh(self, force: bool = False) -> SeriesSnapshot:
+        """
+        Reload the table if its fingerprint changed (or if forced).
+
+        New data also queues scoring of the pending forecast ledger rows.
+
+        Returns:
+            The current snapshot
+        """
+        with self._lock:
+            with get_database_connection() as conn:
+                version = self._fingerprint(conn)
+                if force or self._snapshot is None or self._snapshot.version != version:
+                    if self._snapshot is not None:
+                        # New data: forecasts built on the old snapshot are stale
+                        forecast_cache.invalidate(self.table_name)
+                    self._snapshot = self._load(conn, version)
+                    submit("db", forecast_ledger.score, self.table_name)
+            self._last_check = time.time()
+            return self._snapshot
+
+    def get(self) -> SeriesSnapshot:
+        """Return the current snapshot, re-checking the fingerprint when due"""
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - self._last_check >= self.check_interval:
+            return self.refresh()
+        return snapshot
+
+    @property
+    def version(self) -> str:
+        """Dataset version of the current snapshot"""
+        return self.get().version
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next get() reloads the table (e.g. after a price load)"""
+        with self._lock:
+            self._snapshot = None
+            self._last_check = 0.0
+
+    def handles(self, table_name: str) -> bool:
+        """True if this store serves the given table"""
+        return table_name == self.table_name
+
+
+# Shared store for the weekly prices table
+series_store = SeriesStore()
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from app.core.database import get_database_connection
+from app.crud.time_series import NON_VALUE_COLUMNS, NUMERIC_TYPES
+
+logger = logging.getLogger(__name__)
+
+DATE_TYPES = {"date", "timestamp without time zone", "timestamp with time zone"}
+
+
+class TableInfo:
+    """Column and index metadata of one table, with its prebuilt queries"""
+
+    def __init__(self, name: str, columns: Dict[str, str], indexes: List[str]):
+        self.name = name
+        self.columns = columns
+        self.indexes = indexes
+        self.date_column = next(
+            (c for c, t in columns.items() if c.lower() == 'date' and t in DATE_TYPES), None
+        )
+        self.numeric_columns = [
+            c for c, t in columns.items() if t in NUMERIC_TYPES and c not in NON_VALUE_COLUMNS
+        ]
+        self.is_time_series = self.date_column is not None and 'id' in columns
+
+        # Table names only ever come from the catalog, so these are safe to prebuild
+        self.select_all = f'SELECT * FROM "{name}"'
+        self.count_all = f'SELECT COUNT(*) FROM "{name}"'
+        # Rows plus the filtered row count in one scan (paginated reads)
+        self.select_all_counted = f'SELECT *, COUNT(*) OVER () AS _total_count FROM "{name}"'
+        # Row count and md5 of every row: changes on inserts, deletes and in-place updates
+        order = 't.id' if 'id' in columns else 't::text'
+        self.fingerprint = (
+            f"SELECT COUNT(*), md5(COALESCE(string_agg(t::text, ',' ORDER BY {order}), '')) "
+            f'FROM "{name}" t'
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'table_name': self.name,
+            'date_column': self.date_column,
+            'numeric_columns': self.numeric_columns,
+            'columns': self.columns,
+            'indexes': self.indexes,
+            'is_time_series': self.is_time_series,
+        }
+
+
+class TableCatalog:
+    """
+    In-memory catalog of the public tables and their columns.
+
+    Loaded once from information_schema/pg_indexes and refreshed on demand.
+    Every endpoint that takes a table name validates it here before it is
+    used in SQL. An unknown name triggers at most one automatic refresh per
+    `miss_refresh_interval` seconds, so newly created tables show up without
+    letting bogus names hammer information_schema.
+    """
+
+    def __init__(self, miss_refresh_interval: float = 60.0):
+        self.miss_refresh_interval = miss_refresh_interval
+        self._tables: Optional[Dict[str, TableInfo]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> Dict[str, TableInfo]:
+        """Reload table, column and index metadata from the database"""
+        with self._lock:
+            with get_database_connection() as conn:
+                tables = [row[0] for row in conn.execute(text("""
+                    SELECT table_name
+                    FROM information_schema.tables
+                    WHERE table_schema = 'public'
+                    AND table_type = 'BASE TABLE'
+                    ORDER BY table_name
+                """))]
+                columns: Dict[str, Dict[str, str]] = {name: {} for name in tables}
+                for table_name, column_name, data_type in conn.execute(text("""
+                    SELECT table_name, column_name, data_type
+                    FROM information_schema.columns
+                    WHERE table_schema = 'public'
+                    ORDER BY table_name, ordinal_position
+                """)):
+                    if table_name in columns:
+                        columns[table_name][column_name] = data_type
+                indexes: Dict[str, List[str]] = {name: [] for name in tables}
+                for table_name, index_def in conn.execute(text("""
+                    SELECT tablename, indexdef
+                    FROM pg_indexes
+                    WHERE schemaname = 'public'
+                    ORDER BY tablename, indexname
+                """)):
+                    if table_name in indexes:
+                        indexes[table_name].append(index_def)
+
+            self._tables = {
+                name: TableInfo(name, columns[name], indexes[name]) for name in tables
+            }
+            self._loaded_at = time.time()
+            logger.info(f"Table catalog loaded ({len(self._tables)} tables)")
+            return self._tables
+
+    @property
+    def tables(self) -> Dict[str, TableInfo]:
+        """All catalogued tables, loading the catalog on first use"""
+        if self._tables is None:
+            return self.refresh()
+        return self._tables
+
+    def get(self, table_name: str) -> Optional[TableInfo]:
+        """Look up a table, refreshing once if it is unknown and the catalog is old enough"""
+        info = self.tables.get(table_name)
+        if info is None and time.time() - self._loaded_at >= self.miss_refresh_interval:
+            info = self.refresh().get(table_name)
+        return info
+
+    def require_series_table(self, table_name: str) -> TableInfo:
+        """
+        Validate that a table exists and is a time series table.
+
+        Raises:
+            ValueError: If the table is unknown or has no date/id columns
+        """
+        info = self.get(table_name)
+        if info is None:
+            raise ValueError(f"Table '{table_name}' not found")
+        if not info.is_time_series:
+            raise ValueError(f"Table '{table_name}' is not a time series table (needs date and id columns)")
+        return info
+
+    def series_tables(self) -> List[TableInfo]:
+        """Catalogued tables that have date and id columns"""
+        return [info for info in self.tables.values() if info.is_time_series]
+
+
+# Shared catalog used to validate table names across endpoints and services
+table_catalog = TableCatalog()
@@ -1,16 +1,22 @@
-from typing import Dict, Any, Optional
+import importlib.util
+import logging
+from typing import Dict, Any, List, Optional
 import pandas as pd
 from sqlalchemy import text
 from app.core.database import get_database_connection
+from app.core.transforms import ColumnTransform
+from app.models.base_model import BaseForecastModel
 from app.models.model_registry_service import ModelRegistryService
+from app.services.backtest import backtest_runner, rolling_origins
+from app.services.dataset_versions import dataset_versions
+from app.services.materialized_forecasts import materialized_forecasts
+from app.services.series_store import series_store
+from app.services.table_catalog import table_catalog
 
-# Try to import LSTM model, but don't fail if Keras is not installed
-try:
-    from app.models.lstm_model import LSTMModel
-    LSTM_AVAILABLE = True
-except ImportError:
-    LSTM_AVAILABLE = False
-    LSTMModel = None
+# Keras is imported when a training job starts, not when the API boots
+LSTM_AVAILABLE = importlib.util.find_spec("keras") is not None
+
+logger = logging.getLogger(__name__)
 
 
 class TrainingService:
@@ -38,8 +44,19 @@ class TrainingService:
         Returns:
             DataFrame with data
         """
+        table_info = table_catalog.require_series_table(table_name)
+
+        if series_store.handles(table_name) and not limit:
+            snapshot = series_store.get()
+            df = snapshot.to_frame(snapshot.date_slice(start_date, end_date))
+            if df.empty:
+                raise ValueError(f"No data found in table '{table_name}'")
+            if value_column not in df.columns:
+                raise ValueError(f"Column '{value_column}' not found in table '{table_name}'")
+            return df
+
         with get_database_connection() as conn:
-            base_query = f"SELECT * FROM {table_name}"
+            base_query = table_info.select_all
             where_conditions = []
             params = {}
             
@@ -84,6 +101,21 @@ class TrainingService:
             
             return df
     
+    def _create_model(self, model_type: str, model_params: Dict[str, Any]) -> BaseForecastModel:
+        """Untrained model of a type, configured from model_params"""
+        if model_type.lower() in ('lstm', 'lstm_direct'):
+            if not LSTM_AVAILABLE:
+                raise ValueError("LSTM model is not available. Keras/TensorFlow is not installed.")
+            from app.models.lstm_model import LSTMModel
+            # lstm_direct predicts `horizon` periods per forward pass instead of one
+            return LSTMModel(
+                sequence_length=model_params.get('sequence_length', 20),
+                lstm_units=model_params.get('lstm_units', 2000),
+                dropout_rate=model_params.get('dropout_rate', 0.2),
+                horizon=model_params.get('horizon', 52) if model_type.lower() == 'lstm_direct' else 1
+            )
+        raise ValueError(f"Unsupported model type: {model_type}")
+    
     def train_model(self, table_name: str, model_type: str, value_column: str,
                    start_date: Optional[str] = None,
                    end_date: Optional[str] = None,
@@ -97,7 +129,11 @@ class TrainingService:
             value_column: Column to forecast
             start_date: Optional start date filter
             end_date: Optional end date filter
-            model_params: Model-specific hyperparameters
+            model_params: Model-specific hyperparameters. `transform` (log, sqrt,
+                normalize) is applied to value_column before training and
+                stored in the model metadata so forecasts can be inverted.
+                `horizon` is the number of periods an lstm_direct model
+                predicts per forward pass (default 52)
             
         Returns:
             Dictionary with training results (version, metrics, etc.)
@@ -107,20 +143,18 @@ class TrainingService:
         # Fetch data
         data = self._fetch_data_from_db(table_name, value_column, start_date, end_date)
         
-        # Create and train model based on type
-        if model_type.lower() == 'lstm':
-            if not LSTM_AVAILABLE:
-                raise ValueError("LSTM model is not available. Keras/TensorFlow is not installed.")
-            model = LSTMModel(
-                sequence_length=model_params.get('sequence_length', 20),
-                lstm_units=model_params.get('lstm_units', 2000),
-                dropout_rate=model_params.get('dropout_rate', 0.2)
-            )
-        else:
-            raise ValueError(f"Unsupported model type: {model_type}")
+        # Same transform pipeline as /forecast, fitted on the training series
+        column_transform = ColumnTransform(model_params.get('transform', 'none'))
+        if column_transform.name != 'none':
+            values = {value_column: data[value_column].to_numpy(dtype=float, na_value=float('nan'))}
+            data = data.copy()
+            data[value_column] = column_transform.fit(values).transform(values)[value_column]
         
-        # Train model
+        model = self._create_model(model_type, model_params)
+        
+        # Train model (metrics are in transformed units when a transform is used)
         metrics = model.train(data, value_column, **model_params)
+        model.metadata['transform'] = column_transform.to_dict()
         
         # Save model
         version = self.registry.save_model(
@@ -128,9 +162,16 @@ class TrainingService:
             table_name=table_name,
             model_type=model_type,
             value_column=value_column,
-            metadata=model.get_metadata()
+            metadata=model.get_metadata(),
+            residuals=getattr(model, 'residuals', None)
         )
         
+        # Precompute the forecast /forecast serves for the new version
+        try:
+            materialized_forecasts.refresh(table_name, value_column, model_type)
+        except Exception as e:
+            logger.warning(f"Could not materialize forecast for {table_name}.{value_column}: {str(e)}")
+        
         return {
             'success': True,
             'version': version,
@@ -139,4 +180,46 @@ class TrainingService:
             'value_column': value_column,
             'metrics': metrics,
             'training_date': model.metadata.get('training_date')
-        }
\ No newline at end of file
+        }
+    
+    def backtest_model(self, table_name: str, model_type: str, value_column: str,
+                       horizon: int = 12, origins: Optional[List[str]] = None, folds: int = 4,
+                       start_date: Optional[str] = None, end_date: Optional[str] = None,
+                       model_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Walk-forward backtest of a model type on data from the database.
+        
+        Args:
+            table_name: Name of the table
+            model_type: Type of model ('lstm', 'lstm_direct')
+            value_column: Column to forecast
+            horizon: Periods forecast after each origin
+            origins: Last training date of each fold (default: the last `folds`
+                origins with non-overlapping test windows)
+            folds: Number of folds when origins is not given
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+            model_params: Same hyperparameters as train_model; epochs,
+                batch_size, etc. are passed to every fold's training
+            
+        Returns:
+            Dictionary with per-fold and pooled metrics (see BacktestRunner.run)
+        """
+        model_params = model_params or {}
+        model = self._create_model(model_type, model_params)
+        data = self._fetch_data_from_db(table_name, value_column, start_date, end_date)
+        data = data.sort_values('date')
+        dates = data['date'].to_numpy(dtype='datetime64[D]')
+        values = data[value_column].to_numpy(dtype=float, na_value=float('nan'))
+        
+        origins = origins or rolling_origins(dates, horizon, folds)
+        dataset_version = f"{dataset_versions.get(table_name)}|{start_date}|{end_date}"
+        train_params = {
+            k: v for k, v in model_params.items()
+            if k not in ('transform', 'sequence_length', 'lstm_units', 'dropout_rate', 'horizon')
+        }
+        result = backtest_runner.run(
+            model, dates, values, value_column, origins, horizon, dataset_version,
+            transform=model_params.get('transform', 'none'), train_params=train_params
+        )
+        return {'table_name': table_name, 'model_type': model_type, **result}
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Time price-sheet scenarios: the per-date coefficient loop vs CoefficientSet.scenario_paths"""
+
+import sys
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from app.services.scenario_coefficients import DEFAULT_COEFFICIENTS, CoefficientSet
+
+BASE_PRICES = 500    # scenarios in one price sheet
+PERIODS = 52         # weekly horizon
+REPEAT = 20
+
+coefficients = CoefficientSet(0, DEFAULT_COEFFICIENTS)
+monthly = {(int(m[:4]), int(m[5:])): v for m, v in DEFAULT_COEFFICIENTS.items()}
+base_prices = np.random.default_rng(0).uniform(6000, 12000, BASE_PRICES)
+start = date(2026, 2, 2)
+dates = np.datetime64(start, 'D') + np.arange(PERIODS) * 7
+
+
+def loop_paths():
+    """Previous implementation: one dictionary lookup and three divisions per date and price"""
+    out = []
+    for base_price in base_prices:
+        for i in range(PERIODS):
+            d = start + timedelta(days=7 * i)
+            coef = monthly.get((d.year, d.month), list(monthly.values())[-1])
+            low, high = (coef, coef) if i == 0 else (coef * 0.98, coef * 1.02)
+            out.append((base_price / low, base_price / coef, base_price / high))
+    return out
+
+
+def vectorized_paths():
+    return coefficients.scenario_paths(base_prices, dates)
+
+
+if __name__ == "__main__":
+    print(f"{BASE_PRICES} base prices x {PERIODS} periods")
+    for label, fn in (("loop", loop_paths), ("vectorized", vectorized_paths)):
+        seconds = min(timeit.repeat(fn, number=1, repeat=REPEAT))
+        print(f"  {label:<11} {seconds * 1e3:8.3f} ms")
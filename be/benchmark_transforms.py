@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Compare the per-value transform loop /forecast used to run with app.core.transforms"""
+
+import sys
+import timeit
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from app.core.transforms import transform_records
+
+ROWS = 1000          # /forecast page size limit
+VALUE_COLUMNS = 10   # precios_materiales has ~10 numeric columns
+REPEAT = 20
+
+
+def make_records():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(1000, 20000, size=(ROWS, VALUE_COLUMNS))
+    return [
+        {'id': i, 'date': f"2024-01-{(i % 28) + 1:02d}",
+         **{f"col_{j}": float(values[i, j]) for j in range(VALUE_COLUMNS)}}
+        for i in range(ROWS)
+    ]
+
+
+def loop_transform(data, transform):
+    """Previous implementation: one NumPy call per value"""
+    exclude_columns = ['date', 'year', 'Date']
+    if transform == "normalize":
+        numeric_keys = sorted({
+            k for item in data for k, v in item.items()
+            if k.lower() not in exclude_columns and isinstance(v, (int, float))
+        })
+        cols = {k: np.array([item.get(k, np.nan) for item in data], dtype=float) for k in numeric_keys}
+        mins = {k: np.nanmin(arr) for k, arr in cols.items()}
+        maxs = {k: np.nanmax(arr) for k, arr in cols.items()}
+        for i, item in enumerate(data):
+            for k in numeric_keys:
+                v = cols[k][i]
+                denom = (maxs[k] - mins[k])
+                item[k] = float((v - mins[k]) / denom) if denom and np.isfinite(v) else 0.0
+    else:
+        for item in data:
+            for key, value in item.items():
+                if key.lower() not in exclude_columns and isinstance(value, (int, float)):
+                    if transform == "log":
+                        item[key] = np.log(value) if value > 0 else 0
+                    elif transform == "sqrt":
+                        item[key] = np.sqrt(value) if value >= 0 else 0
+    return data
+
+
+def best_time(fn, name):
+    """Best wall time of fn on fresh records (building them is not timed)"""
+    times = []
+    for _ in range(REPEAT):
+        records = make_records()
+        start = timeit.default_timer()
+        fn(records, name)
+        times.append(timeit.default_timer() - start)
+    return min(times)
+
+
+print(f"{ROWS} rows x {VALUE_COLUMNS} value columns, best of {REPEAT} runs")
+for name in ("log", "sqrt", "normalize"):
+    loop = best_time(loop_transform, name)
+    vectorized = best_time(lambda records, n: transform_records(records, n, exclude=['id', 'date']), name)
+    print(f"  {name:<10} loop {loop * 1e3:7.2f} ms   vectorized {vectorized * 1e3:7.2f} ms   "
+          f"({loop / vectorized:.1f}x)")
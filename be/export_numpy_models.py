@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Export registered LSTM models to NumPy weights and check them against Keras"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from app.models.lstm_model import LSTMModel
+from app.models.numpy_lstm import NumpyLSTMModel
+from app.models.model_registry_service import ModelRegistryService
+
+FORECAST_PERIODS = 52
+TOLERANCE = 1e-3  # relative, float32 arithmetic on both sides
+
+registry = ModelRegistryService()
+models = [m for m in registry.list_models() if m['model_type'] in ('lstm', 'lstm_direct')]
+print(f"LSTM models in registry: {len(models)}")
+
+failures = 0
+for model_info in models:
+    for version_info in model_info['versions']:
+        version = version_info['version']
+        path = registry.get_model_path(model_info['table_name'], model_info['model_type'], version)
+        label = f"{model_info['table_name']}/{model_info['model_type']}/{version}"
+
+        keras_model = LSTMModel()
+        keras_model.load(str(path))
+        if not NumpyLSTMModel.is_exported(str(path)):
+            keras_model.export_numpy(str(path))
+            print(f"  Exported {label}")
+
+        numpy_model = NumpyLSTMModel()
+        numpy_model.load(str(path))
+
+        # Single forward pass on the stored window, then the full recursive rollout
+        window = keras_model.last_sequence.reshape((1, keras_model.sequence_length, 1))
+        step_diff = np.max(np.abs(
+            np.ravel(keras_model.model.predict(window, verbose=0)) - np.ravel(numpy_model.forward(window))
+        ))
+        rollout_keras = np.array(keras_model.predict(FORECAST_PERIODS))
+        rollout_numpy = np.array(numpy_model.predict(FORECAST_PERIODS))
+        rel_error = np.max(np.abs(rollout_keras - rollout_numpy) / np.maximum(np.abs(rollout_keras), 1e-9))
+
+        if step_diff <= TOLERANCE and rel_error <= TOLERANCE:
+            print(f"  ✓ {label}: one pass diff={step_diff:.2e}, "
+                  f"{FORECAST_PERIODS}-step max rel diff={rel_error:.2e}")
+        else:
+            failures += 1
+            print(f"  ❌ {label}: one pass diff={step_diff:.2e}, "
+                  f"{FORECAST_PERIODS}-step max rel diff={rel_error:.2e}")
+
+sys.exit(1 if failures else 0)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Measure quote latency with and without forecasts running on the same server.
+
+Usage:
+    uvicorn app.main:app --port 8000   # in another terminal
+    python load_test_quotes.py [BASE_URL] [CODIGO_POSTAL]
+
+Forecasts are requested with live=true so each one runs a full rollout.
+With blocking work off the event loop, the quote percentiles of both
+phases should be about the same.
+"""
+
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+CODIGO_POSTAL = sys.argv[2] if len(sys.argv) > 2 else "44100"
+QUOTE_REQUESTS = 200
+QUOTE_CONCURRENCY = 8
+FORECAST_CONCURRENCY = 8
+
+QUOTE_URL = f"{BASE_URL}/api/v1/quote/codigo-postal/{CODIGO_POSTAL}"
+FORECAST_URL = (f"{BASE_URL}/api/v1/forecast/?table_name=precios_materiales"
+                f"&value_column=scrap_mxn&model_type=lstm&forecast_periods=52&live=true")
+
+
+def timed_get(url: str) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def quote_latencies() -> list:
+    with ThreadPoolExecutor(QUOTE_CONCURRENCY) as pool:
+        return list(pool.map(lambda _: timed_get(QUOTE_URL), range(QUOTE_REQUESTS)))
+
+
+def report(label: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  {label:<22} p50={statistics.median(latencies) * 1e3:7.1f} ms   "
+          f"p95={p95 * 1e3:7.1f} ms   max={latencies[-1] * 1e3:7.1f} ms")
+
+
+print(f"Quotes: {QUOTE_REQUESTS} requests x {QUOTE_CONCURRENCY} concurrent against {BASE_URL}")
+report("idle", quote_latencies())
+
+stop = threading.Event()
+forecasts_done = []
+
+
+def forecast_loop() -> None:
+    while not stop.is_set():
+        forecasts_done.append(timed_get(FORECAST_URL))
+
+
+forecast_threads = [threading.Thread(target=forecast_loop) for _ in range(FORECAST_CONCURRENCY)]
+for thread in forecast_threads:
+    thread.start()
+time.sleep(1)  # let the forecasts saturate their pool
+busy = quote_latencies()
+stop.set()
+for thread in forecast_threads:
+    thread.join()
+
+report(f"{FORECAST_CONCURRENCY} forecasts running", busy)
+print(f"  forecasts completed: {len(forecasts_done)}, "
+      f"median {statistics.median(forecasts_done) * 1e3:.0f} ms" if forecasts_done else "")
+with urllib.request.urlopen(f"{BASE_URL}/health") as response:
+    print("  executors:", json.loads(response.read())["executors"])
@@ -0,0 +1,42 @@
+import json
+
+from app.models.model_registry_service import ModelRegistryService
+from app.services.forecast_service import ForecastService
+
+
+def _registry(tmp_path):
+    versions = [
+        ('v1', '2026-01-01T00:00:00', 'scrap_mxn'),
+        ('v2', '2026-02-01T00:00:00', 'rebar_mxn'),
+        ('v3', '2026-03-01T00:00:00', 'scrap_mxn'),
+    ]
+    (tmp_path / 'registry_metadata.json').write_text(json.dumps({
+        'precios_materiales_lstm': {
+            'table_name': 'precios_materiales',
+            'model_type': 'lstm',
+            'value_column': 'scrap_mxn',
+            'latest_version': 'v3',
+            'versions': [
+                {'version': v, 'created_at': c, 'value_column': col, 'metadata': {}}
+                for v, c, col in versions
+            ],
+        }
+    }))
+    return ModelRegistryService(base_path=str(tmp_path))
+
+
+def test_latest_version_of_a_column(tmp_path):
+    registry = _registry(tmp_path)
+
+    assert registry.get_latest_version('precios_materiales', 'lstm') == 'v3'
+    assert registry.get_latest_version('precios_materiales', 'lstm', 'scrap_mxn') == 'v3'
+    assert registry.get_latest_version('precios_materiales', 'lstm', 'rebar_mxn') == 'v2'
+    assert registry.get_latest_version('precios_materiales', 'lstm', 'gas_mxn') is None
+
+
+def test_select_model_ignores_versions_of_other_columns(tmp_path):
+    service = ForecastService()
+    service.registry = _registry(tmp_path)
+
+    assert service.select_model('precios_materiales', 'lstm', 'rebar_mxn', 4) == ('lstm', 'v2')
+    assert service.select_model('precios_materiales', 'lstm', 'gas_mxn', 4) == ('lstm', None)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+keras = pytest.importorskip("keras")
+
+from sklearn.preprocessing import MinMaxScaler
+
+from app.models.numpy_lstm import NumpyLSTMModel, export_lstm_weights
+
+SEQUENCE_LENGTH = 12
+
+
+def _exported(tmp_path, horizon):
+    """Small untrained LSTM -> Dropout -> Dense(horizon), exported and reloaded with NumPy."""
+    keras.utils.set_random_seed(0)
+    keras_model = keras.Sequential([
+        keras.Input(shape=(SEQUENCE_LENGTH, 1)),
+        keras.layers.LSTM(8),
+        keras.layers.Dropout(0.2),
+        keras.layers.Dense(horizon),
+    ])
+    series = 5000 + 200 * np.sin(np.arange(60) / 5.0)
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled = scaler.fit_transform(series.reshape(-1, 1)).flatten()
+
+    export_lstm_weights(keras_model, scaler, scaled[-SEQUENCE_LENGTH:], str(tmp_path))
+    numpy_model = NumpyLSTMModel()
+    numpy_model.load(str(tmp_path))
+    return keras_model, scaler, scaled, numpy_model
+
+
+def _keras_rollout(keras_model, scaler, window, n_periods):
+    """Feed Keras predictions back as input until n_periods are produced (original units)."""
+    window = list(window)
+    predictions = []
+    while len(predictions) < n_periods:
+        output = keras_model.predict(np.array(window[-SEQUENCE_LENGTH:]).reshape(1, SEQUENCE_LENGTH, 1), verbose=0)
+        step = np.asarray(output).flatten().tolist()
+        predictions.extend(step)
+        window.extend(step)
+    return scaler.inverse_transform(np.array(predictions[:n_periods]).reshape(-1, 1)).flatten()
+
+
+@pytest.mark.parametrize("horizon", [1, 3])
+def test_forward_matches_keras(tmp_path, horizon):
+    keras_model, _, scaled, numpy_model = _exported(tmp_path, horizon)
+    windows = np.stack([scaled[i:i + SEQUENCE_LENGTH] for i in range(0, 40, 5)])
+
+    expected = keras_model.predict(windows[:, :, np.newaxis], verbose=0).reshape(len(windows), -1)
+    actual = numpy_model.forward(windows).reshape(len(windows), -1)
+
+    assert numpy_model.horizon == horizon
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("horizon", [1, 3])
+def test_predict_matches_keras_rollout(tmp_path, horizon):
+    keras_model, scaler, scaled, numpy_model = _exported(tmp_path, horizon)
+
+    for n_periods in (1, horizon, 7):
+        expected = _keras_rollout(keras_model, scaler, scaled[-SEQUENCE_LENGTH:], n_periods)
+        actual = numpy_model.predict(n_periods)
+        assert len(actual) == n_periods
+        np.testing.assert_allclose(actual, expected, rtol=1e-4)
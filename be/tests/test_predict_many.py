@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from app.models.base_model import BaseForecastModel
+from app.models.numpy_lstm import WEIGHTS_FILE, NumpyLSTMModel
+
+SEQUENCE_LENGTH = 10
+UNITS = 4
+
+
+def _numpy_model(tmp_path, horizon, last_sequence):
+    """NumpyLSTMModel loaded from random weights (scaler maps [4000, 6000] to [0, 1])."""
+    rng = np.random.default_rng(0)
+    np.savez(
+        tmp_path / WEIGHTS_FILE,
+        kernel=rng.normal(0, 0.5, (1, 4 * UNITS)).astype(np.float32),
+        recurrent_kernel=rng.normal(0, 0.5, (UNITS, 4 * UNITS)).astype(np.float32),
+        bias=rng.normal(0, 0.1, 4 * UNITS).astype(np.float32),
+        dense_kernel=rng.normal(0, 0.5, (UNITS, horizon)).astype(np.float32),
+        dense_bias=np.full(horizon, 0.5, dtype=np.float32),
+        activation=np.array('tanh'),
+        recurrent_activation=np.array('sigmoid'),
+        dense_activation=np.array('linear'),
+        scaler_min=np.array([-2.0]),
+        scaler_scale=np.array([1 / 2000]),
+        last_sequence=np.asarray(last_sequence, dtype=np.float64),
+    )
+    model = NumpyLSTMModel()
+    model.load(str(tmp_path))
+    return model
+
+
+@pytest.mark.parametrize("horizon", [1, 3])
+def test_predict_many_rows_match_predict(tmp_path, horizon):
+    rng = np.random.default_rng(1)
+    windows = 5000 + rng.normal(0, 300, (4, SEQUENCE_LENGTH))
+    model = _numpy_model(tmp_path, horizon, np.zeros(SEQUENCE_LENGTH))
+
+    batched = model.predict_many(windows, 7)
+
+    assert batched.shape == (4, 7)
+    for window, row in zip(windows, batched):
+        model.last_sequence = model.scale(window)
+        # forward() runs in float32, so batching may change the last bits
+        np.testing.assert_allclose(row, model.predict(7), rtol=1e-6)
+
+
+def test_predict_many_rejects_wrong_window_width(tmp_path):
+    model = _numpy_model(tmp_path, 1, np.zeros(SEQUENCE_LENGTH))
+    with pytest.raises(ValueError):
+        model.predict_many(np.zeros((2, SEQUENCE_LENGTH + 1)), 3)
+
+
+def test_predict_many_requires_loaded_model():
+    with pytest.raises(ValueError):
+        NumpyLSTMModel().predict_many(np.zeros((1, SEQUENCE_LENGTH)), 3)
+
+
+def test_predict_many_is_required_by_the_base_class():
+    class NoBatching(BaseForecastModel):
+        def train(self, data, value_column, **params):
+            return {}
+
+        def predict(self, n_periods, **kwargs):
+            return [0.0] * n_periods
+
+        def save(self, path):
+            pass
+
+        def load(self, path):
+            pass
+
+    with pytest.raises(TypeError):
+        NoBatching()
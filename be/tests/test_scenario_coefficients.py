@@ -0,0 +1,12 @@
+import numpy as np
+
+from app.services.scenario_coefficients import CoefficientSet
+
+
+def test_lookup_uses_month_or_latest_coefficient():
+    coefficients = CoefficientSet(1, {'2026-03': 0.9, '2026-01': 0.7, '2026-05': 0.8})
+    dates = np.array(['2025-12-15', '2026-01-31', '2026-02-10', '2026-03-01', '2026-05-20', '2026-09-01'],
+                     dtype='datetime64[D]')
+
+    # Months that are not stored (before, between or after) use the latest month, 2026-05
+    np.testing.assert_array_equal(coefficients.lookup(dates), [0.8, 0.7, 0.8, 0.9, 0.8, 0.8])
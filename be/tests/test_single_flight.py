@@ -0,0 +1,34 @@
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+def test_submit_shares_one_job():
+    flight = SingleFlight()
+    jobs = []
+
+    first, shared_first = flight.submit('key', lambda: 42, jobs.append)
+    second, shared_second = flight.submit('key', lambda: 0, jobs.append)
+    jobs[0]()
+
+    assert (shared_first, shared_second) == (False, True)
+    assert len(jobs) == 1
+    assert first.result(timeout=1) == second.result(timeout=1) == 42
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_failed_start_fails_callers_that_joined():
+    flight = SingleFlight()
+    joined = []
+
+    def start(job):
+        # Another caller arrives while the pool is refusing the job
+        joined.append(flight.submit('key', lambda: 1, start)[0])
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+    with pytest.raises(RuntimeError):
+        flight.submit('key', lambda: 1, start)
+
+    with pytest.raises(RuntimeError):
+        joined[0].result(timeout=1)
+    assert flight.stats()['in_flight'] == 0
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.core.transforms import ColumnTransform, transform_records
+
+
+def _records(values):
+    return [{'id': i, 'date': f'2025-01-{i + 1:02d}', 'scrap_mxn': v} for i, v in enumerate(values)]
+
+
+@pytest.mark.parametrize("name", ["log", "sqrt", "normalize"])
+def test_missing_values_stay_none(name):
+    values = [5000.0 + 10 * i for i in range(10)]
+    values[3] = values[6] = None
+    records, _ = transform_records(_records(values), name, exclude=('id', 'date'))
+
+    transformed = [r['scrap_mxn'] for r in records]
+    assert transformed[3] is None and transformed[6] is None
+    assert all(isinstance(v, float) for i, v in enumerate(transformed) if i not in (3, 6))
+
+
+def test_log_round_trip_ignores_missing_values():
+    values = [5000.0 + 10 * i for i in range(10)]
+    values[3] = None
+    records, column_transform = transform_records(_records(values), "log", exclude=('id', 'date'))
+
+    restored = column_transform.inverse([r['scrap_mxn'] for r in records if r['scrap_mxn'] is not None], 'scrap_mxn')
+    expected = [v for v in values if v is not None]
+    assert np.allclose(restored, expected)
+
+
+def test_finite_out_of_domain_values_become_zero():
+    column_transform = ColumnTransform("log").fit({'x': np.array([-1.0, 0.0, np.nan, math.e])})
+    result = column_transform.transform({'x': np.array([-1.0, 0.0, np.nan, math.e])})['x']
+
+    assert result[0] == 0.0 and result[1] == 0.0
+    assert np.isnan(result[2])
+    assert result[3] == pytest.approx(1.0)
+
+
+def test_normalize_uses_fitted_range():
+    column_transform = ColumnTransform("normalize")
+    columns = {'x': np.array([10.0, np.nan, 20.0, 15.0])}
+    result = column_transform.fit(columns).transform(columns)['x']
+
+    assert result[0] == 0.0 and result[2] == 1.0 and result[3] == 0.5
+    assert np.isnan(result[1])
+    assert column_transform.inverse(0.5, 'x') == pytest.approx(15.0)
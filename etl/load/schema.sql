@@ -110,4 +110,79 @@ ORDER BY asset_name;
 -- Grant permissions (adjust user as needed)
 -- =====================================================
 -- GRANT SELECT, INSERT, UPDATE, DELETE ON market_data TO your_user;
--- GRANT USAGE, SELECT ON SEQUENCE market_data_id_seq TO your_user;
\ No newline at end of file
+-- GRANT USAGE, SELECT ON SEQUENCE market_data_id_seq TO your_user;
+-- =====================================================
+-- Keyset pagination indexes used by the API (/api/v1/data)
+-- =====================================================
+-- Pages are served ordered by (date DESC, id DESC) and continue with a
+-- row-value comparison on (date, id), so each page is one index range scan.
+CREATE INDEX IF NOT EXISTS idx_market_data_date_id ON market_data(date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_precios_materiales_date_id ON precios_materiales(date DESC, id DESC);
+
+-- =====================================================
+-- Precomputed forecasts served by the API (/api/v1/forecast)
+-- =====================================================
+-- Filled after each training run and price load; the API also creates it on
+-- first use. Rows are only served while model_version and dataset_version
+-- match the current model and data.
+CREATE TABLE IF NOT EXISTS forecasts_materialized (
+    id SERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    value_column VARCHAR(100) NOT NULL,
+    model_type VARCHAR(50) NOT NULL,
+    model_version VARCHAR(50) NOT NULL,
+    horizon INTEGER NOT NULL,
+    dataset_version VARCHAR(100) NOT NULL,
+    period INTEGER NOT NULL,
+    date DATE NOT NULL,
+    predicted_value DOUBLE PRECISION,
+    predicted_value_bajista DOUBLE PRECISION,
+    predicted_value_conservador DOUBLE PRECISION,
+    predicted_value_alza DOUBLE PRECISION,
+    ci_lower DOUBLE PRECISION,
+    ci_upper DOUBLE PRECISION,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_forecasts_materialized_lookup
+    ON forecasts_materialized(table_name, value_column, model_type, model_version, horizon);
+
+-- =====================================================
+-- Scenario coefficients of the empirical forecast (/api/v1/forecast)
+-- =====================================================
+-- Each save through POST /api/v1/forecast/coefficients adds a new version;
+-- the API serves the highest one. A date uses its month's coefficient or the
+-- closest earlier stored month.
+CREATE TABLE IF NOT EXISTS scenario_coefficients (
+    id SERIAL PRIMARY KEY,
+    version INTEGER NOT NULL,
+    month DATE NOT NULL,
+    coefficient DOUBLE PRECISION NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (version, month)
+);
+
+-- =====================================================
+-- Forecast accuracy ledger (/api/v1/forecast/accuracy)
+-- =====================================================
+-- One row per served or materialized forecast and horizon step. Rows stay
+-- pending (scored_at IS NULL) until the prices of their target week are
+-- loaded; the partial indexes keep scoring and the rolling error queries
+-- off the history of already scored rows.
+CREATE TABLE IF NOT EXISTS forecast_ledger (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    value_column VARCHAR(100) NOT NULL,
+    model_type VARCHAR(50) NOT NULL,
+    model_version VARCHAR(50) NOT NULL,
+    origin_date DATE NOT NULL,
+    horizon SMALLINT NOT NULL,
+    target_date DATE NOT NULL,
+    predicted DOUBLE PRECISION NOT NULL,
+    actual DOUBLE PRECISION,
+    scored_at TIMESTAMP,
+    UNIQUE (table_name, value_column, model_type, model_version, origin_date, horizon)
+);
+CREATE INDEX IF NOT EXISTS idx_forecast_ledger_pending
+    ON forecast_ledger(table_name, value_column, target_date) WHERE scored_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_forecast_ledger_scored
+    ON forecast_ledger(table_name, target_date, model_type, horizon) WHERE actual IS NOT NULL;
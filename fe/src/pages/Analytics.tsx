@@ -67,22 +67,38 @@ interface ApiResponse {
   startDate: string
 }
 
-const fetchMaterialPrices = async (startDate?: string, endDate?: string, transform?: string, forecast_periods?: string, modelType?: string, value_column?: string): Promise<ApiResponse> => {
+interface BatchForecast {
+  forecast: ForecastPrice[]
+  elapsed_ms: number
+  error?: string
+}
+
+interface BatchResponse {
+  data: MaterialPrice[]
+  transformed_data?: Record<string, MaterialPrice[]>
+  forecasts: Record<string, Record<string, BatchForecast>>
+  total_count: number
+  limit: number
+  offset: number
+}
+
+// One request returns the raw data, the data under `normalization` and the forecast
+const fetchForecastBatch = async (startDate?: string, endDate?: string, normalization?: string, forecast_periods?: string, modelType?: string, value_column?: string): Promise<BatchResponse> => {
   const params = new URLSearchParams({
     table_name: 'precios_materiales',
     limit: '200',
     forecast_periods: forecast_periods || '18',
-    value_column: value_column || "scrap_mxn",
-    transform: transform || 'none',
-    model_type: modelType || 'lstm',
-    use_trained_model: 'false'
+    value_columns: value_column || 'scrap_mxn',
+    model_types: modelType || 'lstm',
+    transform: 'none',
+    data_transforms: normalization || 'normalize'
   })
 
   if (startDate) params.append('start_date', startDate)
   if (endDate) params.append('end_date', endDate)
 
   const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
-  const response = await axios.get(`${API_URL}/api/v1/forecast/?${params}`)
+  const response = await axios.get(`${API_URL}/api/v1/forecast/batch?${params}`)
   return response.data
 }
 
@@ -198,21 +214,24 @@ export function Analytics() {
     setEndDate(endDate)
   }
 
-  const { data, isLoading, error, refetch } = useQuery({
-    queryKey: ['materialPrices', startDate, endDate],
-    queryFn: () => fetchMaterialPrices(startDate, endDate, 'none', '18', selectedModel, 'scrap_mxn'),
+  const { data: batch, isLoading, error, refetch } = useQuery({
+    queryKey: ['materialPrices', startDate, endDate, selectedModel, normalization],
+    queryFn: () => fetchForecastBatch(startDate, endDate, normalization, '18', selectedModel, 'scrap_mxn'),
     refetchInterval: false,
     staleTime: 0,
     gcTime: 0,
   })
 
-  const { data: secondaryData, isLoading: secondaryLoading, error: secondaryError, refetch: refetchSecondary } = useQuery({
-    queryKey: ['materialPrices', startDate, endDate, 'secondary', normalization],
-    queryFn: () => fetchMaterialPrices(startDate, endDate, normalization, '1'),
-    refetchInterval: false,
-    staleTime: 0,
-    gcTime: 0,
-  })
+  const data = useMemo<ApiResponse | undefined>(() => batch && {
+    data: batch.data,
+    validation: [],
+    forecast: batch.forecasts.scrap_mxn?.[selectedModel]?.forecast ?? [],
+    total_count: batch.total_count,
+    limit: batch.limit,
+    offset: batch.offset,
+    startDate,
+  }, [batch, selectedModel, startDate])
+  const secondaryData = batch && { data: batch.transformed_data?.[normalization] ?? [] }
 
   const correlationMatrix = useMemo(() => {
     const rows = data?.data ?? []
@@ -473,18 +492,18 @@ export function Analytics() {
             </div>
           </CardHeader>
           <CardContent>
-            {secondaryLoading ? (
+            {isLoading ? (
               <div className="h-64 sm:h-80 flex items-center justify-center">
                 <div className="flex items-center space-x-2 text-sm text-gray-500">
                   <RefreshCw className="h-4 w-4 animate-spin" />
                   <span>{t('common.loading')}</span>
                 </div>
               </div>
-            ) : secondaryError ? (
+            ) : error ? (
               <div className="h-64 sm:h-80 flex items-center justify-center text-red-500">
                 <div className="text-center">
                   <p className="text-sm">{t('errors.serverError')}</p>
-                  <Button variant="outline" onClick={() => refetchSecondary()} className="mt-2 text-xs">
+                  <Button variant="outline" onClick={() => refetch()} className="mt-2 text-xs">
                     {t('common.refresh')}
                   </Button>
                 </div>